@@ -2,14 +2,17 @@ import logging
 from typing import Any
 import numpy as np
 from numpy import ndarray, dtype
-from scipy.stats import norm
+from utils import kernels
+from utils.metrics import instrument
+from utils.special import norm_cdf, norm_pdf
 
 logger = logging.getLogger("BSM")
-logging.basicConfig(level=logging.INFO)
 
 
 class BSM:
 
+    GREEKS = ("price", "delta", "gamma", "theta", "vega", "rho")
+
     def __init__(self):
         self.spot = None
         self.strike = None
@@ -34,17 +37,8 @@ class BSM:
         Returns:
             None: Updates the internal attributes of the model.
         """
-        logger.info("---------------------------------------------------------------------")
-        logger.info(" Initialization of Black-Sholes-Merton model to compute option prices")
-        logger.info("---------------------------------------------------------------------")
-        logger.info(" Parameters :")
-        logger.info(f"\n"
-                    f"| Spot price: ${spot:.2f} |\n"
-                    f"| Strike: ${strike:.2f} |\n"
-                    f"| Maturity: {maturity} year(s) |\n"
-                    f"| Risk-free rate: {risk_free_rate:.2%} |\n"
-                    f"| Volatility: {volatility / 100:.2%} |"
-                    )
+        logger.debug("Initialization of BSM model: spot=%s, strike=%s, maturity=%s, risk-free rate=%s, volatility=%s",
+                     spot, strike, maturity, risk_free_rate, volatility)
         self.spot = spot
         self.strike = strike
         self.maturity = maturity
@@ -56,19 +50,23 @@ class BSM:
         self._initialized = True
 
     @staticmethod
-    def _compute_stochastic_integral(dt, n: int) -> ndarray[Any, dtype[Any]]:
+    def _compute_stochastic_integral(dt, n: int, n_paths: int | None = None,
+                                     rng: np.random.Generator | None = None) -> ndarray[Any, dtype[Any]]:
         """
         Simulate a stochastic integral using the Euler-Maruyama numerical method.
         Args:
             dt : Time period for the simulation.
             n (int): Number of time steps in the discretization.
+            n_paths (int | None): Number of Brownian paths to draw at once, None for a single 1D path.
+            rng (np.random.Generator | None): Random generator to draw from, a fresh unseeded one if None.
 
         Return:
-            np.ndarray: A 1D array of simulated values representing the stochastic process.
+            np.ndarray: A 1D array (or an (n_paths, n+1) matrix) of simulated values representing the stochastic process.
         """
-
-        dw = np.random.randn(n+1) * np.sqrt(dt)
-        w = np.cumsum(dw)
+        rng = np.random.default_rng() if rng is None else rng
+        shape = n + 1 if n_paths is None else (n_paths, n + 1)
+        dw = rng.standard_normal(shape) * np.sqrt(dt)
+        w = np.cumsum(dw, axis=-1)
         return w
 
     def compute_spot_price(self, timescale: str, n: int):
@@ -85,6 +83,7 @@ class BSM:
                 (self.risk_free - .5 * self.volatility ** 2) * self.period + self.volatility * self._compute_stochastic_integral(
                     dt, n))
 
+    @instrument("bsm.compute_option_price")
     def compute_option_price(self) -> tuple[float, float]:
         """
         Compute the prices of European call/put options using the Black-Scholes-Merton model.
@@ -97,26 +96,38 @@ class BSM:
         if not self._initialized:
             logger.error("Model not initialized. Please initialize a model with the required parameters.")
         else:
-            call = self.spot * norm.cdf(self._d1) - self.strike * np.exp(
-                -self.risk_free * self.maturity) * norm.cdf(self._d2)
-            put = self.strike * np.exp(-self.risk_free * self.maturity) * norm.cdf(
-                -self._d2) - self.spot * norm.cdf(-self._d1)
-            logger.info("---------------------------------------------------------------------")
-            logger.info(" Result :")
-            logger.info(
-                f"| Call price: ${call:.2f} \n"
-                f"| Put price: ${put:.2f} \n"
-            )
+            call = self.spot * norm_cdf(self._d1) - self.strike * np.exp(
+                -self.risk_free * self.maturity) * norm_cdf(self._d2)
+            put = self.strike * np.exp(-self.risk_free * self.maturity) * norm_cdf(
+                -self._d2) - self.spot * norm_cdf(-self._d1)
+            logger.debug("BSM result: call=%s, put=%s", call, put)
             return call, put
 
-    def simulate_spot_price(self, N: int):
+    @instrument("bsm.simulate_spot_price", size=len)
+    def simulate_spot_price(self, N: int, timescale: str, n: int, rng: np.random.Generator | None = None) -> np.ndarray:
         """
-
-        :param N:
-        :return:
+        Simulate N spot price paths at once under the risk-neutral GBM dynamics of the model.
+        Args:
+            N (int): Number of paths to simulate.
+            timescale (str): Time step of the simulation ("Daily", "Weekly" or "Year").
+            n (int): Number of time steps per path.
+            rng (np.random.Generator | None): Random generator to draw from, a fresh unseeded one if None.
+        Returns:
+            np.ndarray: An (N, n+1) matrix of simulated spot prices, one path per row.
         """
-        S = [self._compute_spot_price() for n in range(N)]
-        return S
+        scale = {"Daily": 1/252, "Weekly": 1/52, "Year": 1}
+        self.period = np.arange(n+1) * scale[timescale]
+        dt = np.concat(([0], np.diff(self.period)))
+        if not self._initialized:
+            logger.error("Model not initialized. Please initialize a model with the required parameters.")
+        elif kernels.active_backend() == "numba":
+            rng = np.random.default_rng() if rng is None else rng
+            return kernels.gbm_paths(self.spot, self.risk_free, self.volatility, self.period,
+                                     rng.standard_normal((N, n + 1)))
+        else:
+            return self.spot * np.exp(
+                (self.risk_free - .5 * self.volatility ** 2) * self.period + self.volatility * self._compute_stochastic_integral(
+                    dt, n, N, rng))
 
     @staticmethod
     def _compute_d(s0: float | np.ndarray, K: float, r: float, T: float | np.ndarray, sigma: float, is_d1=True) -> float:
@@ -129,6 +140,81 @@ class BSM:
         else:
             return d1 - sigma * np.sqrt(T)
 
+    @staticmethod
+    def _compute_d1_d2(s0: np.ndarray, K: np.ndarray, r: np.ndarray, T: np.ndarray, sigma: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute d1 and d2 together, sharing the sigma * sqrt(T) term between both.
+        """
+        sigma_sqrt_t = sigma * np.sqrt(T)
+        d1 = (np.log(s0 / K) + (r + .5 * sigma ** 2) * T) / sigma_sqrt_t
+        return d1, d1 - sigma_sqrt_t
+
+    @staticmethod
+    def _resolve_sigma(sigma, K, T) -> float | np.ndarray:
+        """
+        Volatilities of the contracts, looked up in one vectorized call when sigma is a surface sigma(K, T).
+        """
+        return sigma(K, T) if callable(sigma) else sigma
+
+    @staticmethod
+    @instrument("bsm.compute_call_put_batch", size=lambda result: result[0].size)
+    def compute_call_put_batch(s0: float | np.ndarray, K: float | np.ndarray, r: float | np.ndarray,
+                               T: float | np.ndarray, sigma: float | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute European call and put prices for a whole chain of contracts in one vectorized pass.
+        Inputs are broadcast against each other, d1/d2 and the discount factor are computed once and shared
+        between calls and puts.
+        Args:
+            s0 (float | np.ndarray): Spot price(s) (in $).
+            K (float | np.ndarray): Strike price(s) (in $).
+            r (float | np.ndarray): Annualized risk-free interest rate(s).
+            T (float | np.ndarray): Time(s) to option expiration (in years).
+            sigma (float | np.ndarray | VolSurface): Volatility(ies) of the underlying asset, or a surface evaluated
+                at every (K, T).
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Tuple containing:
+                - Call option prices (np.ndarray)
+                - Put option prices (np.ndarray)
+        """
+        sigma = BSM._resolve_sigma(sigma, K, T)
+        s0, K, r, T, sigma = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (s0, K, r, T, sigma)))
+        d1, d2 = BSM._compute_d1_d2(s0, K, r, T, sigma)
+        discounted_strike = K * np.exp(-r * T)
+        call = s0 * norm_cdf(d1) - discounted_strike * norm_cdf(d2)
+        put = discounted_strike * norm_cdf(-d2) - s0 * norm_cdf(-d1)
+        return call, put
+
+    @staticmethod
+    @instrument("bsm.compute_bsm_batch", size=np.size)
+    def compute_bsm_batch(s0: float | np.ndarray, K: float | np.ndarray, r: float | np.ndarray,
+                          T: float | np.ndarray, sigma: float | np.ndarray, is_call: bool | np.ndarray = True) -> np.ndarray:
+        """
+        Compute European option prices for a whole chain of contracts in one vectorized pass.
+        Args:
+            s0 (float | np.ndarray): Spot price(s) (in $).
+            K (float | np.ndarray): Strike price(s) (in $).
+            r (float | np.ndarray): Annualized risk-free interest rate(s).
+            T (float | np.ndarray): Time(s) to option expiration (in years).
+            sigma (float | np.ndarray | VolSurface): Volatility(ies) of the underlying asset, or a surface evaluated
+                at every (K, T).
+            is_call (bool | np.ndarray): Option type flag(s), True for calls and False for puts.
+        Returns:
+            np.ndarray: Option prices, broadcast over all inputs.
+        """
+        sigma = BSM._resolve_sigma(sigma, K, T)
+        s0, K, r, T, sigma, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (s0, K, r, T, sigma)), np.asarray(is_call, dtype=bool))
+        if kernels.active_backend() == "numba":
+            return kernels.greeks_batch(s0, K, r, T, sigma, is_call, greeks=("price",))["price"]
+        d1, d2 = BSM._compute_d1_d2(s0, K, r, T, sigma)
+        # w = +1 for calls and -1 for puts, so both types share a single pass of cdf evaluations
+        w = np.where(is_call, 1., -1.)
+        # the cdf terms are evaluated in place in the w * d buffers
+        cdf_d1, cdf_d2 = np.multiply(w, d1, out=np.empty(s0.shape)), np.multiply(w, d2, out=np.empty(s0.shape))
+        norm_cdf(cdf_d1, out=cdf_d1)
+        norm_cdf(cdf_d2, out=cdf_d2)
+        return w * (s0 * cdf_d1 - K * np.exp(-r * T) * cdf_d2)
+
     def compute_bsm(self, s0: float, K: float, r: float, T: float, sigma: float, is_call=True) -> float:
         """
 
@@ -136,46 +222,106 @@ class BSM:
         d1 = self._compute_d(s0, K, r, T, sigma)
         d2 = self._compute_d(s0, K, r, T, sigma, False)
         if is_call:
-            return s0 * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+            return s0 * norm_cdf(d1) - K * np.exp(-r * T) * norm_cdf(d2)
         else:
-            return K * np.exp(-r * T) * norm.cdf(-d2) - s0 * norm.cdf(-d1)
+            return K * np.exp(-r * T) * norm_cdf(-d2) - s0 * norm_cdf(-d1)
 
     def compute_greeks(self, s0: float | np.ndarray, K: float, r: float, T: float | np.ndarray, sigma: float, is_call=True):
-        delta = self.compute_delta(s0, K, r, T, sigma, is_call)
-        gamma = self.compute_gamma(s0, K, r, T, sigma)
-        theta = self.compute_theta(s0, K, r, T, sigma, is_call)
-        vega = self.compute_vega(s0, K, r, T, sigma)
-        rho = self.compute_rho(s0, K, r, T, sigma, is_call)
+        greeks = self.compute_greeks_batch(s0, K, r, T, sigma, is_call, greeks=("delta", "gamma", "theta", "vega", "rho"))
+        return tuple(greeks.values())
+
+    @staticmethod
+    @instrument("bsm.compute_greeks_batch", size=lambda result: next(iter(result.values())).size)
+    def compute_greeks_batch(s0: float | np.ndarray, K: float | np.ndarray, r: float | np.ndarray,
+                             T: float | np.ndarray, sigma: float | np.ndarray, is_call: bool | np.ndarray = True,
+                             greeks: tuple[str, ...] = GREEKS) -> dict[str, np.ndarray]:
+        """
+        Compute the price and Greeks of European options in a single fused pass.
+        d1, d2, the normal pdf/cdf terms, sqrt(T) and the discount factor are evaluated once per input array and
+        shared between every requested output; intermediates only needed by Greeks that were not requested are
+        never computed. With the numba backend active (see utils.kernels), one compiled loop computes them instead.
+        Args:
+            s0 (float | np.ndarray): Spot price(s) (in $).
+            K (float | np.ndarray): Strike price(s) (in $).
+            r (float | np.ndarray): Annualized risk-free interest rate(s).
+            T (float | np.ndarray): Time(s) to option expiration (in years).
+            sigma (float | np.ndarray | VolSurface): Volatility(ies) of the underlying asset, or a surface evaluated
+                at every (K, T).
+            is_call (bool | np.ndarray): Option type flag(s), True for calls and False for puts.
+            greeks (tuple[str, ...]): Outputs to compute, any of "price", "delta", "gamma", "theta", "vega", "rho".
+        Returns:
+            dict[str, np.ndarray]: Requested outputs keyed by name, in the requested order.
+        """
+        unknown = set(greeks) - set(BSM.GREEKS)
+        if unknown:
+            raise ValueError(f"Unknown greek(s) {sorted(unknown)}, expected any of {BSM.GREEKS}")
+        requested = set(greeks)
+
+        sigma = BSM._resolve_sigma(sigma, K, T)
+        s0, K, r, T, sigma, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (s0, K, r, T, sigma)), np.asarray(is_call, dtype=bool))
+        if kernels.active_backend() == "numba":
+            return kernels.greeks_batch(s0, K, r, T, sigma, is_call, greeks)
+        w = np.where(is_call, 1., -1.)
+        sqrt_t = np.sqrt(T)
+        sigma_sqrt_t = sigma * sqrt_t
+        d1 = (np.log(s0 / K) + (r + .5 * sigma ** 2) * T) / sigma_sqrt_t
 
-        return delta, gamma, theta, vega, rho
+        if requested & {"gamma", "theta", "vega"}:
+            pdf_d1 = norm_pdf(d1)
+        if requested & {"price", "delta"}:
+            cdf_d1 = np.multiply(w, d1, out=np.empty(s0.shape))
+            norm_cdf(cdf_d1, out=cdf_d1)
+        if requested & {"price", "theta", "rho"}:
+            # K * exp(-rT) * N(w * d2), shared by price, theta and rho
+            discounted_cdf_d2 = np.multiply(w, d1 - sigma_sqrt_t, out=np.empty(s0.shape))
+            norm_cdf(discounted_cdf_d2, out=discounted_cdf_d2)
+            discounted_cdf_d2 *= K * np.exp(-r * T)
+
+        result = {}
+        for name in greeks:
+            if name == "price":
+                result[name] = w * (s0 * cdf_d1 - discounted_cdf_d2)
+            elif name == "delta":
+                result[name] = w * cdf_d1
+            elif name == "gamma":
+                result[name] = pdf_d1 / (s0 * sigma_sqrt_t)
+            elif name == "theta":
+                result[name] = -(s0 * pdf_d1 * sigma) / (2 * sqrt_t) - w * r * discounted_cdf_d2
+            elif name == "vega":
+                result[name] = s0 * sqrt_t * pdf_d1
+            elif name == "rho":
+                result[name] = w * T * discounted_cdf_d2
+        return result
 
 
     def compute_delta(self, s0: float | np.ndarray, K: float, r: float, T: float | np.ndarray, sigma: float, is_call=True):
-        d1 = self._compute_d(s0, K, self.maturity - T, r, sigma)
-        if is_call:
-            return norm.cdf(d1)
-        else:
-            return norm.cdf(d1) - 1
+        # T is the time to expiration, as in the other Greeks, computed by the fused kernel
+        return self._single_greek("delta", s0, K, r, T, sigma, is_call)
 
     def compute_gamma(self, s0: float | np.ndarray, K: float, r: float, T: float | np.ndarray, sigma: float):
-        d1 = self._compute_d(s0, K, self.maturity - T, r, sigma)
-        return norm.pdf(d1) / (s0 * sigma * np.sqrt(T))
+        return self._single_greek("gamma", s0, K, r, T, sigma, True)
+
+    @staticmethod
+    def _single_greek(name: str, s0, K, r, T, sigma, is_call) -> float | np.ndarray:
+        value = BSM.compute_greeks_batch(s0, K, r, T, sigma, is_call, greeks=(name,))[name]
+        return float(value) if value.ndim == 0 else value
 
     def compute_theta(self, s0: float | np.ndarray, K: float, r: float, T: float | np.ndarray, sigma: float, is_call=True):
         d1 = self._compute_d(s0, K, r, T, sigma)
         d2 = self._compute_d(s0, K, r, T, sigma, False)
         if is_call:
-            return -(s0*norm.pdf(d1) * sigma)/(2 * np.sqrt(T)) - r * K * np.exp(-r * T) * norm.cdf(d2)
+            return -(s0*norm_pdf(d1) * sigma)/(2 * np.sqrt(T)) - r * K * np.exp(-r * T) * norm_cdf(d2)
         else:
-            return -(s0*norm.pdf(d1) * sigma)/(2 * np.sqrt(T)) + r * K * np.exp(-r * T) * norm.cdf(-d2)
+            return -(s0*norm_pdf(d1) * sigma)/(2 * np.sqrt(T)) + r * K * np.exp(-r * T) * norm_cdf(-d2)
 
     def compute_vega(self, s0: float | np.ndarray, K: float, r: float, T: float | np.ndarray, sigma: float):
         d1 = self._compute_d(s0, K, r, T, sigma)
-        return s0 * np.sqrt(T) * norm.pdf(d1)
+        return s0 * np.sqrt(T) * norm_pdf(d1)
 
     def compute_rho(self, s0: float | np.ndarray, K: float, r: float, T: float | np.ndarray, sigma: float, is_call=True):
         d2 = self._compute_d(s0, K, r, T, sigma, False)
         if is_call:
-            return K * T * np.exp(-r * T) * norm.cdf(d2)
+            return K * T * np.exp(-r * T) * norm_cdf(d2)
         else:
-            return - K * T * np.exp(-r * T) * norm.cdf(-d2)
+            return - K * T * np.exp(-r * T) * norm_cdf(-d2)
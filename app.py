@@ -1,16 +1,42 @@
+import logging
+from uuid import uuid4
+from flask import Response, jsonify, request
 import dash_mantine_components as dmc
 import dash_bootstrap_components as dbc
 from component.app_layout import sidebar, content
 from dash import Dash, Input, Output, dcc, html, callback, _dash_renderer
+from pages import pricer_layout, delta_sim
 from pages.pricer_layout import create_pricer_layout
 from pages.delta_sim import create_delta_sim_layout
 from pages.greeks_study import create_greek_layout
+from utils import metrics
 _dash_renderer._set_react_version("18.2.0")
 
 
 app = Dash(external_stylesheets=[dbc.themes.BOOTSTRAP] + dmc.styles.ALL)
+metrics.start_profiler()
+# the development server handles each request in a thread of its own, out of reach of the profiler started above
+app.server.wsgi_app = metrics.profile_wsgi(app.server.wsgi_app)
 
-app.layout = dmc.MantineProvider(html.Div([sidebar, content]))
+
+@app.server.route("/metrics")
+def serve_metrics():
+    # Prometheus text format by default, JSON with ?format=json
+    stores = {store.namespace: store.stats() for store in (pricer_layout.data, delta_sim.data)}
+    if request.args.get("format") == "json":
+        return jsonify({**metrics.snapshot(), "model_stores": stores})
+    lines = [f'option_pricer_store_{field}{{namespace="{namespace}"}} {value}'
+             for namespace, stats in stores.items() for field, value in stats.items()]
+    return Response(metrics.to_prometheus() + "\n".join(lines) + "\n", mimetype="text/plain")
+
+
+def serve_layout():
+    # each page load gets its own session id, used to key the models stored by the pages
+    session_id = dcc.Store(id="session_id", data=str(uuid4()), storage_type="session")
+    return dmc.MantineProvider(html.Div([session_id, sidebar, content]))
+
+
+app.layout = serve_layout
 
 
 @callback(
@@ -28,5 +54,6 @@ def update_layout(tab_name):
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     app.title = "BSM Option Pricer"
     app.run()#debug=True)
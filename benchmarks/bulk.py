@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from BSM import BSM
+from bulk import HAS_PYARROW, BatchWriter, price_file
+
+
+def write_chain(path: str, n_rows: int, batch_size: int = 100_000, seed: int = 0) -> None:
+    """
+    Synthetic end-of-day chain with market prices and option types, written batch by batch.
+    """
+    rng = np.random.default_rng(seed)
+    with BatchWriter(path) as writer:
+        for start in range(0, n_rows, batch_size):
+            n = min(batch_size, n_rows - start)
+            spot = rng.uniform(20, 500, n)
+            strike = spot * rng.uniform(.7, 1.3, n)
+            maturity = rng.uniform(.02, 2, n)
+            is_call = rng.random(n) < .5
+            price = BSM.compute_bsm_batch(spot, strike, .03, maturity, rng.uniform(.1, .6, n), is_call)
+            writer.write({"spot": spot, "strike": strike, "rate": np.full(n, .03), "maturity": maturity,
+                          "market_price": price, "option_type": np.where(is_call, "C", "P")})
+
+
+def run(n_rows: int = 1_000_000, batch_size: int = 65_536):
+    root = tempfile.mkdtemp()
+    formats = ("parquet", "arrow", "csv") if HAS_PYARROW else ("csv",)
+    try:
+        for fmt in formats:
+            src, dst = os.path.join(root, f"chain.{fmt}"), os.path.join(root, f"priced.{fmt}")
+            write_chain(src, n_rows)
+            stats = price_file(src, dst, batch_size)
+            print(f"{fmt:>8}: {stats['rows']:,} rows ({os.path.getsize(src) / 2 ** 20:,.0f}MB) in {stats['seconds']:.2f}s"
+                  f" | {stats['rows_per_s']:>10,.0f} rows/s end to end | "
+                  f"{stats['rows'] / stats['compute_s']:>10,.0f} rows/s in the kernels"
+                  + (f" | peak RSS {stats['peak_rss_mb']:,.0f}MB" if "peak_rss_mb" in stats else ""))
+        if not HAS_PYARROW:
+            print("pyarrow is not installed, only the CSV fallback was benchmarked")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,45 @@
+import time
+import numpy as np
+from utils.grid_cache import PriceGridCache, snap_axis
+
+
+def drag(cache: PriceGridCache, ranges: list[tuple[float, float]], n: int, sigma_range: tuple[float, float],
+         K: float = 105., r: float = .03, T: float = 1.) -> float:
+    """
+    Replay a sequence of spot ranges, as when dragging the slider, and return the mean latency per move.
+    """
+    sigmas = snap_axis(*sigma_range, n)
+    start = time.perf_counter()
+    for lo, hi in ranges:
+        cache.get(snap_axis(lo, hi, n), sigmas, K, r, T)
+    return (time.perf_counter() - start) / len(ranges)
+
+
+def run(n: int = 50):
+    scenarios = {
+        "drag max 120->130": [(100, hi) for hi in range(120, 131)],
+        "drag min 80->100": [(lo, 130) for lo in range(80, 101)],
+        "shift window": [(lo, lo + 20) for lo in range(80, 121)],
+    }
+    for name, ranges in scenarios.items():
+        for size in (10, n):
+            cache = PriceGridCache()
+            latency = drag(cache, ranges, size, (.2, .5))
+            stats = cache.stats()
+            # the first move is cold, so a perfect cache computes exactly one grid
+            print(f"{name:<20} n={size:<3} {len(ranges)} moves | computed {stats['computed_cells']:>6} cells, "
+                  f"reused {stats['reused_cells']:>6} | hit ratio {stats['hit_ratio']:.1%} | "
+                  f"{latency * 1e3:.3f}ms per move")
+
+    # the cached grid is the exact BSM grid of the snapped axes
+    from BSM import BSM
+    cache = PriceGridCache()
+    spots, sigmas = snap_axis(100, 130, n), snap_axis(.2, .5, n)
+    cache.get(snap_axis(100, 120, n), sigmas, 105., .03, 1.)
+    call, put = cache.get(spots, sigmas, 105., .03, 1.)
+    expected_call, expected_put = BSM.compute_call_put_batch(spots[np.newaxis, :], 105., .03, 1., sigmas[:, np.newaxis])
+    print(f"Max deviation from direct pricing: {max(np.abs(call - expected_call).max(), np.abs(put - expected_put).max()):.2e}")
+
+
+if __name__ == "__main__":
+    run()
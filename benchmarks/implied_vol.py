@@ -0,0 +1,54 @@
+import time
+import numpy as np
+from BSM import BSM
+from scipy.optimize import brentq
+from implied_vol import ImpliedVolSolver
+
+
+def generate_quotes(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    s0 = np.full(n, 100.)
+    K = rng.uniform(60, 140, n)
+    r = np.full(n, .03)
+    T = rng.uniform(.05, 2, n)
+    sigma = rng.uniform(.05, 1., n)
+    is_call = rng.random(n) < .5
+    price = BSM.compute_bsm_batch(s0, K, r, T, sigma, is_call)
+    return price, s0, K, r, T, sigma, is_call
+
+
+def solve_scalar(price, s0, K, r, T, is_call):
+    """
+    Baseline: one scipy root-finder call per quote on the scalar BSM pricer.
+    """
+    bsm = BSM()
+    result = np.full(price.shape, np.nan)
+    for i in range(price.size):
+        try:
+            result[i] = brentq(lambda sigma: bsm.compute_bsm(s0[i], K[i], r[i], T[i], sigma, is_call[i]) - price[i],
+                               1e-6, 10., xtol=1e-12)
+        except ValueError:
+            pass
+    return result
+
+
+def run(n_vectorized: int = 100_000, n_scalar: int = 2_000):
+    price, s0, K, r, T, sigma, is_call = generate_quotes(n_vectorized)
+
+    start = time.perf_counter()
+    iv, n_iter, failed = ImpliedVolSolver().solve(price, s0, K, r, T, is_call)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    iv_scalar = solve_scalar(*(x[:n_scalar] for x in (price, s0, K, r, T, is_call)))
+    scalar = time.perf_counter() - start
+
+    print(f"Vectorized solver: {n_vectorized} quotes in {vectorized:.3f}s "
+          f"({n_vectorized / vectorized:,.0f} quotes/s, max {n_iter.max()} iterations, {failed.sum()} failed)")
+    print(f"Scalar brentq:     {n_scalar} quotes in {scalar:.3f}s ({n_scalar / scalar:,.0f} quotes/s)")
+    print(f"Speedup: {(n_vectorized / vectorized) / (n_scalar / scalar):.0f}x")
+    print(f"Max |vectorized - scalar| on shared quotes: {np.nanmax(np.abs(iv[:n_scalar] - iv_scalar)):.2e}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,40 @@
+import time
+import numpy as np
+from BSM import BSM
+from utils import kernels
+
+
+def run(n_contracts: int = 1_000_000, n_paths: int = 10_000, n_steps: int = 252, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    args = (rng.uniform(50, 150, n_contracts), rng.uniform(50, 150, n_contracts), rng.uniform(0, .1, n_contracts),
+            rng.uniform(.05, 3, n_contracts), rng.uniform(.1, .6, n_contracts), rng.random(n_contracts) < .5)
+    model = BSM()
+    model.initialize_bsm(100., 105., 1., .03, .2)
+
+    backends = ("numpy", "numba") if kernels.HAS_NUMBA else ("numpy",)
+    results = {}
+    for backend in backends:
+        kernels.set_backend(backend)
+        # warm-up, which also loads (or compiles) the numba kernels
+        BSM.compute_greeks_batch(*(x[:10] for x in args))
+        model.simulate_spot_price(10, "Daily", n_steps, np.random.default_rng(seed))
+
+        start = time.perf_counter()
+        results[backend] = BSM.compute_greeks_batch(*args)
+        greeks_time = time.perf_counter() - start
+        start = time.perf_counter()
+        model.simulate_spot_price(n_paths, "Daily", n_steps, np.random.default_rng(seed))
+        paths_time = time.perf_counter() - start
+        print(f"{backend:>5}: greeks of {n_contracts:,} contracts in {greeks_time * 1e3:.0f}ms | "
+              f"{n_paths:,} x {n_steps} paths in {paths_time * 1e3:.0f}ms")
+    kernels.set_backend("auto")
+
+    if len(results) == 2:
+        error = max(np.abs(results["numba"][name] - results["numpy"][name]).max() for name in BSM.GREEKS)
+        print(f"Max abs difference between backends: {error:.2e}")
+    else:
+        print("numba is not installed, only the numpy backend was run")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,35 @@
+import time
+import numpy as np
+from BSM import BSM
+from lattice import Lattice
+
+
+def run_convergence(steps: tuple[int, ...] = (50, 100, 200, 500, 1000, 2000)):
+    s0, K, r, T, sigma = 100., 105., .05, 1., .2
+    exact = BSM.compute_greeks_batch(s0, K, r, T, sigma, False, greeks=("price", "delta", "gamma", "theta"))
+    for method in Lattice.METHODS:
+        for n in steps:
+            greeks = Lattice(n, method).compute_greeks(s0, K, r, T, sigma, False, False)
+            errors = " | ".join(f"{name} {abs(greeks[name] - exact[name]):.2e}" for name in exact)
+            print(f"{method:>9} n={n:>5}: European put errors vs closed form - {errors}")
+
+
+def run_timing(n_steps: int = 2000, n_contracts: int = 100):
+    for method in Lattice.METHODS:
+        lattice = Lattice(n_steps, method)
+        lattice.compute_price(100., 100., .05, 1., .2, False, True)
+        start = time.perf_counter()
+        price = lattice.compute_price(100., 100., .05, 1., .2, False, True)
+        single = time.perf_counter() - start
+
+        strikes = np.linspace(80, 120, n_contracts)
+        start = time.perf_counter()
+        lattice.compute_price(100., strikes, .05, 1., .2, False, True)
+        batch = time.perf_counter() - start
+        print(f"{method:>9}: {n_steps}-step American put {float(price):.6f} in {single * 1e3:.2f}ms | "
+              f"batch of {n_contracts} in {batch * 1e3:.1f}ms ({batch / n_contracts * 1e3:.2f}ms per contract)")
+
+
+if __name__ == "__main__":
+    run_convergence()
+    run_timing()
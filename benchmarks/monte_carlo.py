@@ -0,0 +1,47 @@
+import time
+import numpy as np
+from BSM import BSM
+from monte_carlo import MonteCarlo
+
+
+def run(n_paths: int = 10_000_000, chunk_size: int = 500_000, seed: int = 42):
+    s0, K, r, T, sigma = 100., 105., .05, 1., .2
+    bsm = BSM()
+    for dtype in (np.float64, np.float32):
+        for is_call in (True, False):
+            engine = MonteCarlo(s0, r, sigma, dtype=dtype, seed=seed)
+            start = time.perf_counter()
+            price, std_err = engine.compute_option_price(K, T, n_paths, is_call, chunk_size)
+            elapsed = time.perf_counter() - start
+            exact = bsm.compute_bsm(s0, K, r, T, sigma, is_call)
+            print(f"{np.dtype(dtype).name} {'call' if is_call else 'put '}: MC {price:.4f} ± {std_err:.4f} "
+                  f"vs closed form {exact:.4f} (z = {(price - exact) / std_err:+.2f}) "
+                  f"- {n_paths:,} paths in {elapsed:.2f}s")
+
+    engine = MonteCarlo(s0, r, sigma, seed=seed)
+    start = time.perf_counter()
+    paths = engine.generate_paths(10_000, 252, T)
+    print(f"Path matrix {paths.shape} generated in {time.perf_counter() - start:.3f}s")
+
+
+def run_variance_reduction(n_paths: int = 2 ** 16, n_steps: int = 64, seed: int = 42):
+    s0, K, r, T, sigma = 100., 105., .05, 1., .2
+    exact = BSM().compute_bsm(s0, K, r, T, sigma)
+    payoffs = {
+        "European call": (lambda paths: np.maximum(paths[:, -1] - K, 0), 1),
+        "Asian call": (lambda paths: np.maximum(paths[:, 1:].mean(axis=1) - K, 0), n_steps),
+    }
+    for name, (payoff, steps) in payoffs.items():
+        for method in MonteCarlo.METHODS:
+            engine = MonteCarlo(s0, r, sigma, seed=seed)
+            start = time.perf_counter()
+            price, std_err = engine.compute_price(payoff, T, n_paths, steps, method=method)
+            elapsed = time.perf_counter() - start
+            reference = f" (closed form {exact:.4f})" if name == "European call" else ""
+            print(f"{name} [{method}]: {price:.4f} ± {std_err:.5f}{reference} - "
+                  f"variance reduction {engine.variance_reduction:,.1f}x in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    run()
+    run_variance_reduction()
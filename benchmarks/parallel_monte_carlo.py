@@ -0,0 +1,27 @@
+import os
+import time
+from parallel_monte_carlo import ParallelMonteCarlo
+
+
+def run(n_paths: int = 20_000_000, n_steps: int = 1, seed: int = 42):
+    """
+    Throughput of the process-pool engine for an increasing number of workers, with the shard count fixed so that
+    every run returns the exact same estimate.
+    """
+    max_workers = os.cpu_count()
+    n_workers = sorted({1, 2, 4, 8, 16, 32, max_workers} & set(range(1, max_workers + 1)))
+    baseline = None
+    for workers in n_workers:
+        with ParallelMonteCarlo(100., .05, .2, n_workers=workers, seed=seed) as engine:
+            # warm-up call, so that the timed one runs on an already started pool
+            engine.compute_option_price(105., 1., max_workers, n_shards=max_workers)
+            start = time.perf_counter()
+            price, std_err = engine.compute_option_price(105., 1., n_paths, n_shards=max_workers)
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>2} worker(s): {price:.6f} ± {std_err:.6f} - {n_paths / elapsed:,.0f} paths/s "
+              f"(speedup {baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,41 @@
+import time
+import shutil
+import tempfile
+import numpy as np
+from monte_carlo import MonteCarlo
+from utils.path_store import PathStore
+
+
+def run(n_paths: int = 2_000_000, n_steps: int = 64, chunk_bytes: int = 64 * 2 ** 20):
+    root = tempfile.mkdtemp()
+    store = PathStore(root)
+    engine = MonteCarlo(100., .03, .2)
+    try:
+        start = time.perf_counter()
+        dataset_id = store.simulate_paths(engine, n_paths, n_steps, 1., seed=0, chunk_bytes=chunk_bytes,
+                                          dtype=np.float32)
+        elapsed = time.perf_counter() - start
+        size = store.datasets()[0]["bytes"]
+        print(f"{n_paths:,} x {n_steps + 1} paths written in {elapsed:.2f}s ({size / elapsed / 2 ** 20:,.0f} MiB/s)")
+
+        start = time.perf_counter()
+        store.simulate_paths(engine, n_paths, n_steps, 1., seed=0, chunk_bytes=chunk_bytes, dtype=np.float32)
+        print(f"Identical simulation reused in {(time.perf_counter() - start) * 1e3:.2f}ms")
+
+        dataset = store.open(dataset_id)
+        start = time.perf_counter()
+        block = dataset["paths"][n_paths // 2:n_paths // 2 + 1_000]
+        print(f"Random 1,000-path slice mapped in {(time.perf_counter() - start) * 1e6:.0f}us, "
+              f"mean terminal spot {block[:, -1].mean():.4f}")
+
+        start = time.perf_counter()
+        terminal = sum(float(chunk[:, -1].sum(dtype=np.float64)) for chunk in dataset.iter_chunks("paths"))
+        elapsed = time.perf_counter() - start
+        print(f"Streamed over the dataset in {elapsed:.2f}s ({size / elapsed / 2 ** 20:,.0f} MiB/s), "
+              f"E[S_T] {terminal / n_paths:.4f} (expected {100 * np.exp(.03):.4f})")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run()
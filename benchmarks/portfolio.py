@@ -0,0 +1,43 @@
+import time
+import numpy as np
+from BSM import BSM
+from portfolio import Portfolio
+
+
+def make_book(n_positions: int, n_underlyings: int = 500, seed: int = 0) -> tuple[Portfolio, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    spots = rng.uniform(20, 500, n_underlyings)
+    underlying = rng.integers(0, n_underlyings, n_positions)
+    book = Portfolio(
+        underlying=underlying,
+        K=spots[underlying] * rng.uniform(.7, 1.3, n_positions),
+        T=rng.uniform(.01, 3, n_positions),
+        quantity=rng.integers(-100, 101, n_positions),
+        is_call=rng.random(n_positions) < .5,
+        sigma=rng.uniform(.1, .6, n_positions),
+    )
+    return book, spots
+
+
+def run(n_positions: int = 1_000_000, r: float = .03, n_repeats: int = 5):
+    book, spots = make_book(n_positions)
+    book.aggregate(spots, r)
+    start = time.perf_counter()
+    for _ in range(n_repeats):
+        risk = book.aggregate(spots, r)
+    elapsed = (time.perf_counter() - start) / n_repeats
+    print(f"{n_positions:,} positions on {len(spots)} underlyings aggregated in {elapsed * 1e3:.0f}ms")
+
+    # check against a per-position valuation of a subset
+    subset = np.flatnonzero(book.underlying == 0)
+    greeks = BSM.compute_greeks_batch(spots[0], book.K[subset], r, book.T[subset], book.sigma[subset],
+                                      book.is_call[subset])
+    for name, value in greeks.items():
+        expected = (value * book.quantity[subset]).sum()
+        print(f"{name:>6}: underlying 0 {risk[name]['by_underlying'][0]:>16,.4f} (direct {expected:,.4f}) | "
+              f"book total {risk[name]['total']:>20,.2f}")
+    print("Delta by expiry:", dict(zip(book.bucket_labels(), np.round(risk["delta"]["by_expiry"], 1).tolist())))
+
+
+if __name__ == "__main__":
+    run()
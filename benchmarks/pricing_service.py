@@ -0,0 +1,53 @@
+import json
+import time
+import asyncio
+import numpy as np
+from BSM import BSM
+from service import PricingService
+
+
+async def client(port: int, n_requests: int, kind: str, seed: int) -> None:
+    """
+    Closed-loop client sending one request at a time and waiting for its answer.
+    """
+    rng = np.random.default_rng(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for i in range(n_requests):
+        request = {"id": i, "type": kind, "s0": 100., "K": float(rng.uniform(80, 120)), "r": .03,
+                   "T": float(rng.uniform(.1, 2)), "is_call": bool(rng.random() < .5)}
+        sigma = float(rng.uniform(.1, .5))
+        if kind == "implied_vol":
+            request["price"] = float(BSM.compute_bsm_batch(request["s0"], request["K"], request["r"], request["T"],
+                                                               sigma, request["is_call"]))
+        else:
+            request["sigma"] = sigma
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        assert response["id"] == i and "result" in response, response
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load(window: float, max_batch: int, n_clients: int, n_requests: int, kind: str, port: int) -> dict:
+    service = PricingService(window, max_batch)
+    server = await service.start(port=port)
+    async with server:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(port, n_requests, kind, seed) for seed in range(n_clients)))
+        elapsed = time.perf_counter() - start
+    metrics = service.metrics.snapshot()
+    metrics["throughput"] = n_clients * n_requests / elapsed
+    return metrics
+
+
+def run(n_clients: int = 256, n_requests: int = 40, port: int = 8799):
+    for kind in ("price", "greeks", "implied_vol"):
+        for label, window, max_batch in (("unbatched", 0., 1), ("batched", .001, 4096)):
+            m = asyncio.run(load(window, max_batch, n_clients, n_requests, kind, port))
+            print(f"{kind:>11} {label:>9}: {m['throughput']:>8,.0f} req/s | p50 {m['latency_p50_ms']:.2f}ms "
+                  f"p99 {m['latency_p99_ms']:.2f}ms | mean batch {m['mean_batch_size']:.1f}")
+
+
+if __name__ == "__main__":
+    run()
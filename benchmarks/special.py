@@ -0,0 +1,37 @@
+import timeit
+import numpy as np
+from scipy.stats import norm
+from utils.special import norm_cdf, norm_pdf
+
+
+def check_accuracy(tol: float = 1e-14):
+    """
+    Compare the normal cdf/pdf kernels with scipy.stats.norm, on arrays and through the scalar fast path.
+    """
+    x = np.linspace(-40, 40, 400_001)
+    errors = {
+        "cdf (array)": np.max(np.abs(norm_cdf(x) - norm.cdf(x))),
+        "pdf (array)": np.max(np.abs(norm_pdf(x) - norm.pdf(x))),
+        "cdf (scalar)": max(abs(norm_cdf(v) - norm.cdf(v)) for v in x[::100].tolist()),
+        "pdf (scalar)": max(abs(norm_pdf(v) - norm.pdf(v)) for v in x[::100].tolist()),
+    }
+    for name, error in errors.items():
+        print(f"{name}: max abs error {error:.2e}")
+        assert error <= tol, f"{name} error {error:.2e} above {tol:.0e}"
+
+
+def run(sizes: tuple[int, ...] = (1, 50, 10_000, 1_000_000)):
+    for size in sizes:
+        x = 1.3 if size == 1 else np.linspace(-5, 5, size)
+        out = None if size == 1 else np.empty(size)
+        number = max(5, 5_000 // size)
+        for name, fast, reference in (("cdf", norm_cdf, norm.cdf), ("pdf", norm_pdf, norm.pdf)):
+            t_ref = min(timeit.repeat(lambda: reference(x), number=number, repeat=3)) / number
+            t_fast = min(timeit.repeat(lambda: fast(x, out=out), number=number, repeat=3)) / number
+            print(f"{name} n={size:>9,}: scipy.stats.norm {t_ref * 1e6:10.2f}us | utils.special {t_fast * 1e6:10.2f}us "
+                  f"| speedup {t_ref / t_fast:.1f}x")
+
+
+if __name__ == "__main__":
+    check_accuracy()
+    run()
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# cold start of a worker: import the app, then serve the index, layout and callback graph, as on a first page load
+FIRST_RESPONSE = """
+import app
+client = app.app.server.test_client()
+for url in ("/", "/_dash-layout", "/_dash-dependencies"):
+    assert client.get(url).status_code == 200, url
+"""
+
+
+def import_report(module: str = "app", top: int = 15) -> list[tuple[str, float, float]]:
+    """
+    Parse the `python -X importtime` report of a cold import.
+    Returns:
+        list[tuple[str, float, float]]: The top (module, self ms, cumulative ms) entries by cumulative time.
+    """
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(self_us) / 1e3, int(cumulative_us) / 1e3))
+    return sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+
+
+def time_to_first_response() -> float:
+    """
+    Wall time (in seconds) from spawning a fresh interpreter to the first page load being served.
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", FIRST_RESPONSE], cwd=ROOT, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def run(n_runs: int = 3):
+    print("Slowest imports of `import app` (cumulative):")
+    for name, self_ms, cumulative_ms in import_report():
+        print(f"{name:<45} self {self_ms:>8.1f}ms | cumulative {cumulative_ms:>8.1f}ms")
+    times = [time_to_first_response() for _ in range(n_runs)]
+    print(f"Time to first response: best {min(times):.2f}s over {n_runs} cold starts")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,61 @@
+import os
+import time
+import asyncio
+import tempfile
+import numpy as np
+from BSM import BSM
+from streaming import StreamingPricer, replay_ticks, areplay_ticks
+
+
+def write_ticks(path: str, n_ticks: int, s0: float = 100., sigma: float = .2, seed: int = 0) -> None:
+    """
+    Write a random walk of one-second spot ticks to a replay file.
+    """
+    rng = np.random.default_rng(seed)
+    dt = 1 / (252 * 6.5 * 3600)
+    spots = s0 * np.exp(np.cumsum(sigma * np.sqrt(dt) * rng.standard_normal(n_ticks)))
+    np.savetxt(path, np.column_stack((np.arange(n_ticks, dtype=float), spots)), delimiter=",", fmt="%.10g")
+
+
+def make_book(n_contracts: int, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "K": rng.uniform(70, 130, n_contracts),
+        "T": rng.uniform(.05, 2, n_contracts),
+        "r": np.full(n_contracts, .03),
+        "sigma": rng.uniform(.1, .6, n_contracts),
+        "is_call": rng.random(n_contracts) < .5,
+    }
+
+
+def run(n_contracts: int = 10_000, n_ticks: int = 2_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ticks.csv")
+        write_ticks(path, n_ticks)
+        book = make_book(n_contracts)
+
+        pricer = StreamingPricer(**book)
+        start = time.perf_counter()
+        for _ in pricer.run(replay_ticks(path)):
+            pass
+        elapsed = time.perf_counter() - start
+        exact = BSM.compute_bsm_batch(pricer.last_spot, book["K"], book["r"], book["T"], book["sigma"], book["is_call"])
+        print(f"{pricer.n_updates:,} contract-updates in {elapsed:.2f}s ({pricer.n_updates / elapsed:,.0f}/s), "
+              f"{pricer.n_full / pricer.n_updates:.2%} fully repriced, "
+              f"max price error vs closed form {np.abs(pricer.price - exact).max():.2e}")
+
+        async def consume():
+            async_pricer = StreamingPricer(**book)
+            async for _ in async_pricer.arun(areplay_ticks(path)):
+                pass
+            return async_pricer
+
+        start = time.perf_counter()
+        async_pricer = asyncio.run(consume())
+        elapsed = time.perf_counter() - start
+        print(f"async: {async_pricer.n_updates:,} contract-updates in {elapsed:.2f}s "
+              f"({async_pricer.n_updates / elapsed:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    run()
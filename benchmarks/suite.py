@@ -0,0 +1,248 @@
+import os
+import re
+import sys
+import json
+import time
+import timeit
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# name -> (factory, params), a factory building the zero-argument callable timed for one parameter value
+WORKLOADS: dict[str, tuple] = {}
+
+
+def workload(name: str, params: tuple = (None,)):
+    """
+    Register a parameterized workload. The decorated factory does the setup for one parameter value and returns
+    the callable to time, so that setup cost stays out of the measurement. A "stats" attribute on that callable,
+    returning a dict, adds its values to the results of the workload (e.g. a cache hit ratio).
+    """
+    def register(factory):
+        WORKLOADS[name] = (factory, params)
+        return factory
+    return register
+
+
+def _contracts(n: int, seed: int = 0) -> tuple[np.ndarray, ...]:
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(50, 150, n), rng.uniform(50, 150, n), rng.uniform(0, .1, n), rng.uniform(.05, 3, n),
+            rng.uniform(.1, .6, n), rng.random(n) < .5)
+
+
+def _model():
+    from BSM import BSM
+    model = BSM()
+    model.initialize_bsm(100., 105., 1., .03, .2)
+    return model
+
+
+@workload("compute_bsm_scalar")
+def bench_compute_bsm_scalar(_):
+    model = _model()
+    return lambda: model.compute_bsm(100., 105., .03, 1., .2, True)
+
+
+@workload("compute_bsm_batch", params=(1_000, 100_000, 1_000_000))
+def bench_compute_bsm_batch(n):
+    from BSM import BSM
+    args = _contracts(n)
+    return lambda: BSM.compute_bsm_batch(*args)
+
+
+@workload("compute_greeks", params=(100, 10_000, 1_000_000))
+def bench_compute_greeks(n):
+    from BSM import BSM
+    args = _contracts(n)
+    return lambda: BSM.compute_greeks_batch(*args)
+
+
+@workload("draw_options_heat_maps", params=(10, 50, 200))
+def bench_draw_options_heat_maps(hm_size):
+    from pages import pricer_layout
+    from utils.grid_cache import PriceGridCache
+
+    def run():
+        # cold cache, so that every call prices the whole grid
+        pricer_layout.grid_cache = PriceGridCache()
+        pricer_layout.draw_options_heat_maps(hm_size, [100, 110], [.2, .5], 1., 105., .03)
+    return run
+
+
+@workload("compute_spot_price", params=(252, 2_520))
+def bench_compute_spot_price(n):
+    model = _model()
+    return lambda: model.compute_spot_price("Daily", n)
+
+
+@workload("simulate_spot_price", params=(1_000, 10_000))
+def bench_simulate_spot_price(n_paths):
+    model = _model()
+    rng = np.random.default_rng(0)
+    return lambda: model.simulate_spot_price(n_paths, "Daily", 252, rng)
+
+
+@workload("callback_page_hedging_table", params=(52, 252))
+def bench_callback_page_hedging_table(period):
+    from pages.delta_sim import HEDGING_PAGE_SIZE, jobs, page_hedging_table, submit_hedging_job
+    job = submit_hedging_job(_model(), 100, True, 0., period, "Daily")
+    while jobs.status(job["job_id"])["status"] == "running":
+        time.sleep(.005)
+    request = {"startRow": 0, "endRow": HEDGING_PAGE_SIZE}
+    # one page of the sample path table, as requested by the grid when the results are first shown
+    return lambda: page_hedging_table(request, job)
+
+
+@workload("draw_spot_simulation", params=(252, 2_520, 25_200))
+def bench_draw_spot_simulation(period):
+    from pages.delta_sim import draw_spot_simulation
+    spot = _model().simulate_spot_price(1, "Daily", period, np.random.default_rng(0))[0]
+    # decimated and sent as typed arrays above MAX_POINTS points
+    return lambda: draw_spot_simulation(spot, period).to_json()
+
+
+@workload("callback_run_bsm")
+def bench_callback_run_bsm(_):
+    from pages.pricer_layout import run_bsm
+    return lambda: run_bsm(100, 105, 1, .03, 20, "benchmark-session", 1)
+
+
+@workload("callback_update_heat_maps", params=(10, 50))
+def bench_callback_update_heat_maps(hm_size):
+    from pages import pricer_layout
+    from pages.pricer_layout import run_bsm, update_heat_maps
+    from utils.grid_cache import PriceGridCache
+    pricer_layout.grid_cache = PriceGridCache()
+    run_bsm(100, 105, 1, .03, 20, "benchmark-session", 1)
+    spot_range = [100, 110]
+
+    def run():
+        # move the end of the spot range, as when dragging the slider
+        spot_range[1] += 1
+        update_heat_maps(hm_size, spot_range, [.2, .5], "benchmark-session")
+    run.stats = lambda: {"hit_ratio": pricer_layout.grid_cache.stats()["hit_ratio"]}
+    return run
+
+
+@workload("callback_run_simulation", params=(52, 252))
+def bench_callback_run_simulation(period):
+    from pages.delta_sim import run_simulation, poll_simulation
+
+    def run():
+        # submit the background job, then poll it until the final results are rendered
+        job, _ = run_simulation(100, 105, 1, .03, 20, "Call", 100, period, "Daily", 0., "benchmark-session", 1)
+        while not poll_simulation(0, job)[-1]:
+            time.sleep(.005)
+    return run
+
+
+@workload("data_manager_round_trip", params=("memory", "sqlite"))
+def bench_data_manager_round_trip(backend):
+    from utils.data import DataManager
+    path = os.path.join(tempfile.mkdtemp(), "store.db") if backend == "sqlite" else None
+    manager = DataManager("benchmark", backend_path=path)
+    model = _model()
+
+    def run():
+        manager.dump_data("benchmark-session", model)
+        manager.load_data("benchmark-session")
+    return run
+
+
+@workload("startup_time_to_first_response")
+def bench_startup(_):
+    from benchmarks.startup import time_to_first_response
+    return time_to_first_response
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure(fn, repeat: int = 5, min_time: float = .05) -> dict[str, float | int]:
+    """
+    Time a callable timeit-style: the number of calls per sample is calibrated so that a sample lasts at least
+    min_time, and the per-call min and median over repeat samples are reported.
+    """
+    fn()
+    number = 1
+    while (elapsed := timeit.timeit(fn, number=number)) < min_time and number < 1_000_000:
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    samples = np.array(timeit.repeat(fn, number=number, repeat=repeat)) / number
+    return {"min": float(samples.min()), "median": float(np.median(samples)), "number": number, "repeat": repeat}
+
+
+def run(pattern: str = ".*", repeat: int = 5, min_time: float = .05) -> dict:
+    results = {}
+    for name, (factory, params) in WORKLOADS.items():
+        for param in params:
+            key = name if param is None else f"{name}[{param}]"
+            if not re.search(pattern, key):
+                continue
+            fn = factory(param)
+            results[key] = measure(fn, repeat, min_time)
+            extra = fn.stats() if hasattr(fn, "stats") else {}
+            results[key].update(extra)
+            print(f"{key:<40} min {results[key]['min'] * 1e3:>10.3f}ms | median {results[key]['median'] * 1e3:>10.3f}ms"
+                  + "".join(f" | {name} {value:.3g}" for name, value in extra.items()))
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 1.25) -> list[str]:
+    """
+    Compare the per-call minimum times of two runs.
+    Returns:
+        list[str]: Workloads slower than threshold times their baseline.
+    """
+    regressions = []
+    for key, result in current["results"].items():
+        if key not in baseline["results"]:
+            continue
+        ratio = result["min"] / baseline["results"][key]["min"]
+        flag = "REGRESSION" if ratio > threshold else ("improved" if ratio < 1 / threshold else "")
+        print(f"{key:<40} {ratio:>6.2f}x baseline {flag}")
+        if ratio > threshold:
+            regressions.append(key)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite of the option pricer")
+    parser.add_argument("--filter", default=".*", help="Regex selecting the workloads to run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=.05, help="Minimum duration of a sample in seconds")
+    parser.add_argument("--output", default=None, help="Result file, benchmarks/results/<commit>.json by default")
+    parser.add_argument("--compare", default=None, help="Baseline result file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio flagged as a regression")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    current = run(args.filter, args.repeat, args.min_time)
+    output = args.output or os.path.join(RESULTS_DIR, f"{current['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(current, json.load(f), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold}x: {', '.join(regressions)}")
+            sys.exit(1)
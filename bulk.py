@@ -0,0 +1,259 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from typing import Any, Iterator
+import numpy as np
+from BSM import BSM
+from implied_vol import ImpliedVolSolver
+from utils.metrics import timer
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    # Unix only, the peak RSS statistic being skipped elsewhere
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger("BulkPricer")
+
+FORMATS = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow",
+           ".csv": "csv"}
+# accepted input column names of each contract parameter, the first one present being used
+COLUMNS = {
+    "s0": ("s0", "spot", "underlying_price"),
+    "K": ("K", "strike"),
+    "r": ("r", "rate", "risk_free_rate"),
+    "T": ("T", "maturity", "time_to_expiry"),
+    "sigma": ("sigma", "volatility", "vol"),
+    "price": ("price", "market_price", "mid"),
+    "is_call": ("is_call", "option_type", "type"),
+}
+
+
+def chain_format(path: str, fmt: str | None = None) -> str:
+    fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in ("parquet", "arrow", "csv"):
+        raise ValueError(f"Unknown format of {path}, expected one of {sorted(set(FORMATS.values()))}")
+    if fmt != "csv" and not HAS_PYARROW:
+        raise ImportError(f"Reading and writing {fmt} files requires pyarrow to be installed")
+    return fmt
+
+
+def read_batches(path: str, batch_size: int = 65_536, fmt: str | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Stream an option chain file as record batches of at most batch_size rows, so that memory stays bounded by the
+    batch size whatever the file size. Arrow files are memory-mapped and their batches read zero-copy.
+    Args:
+        path (str): Parquet, Arrow IPC (Feather v2) or CSV file.
+        batch_size (int): Maximum number of rows per batch.
+        fmt (str | None): File format, inferred from the extension if None.
+    Returns:
+        Iterator[dict[str, Any]]: Batches as column name -> column (pyarrow or NumPy array) dicts.
+    """
+    fmt = chain_format(path, fmt)
+    if not HAS_PYARROW:
+        import pandas as pd
+        for frame in pd.read_csv(path, chunksize=batch_size):
+            yield {name: frame[name].to_numpy() for name in frame.columns}
+        return
+
+    if fmt == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+    elif fmt == "arrow":
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    else:
+        batches = pa_csv.open_csv(path, read_options=pa_csv.ReadOptions(block_size=batch_size * 64))
+    # file batches (e.g. Arrow batches or CSV blocks) do not line up with batch_size: they are split, and their
+    # leftovers joined to the next ones, so that every batch but the last has exactly batch_size rows
+    pending, n_pending = [], 0
+    for batch in batches:
+        pending.append(batch)
+        n_pending += batch.num_rows
+        while n_pending >= batch_size:
+            table = pa.Table.from_batches(pending)
+            yield _batch_columns(table.slice(0, batch_size))
+            rest = table.slice(batch_size)
+            pending, n_pending = rest.to_batches(), rest.num_rows
+    if n_pending:
+        yield _batch_columns(pa.Table.from_batches(pending))
+
+
+def _batch_columns(table: "pa.Table") -> dict[str, Any]:
+    # one chunk per column, only copied when the rows span several file batches
+    table = table.combine_chunks()
+    return {name: column.chunk(0) for name, column in zip(table.column_names, table.columns)}
+
+
+class BatchWriter:
+
+    def __init__(self, path: str, fmt: str | None = None):
+        """
+        Columnar writer appending record batches to a Parquet, Arrow IPC or CSV file, opened on the first batch,
+        whose schema it takes. NumPy columns are wrapped into Arrow arrays without copy where their dtype allows.
+        Args:
+            path (str): Output file.
+            fmt (str | None): File format, inferred from the extension if None.
+        """
+        self.path = path
+        self.fmt = chain_format(path, fmt)
+        self._writer = None
+        self.rows = 0
+
+    def write(self, columns: dict[str, Any]) -> None:
+        if not HAS_PYARROW:
+            import pandas as pd
+            pd.DataFrame(columns).to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0,
+                                         index=False)
+            self.rows += len(next(iter(columns.values())))
+            return
+
+        batch = pa.record_batch([pa.array(column) if isinstance(column, np.ndarray) else column
+                                 for column in columns.values()], names=list(columns))
+        if self._writer is None:
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self.path, batch.schema)
+            elif self.fmt == "arrow":
+                self._writer = pa.ipc.new_file(self.path, batch.schema)
+            else:
+                self._writer = pa_csv.CSVWriter(self.path, batch.schema)
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _column(batch: dict[str, Any], name: str) -> np.ndarray | None:
+    for alias in COLUMNS[name]:
+        if alias in batch:
+            column = batch[alias]
+            # primitive Arrow columns without nulls are viewed zero-copy, others are converted
+            return column if isinstance(column, np.ndarray) else column.to_numpy(zero_copy_only=False)
+    return None
+
+
+def price_batch(batch: dict[str, Any], greeks: tuple[str, ...] = BSM.GREEKS,
+                solver: ImpliedVolSolver | None = None) -> dict[str, np.ndarray]:
+    """
+    Price one batch of contracts with the vectorized kernels. Contracts with a "sigma" column get their BSM price
+    and Greeks; contracts with a market "price" column get their implied volatility as well, and are priced at it
+    when no "sigma" column is given.
+    Args:
+        batch (dict[str, Any]): Input columns, see COLUMNS for the accepted names. The option type column holds
+            booleans, numbers (non-zero for calls), or strings starting with "C" for calls and "P" for puts.
+        greeks (tuple[str, ...]): Outputs of BSM.compute_greeks_batch to compute, "price" being written as
+            "model_price".
+        solver (ImpliedVolSolver | None): Implied volatility solver.
+    Returns:
+        dict[str, np.ndarray]: Output columns.
+    """
+    s0, K, r, T, sigma, price = (_column(batch, name) for name in ("s0", "K", "r", "T", "sigma", "price"))
+    if s0 is None or K is None or r is None or T is None:
+        raise KeyError(f"Missing contract columns, expected {[COLUMNS[name] for name in ('s0', 'K', 'r', 'T')]}")
+    if sigma is None and price is None:
+        raise KeyError(f"Expected a volatility column {COLUMNS['sigma']} or a price column {COLUMNS['price']}")
+    is_call = _column(batch, "is_call")
+    if is_call is None:
+        is_call = True
+    elif is_call.dtype.kind in "iuf":
+        # numeric flags, 1 for calls and 0 for puts
+        is_call = is_call != 0
+    elif is_call.dtype != bool:
+        is_call = np.char.upper(is_call.astype(str)).astype("U1") == "C"
+
+    results = {}
+    if price is not None:
+        implied_vol, _, _ = (solver or ImpliedVolSolver()).solve(price, s0, K, r, T, is_call)
+        results["implied_vol"] = implied_vol
+        if sigma is None:
+            sigma = implied_vol
+    if greeks:
+        values = BSM.compute_greeks_batch(s0, K, r, T, sigma, is_call, greeks=greeks)
+        results.update(("model_price" if name == "price" else name, values[name]) for name in greeks)
+    return results
+
+
+def price_file(src: str, dst: str, batch_size: int = 65_536, greeks: tuple[str, ...] = BSM.GREEKS,
+               src_format: str | None = None, dst_format: str | None = None,
+               log_every: int = 0) -> dict[str, float]:
+    """
+    Price an option chain file batch by batch, writing the input columns followed by the output columns of
+    price_batch. Only one batch is held in memory at a time.
+    Args:
+        src (str): Input chain file.
+        dst (str): Output file.
+        batch_size (int): Number of rows per batch.
+        greeks (tuple[str, ...]): Outputs of BSM.compute_greeks_batch to compute.
+        src_format (str | None): Input format, inferred from the extension if None.
+        dst_format (str | None): Output format, inferred from the extension if None.
+        log_every (int): Log progress every log_every batches, 0 to disable.
+    Returns:
+        dict[str, float]: "rows", "batches", "seconds", "rows_per_s" (end to end, I/O included), "compute_s" (time
+            spent in the kernels) and "peak_rss_mb" of the process where the resource module is available (Unix).
+    """
+    solver = ImpliedVolSolver()
+    start = time.perf_counter()
+    compute = 0.
+    n_batches = 0
+    with BatchWriter(dst, dst_format) as writer:
+        for batch in read_batches(src, batch_size, src_format):
+            n_rows = len(next(iter(batch.values())))
+            compute_start = time.perf_counter()
+            with timer("bulk.price_batch", n_rows):
+                results = price_batch(batch, greeks, solver)
+            compute += time.perf_counter() - compute_start
+            writer.write({**batch, **results})
+            n_batches += 1
+            if log_every and n_batches % log_every == 0:
+                logger.info(f"{writer.rows:,} rows priced, {writer.rows / (time.perf_counter() - start):,.0f} rows/s")
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": writer.rows,
+        "batches": n_batches,
+        "seconds": elapsed,
+        "rows_per_s": writer.rows / elapsed if elapsed > 0 else 0.,
+        "compute_s": compute,
+    }
+    if resource is not None:
+        # ru_maxrss is in bytes on macOS, and in kilobytes on Linux and the BSDs
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        stats["peak_rss_mb"] = max_rss / 2 ** 20 if sys.platform == "darwin" else max_rss / 1024
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Bulk pricing of option chain files (Parquet, Arrow IPC or CSV)")
+    parser.add_argument("src", help="Input chain file")
+    parser.add_argument("dst", help="Output file, in the format given by its extension")
+    parser.add_argument("--batch-size", type=int, default=65_536, help="Rows per record batch")
+    parser.add_argument("--greeks", default=",".join(BSM.GREEKS),
+                        help="Comma-separated outputs among price and the Greeks, empty for implied vol only")
+    parser.add_argument("--src-format", default=None, choices=("parquet", "arrow", "csv"))
+    parser.add_argument("--dst-format", default=None, choices=("parquet", "arrow", "csv"))
+    parser.add_argument("--log-every", type=int, default=16, help="Log progress every N batches, 0 to disable")
+    args = parser.parse_args()
+
+    stats = price_file(args.src, args.dst, args.batch_size, tuple(filter(None, args.greeks.split(","))),
+                       args.src_format, args.dst_format, args.log_every)
+    logger.info(f"{stats['rows']:,} rows in {stats['batches']} batches priced in {stats['seconds']:.2f}s: "
+                f"{stats['rows_per_s']:,.0f} rows/s end to end, {stats['rows'] / max(stats['compute_s'], 1e-9):,.0f} "
+                f"rows/s in the kernels" + (f", peak RSS {stats['peak_rss_mb']:,.0f}MB" if "peak_rss_mb" in stats else ""))
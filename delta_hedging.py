@@ -0,0 +1,148 @@
+from typing import Any
+import numpy as np
+from BSM import BSM
+from monte_carlo import MonteCarlo
+from utils.metrics import instrument
+
+
+class DeltaHedging:
+
+    def __init__(self, spot: float, strike: float, maturity: float, risk_free_rate: float, volatility: float,
+                 is_call=True, n_shares: int = 1, transaction_cost: float = 0.):
+        """
+        Delta-hedging backtester for a short European call/put position, simulated over many GBM paths at once.
+        Args:
+            spot (float): Current spot price (in $).
+            strike (float): Strike price of the option (in $).
+            maturity (float): Time to option expiration (in years).
+            risk_free_rate (float): Annualized risk-free interest rate, at which the hedging cash account accrues.
+            volatility (float): Volatility of the underlying asset (e.g., .20 for 20%).
+            is_call (bool): True for a call, False for a put.
+            n_shares (int): Number of underlying shares covered by the option position.
+            transaction_cost (float): Proportional cost paid on the traded notional at each rebalancing (e.g., .001).
+        """
+        self.spot = spot
+        self.strike = strike
+        self.maturity = maturity
+        self.risk_free = risk_free_rate
+        self.volatility = volatility
+        self.is_call = is_call
+        self.n_shares = n_shares
+        self.transaction_cost = transaction_cost
+
+    def rebalancing_grid(self, n_steps: int, dt: float) -> tuple[int, float]:
+        """
+        Number of rebalancing steps and time step actually simulated: n_steps is truncated so that the simulation
+        stops at the option expiry, and a maturity shorter than dt gets a single step ending at expiry.
+        """
+        if not self.maturity > 0:
+            raise ValueError(f"Maturity must be positive, got {self.maturity}")
+        n_steps = int(min(n_steps, np.floor(self.maturity / dt + 1e-9)))
+        if n_steps == 0:
+            return 1, self.maturity
+        return n_steps, dt
+
+    @instrument("hedging.simulate", size=lambda result: result["P&L"].size)
+    def simulate(self, n_paths: int, n_steps: int, dt: float,
+                 seed: int | np.random.SeedSequence | np.random.Generator | None = None,
+                 paths: np.ndarray | None = None) -> dict[str, np.ndarray]:
+        """
+        Sell the option at its BSM price, then rebalance a delta hedge at each time step on every path, financing
+        the hedge at the risk-free rate. At the last step the hedge is marked against the option payoff if the
+        option has expired, or against its BSM price otherwise.
+        Args:
+            n_paths (int): Number of simulated paths.
+            n_steps (int): Number of rebalancing steps, see rebalancing_grid.
+            dt (float): Time between two rebalancing steps (in years).
+            seed (int | np.random.SeedSequence | np.random.Generator | None): Seed of the random generator.
+            paths (np.ndarray | None): (n_paths, n_steps+1) spot paths on the rebalancing grid to replay, e.g. read
+                from a PathStore, instead of simulating new ones.
+        Returns:
+            dict[str, np.ndarray]: Simulation results, with (n_paths, n_steps+1) matrices for "Stock Price", "Delta",
+                "Shares Purchased", "Cost" and "Cash", and the (n_paths,) hedging error "P&L".
+        """
+        n_steps, dt = self.rebalancing_grid(n_steps, dt)
+        t = np.arange(n_steps + 1) * dt
+        tau = (self.maturity - t)[:, np.newaxis]
+        w = 1. if self.is_call else -1.
+
+        if paths is None:
+            engine = MonteCarlo(self.spot, self.risk_free, self.volatility, seed=seed)
+            paths = engine.generate_paths(n_paths, n_steps, n_steps * dt)
+        elif paths.shape != (n_paths, n_steps + 1):
+            raise ValueError(f"Expected ({n_paths}, {n_steps + 1}) paths on the rebalancing grid, got {paths.shape}")
+        # time-major (n_steps+1, n_paths) matrices so that each rebalancing date is a contiguous row
+        spot = np.asarray(paths, dtype=float).T
+
+        delta = np.empty_like(spot)
+        alive = tau[:, 0] > 1e-12
+        delta[alive] = BSM.compute_greeks_batch(spot[alive], self.strike, self.risk_free, tau[alive],
+                                                self.volatility, self.is_call, greeks=("delta",))["delta"]
+        # at expiry the hedge converges to the exercise decision
+        delta[~alive] = w * (w * (spot[~alive] - self.strike) > 0)
+
+        shares = np.diff(delta, axis=0, prepend=0.) * self.n_shares
+        cost = shares * spot
+        flows = -cost - self.transaction_cost * np.abs(cost)
+        premium = BSM().compute_bsm(self.spot, self.strike, self.risk_free, self.maturity, self.volatility, self.is_call)
+        flows[0] += premium * self.n_shares
+
+        # cash_i = exp(r t_i) * sum_{j <= i} flows_j * exp(-r t_j)
+        growth = np.exp(self.risk_free * t)[:, np.newaxis]
+        cash = np.cumsum(flows / growth, axis=0) * growth
+
+        if alive[-1]:
+            option_value = BSM.compute_bsm_batch(spot[-1], self.strike, self.risk_free, tau[-1], self.volatility,
+                                                 self.is_call)
+        else:
+            option_value = np.maximum(w * (spot[-1] - self.strike), 0)
+        pnl = cash[-1] + delta[-1] * self.n_shares * spot[-1] - option_value * self.n_shares
+
+        return {
+            "Stock Price": spot.T,
+            "Delta": delta.T,
+            "Shares Purchased": shares.T,
+            "Cost": cost.T,
+            "Cash": cash.T,
+            "P&L": pnl,
+        }
+
+    def simulate_chunk(self, n_paths: int, n_steps: int, dt: float,
+                       seed: int | np.random.SeedSequence | np.random.Generator | None = None,
+                       n_samples: int = 1, cancel_event: Any = None, batch_size: int = 250,
+                       paths: np.ndarray | None = None) -> dict[str, np.ndarray]:
+        """
+        Run one chunk of a simulation split over worker processes, keeping the P&L of every path but only the
+        first n_samples full paths, so that little data is sent back to the parent process. The chunk is simulated
+        batch_size paths at a time, and stops after the current batch once cancel_event (any object with an
+        is_set method, e.g. a multiprocessing.Event) is set, returning the paths simulated so far. Given paths
+        (e.g. memory-mapped from a PathStore) are replayed batch by batch instead of simulating new ones.
+        """
+        rng = np.random.default_rng(seed)
+        result, pnl = None, []
+        for start in range(0, n_paths, batch_size):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            size = min(batch_size, n_paths - start)
+            batch = self.simulate(size, n_steps, dt, rng, None if paths is None else paths[start:start + size])
+            if result is None:
+                result = {name: value[:n_samples] for name, value in batch.items() if name != "P&L"}
+            pnl.append(batch["P&L"])
+        if result is None:
+            # cancelled before the first batch: no sample path, and an empty P&L
+            return {"P&L": np.empty(0)}
+        return {**result, "P&L": np.concatenate(pnl)}
+
+    @staticmethod
+    def summarize(pnl: np.ndarray) -> dict[str, float]:
+        """
+        Summary statistics of the hedging error distribution.
+        """
+        q05, q50, q95 = np.quantile(pnl, [.05, .5, .95])
+        return {
+            "Mean": float(pnl.mean()),
+            "Std": float(pnl.std(ddof=1)) if pnl.size > 1 else 0.,
+            "5%": float(q05),
+            "Median": float(q50),
+            "95%": float(q95),
+        }
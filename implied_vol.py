@@ -0,0 +1,117 @@
+import logging
+import numpy as np
+from BSM import BSM
+from utils.metrics import instrument
+
+logger = logging.getLogger("ImpliedVol")
+
+
+class ImpliedVolSolver:
+
+    def __init__(self, price_tol: float = 1e-10, sigma_tol: float = 1e-12, max_iter: int = 100,
+                 sigma_min: float = 1e-6, sigma_max: float = 10.):
+        """
+        Vectorized implied volatility solver for European options priced with the BSM model.
+        Args:
+            price_tol (float): Absolute price error under which a quote is considered solved.
+            sigma_tol (float): Volatility step (or bracket width) under which a quote is considered solved.
+            max_iter (int): Maximum number of iterations before a quote is reported as failed.
+            sigma_min (float): Lower end of the volatility bracket.
+            sigma_max (float): Upper end of the volatility bracket.
+        """
+        self.price_tol = price_tol
+        self.sigma_tol = sigma_tol
+        self.max_iter = max_iter
+        self.sigma_min = sigma_min
+        self.sigma_max = sigma_max
+
+    @staticmethod
+    def _initial_guess(call: np.ndarray, s0: np.ndarray, discounted_strike: np.ndarray, T: np.ndarray) -> np.ndarray:
+        """
+        Corrado-Miller rational approximation of the implied volatility from the (call-equivalent) price,
+        falling back on the moneyness-based guess sqrt(2|ln(F/K)| / T) where the approximation breaks down.
+        """
+        moneyness = s0 - discounted_strike
+        a = call - .5 * moneyness
+        # expired quotes (T = 0) are rejected by the caller, their guess is discarded
+        with np.errstate(invalid="ignore", divide="ignore"):
+            guess = np.sqrt(2 * np.pi / T) / (s0 + discounted_strike) * (a + np.sqrt(a ** 2 - moneyness ** 2 / np.pi))
+            fallback = np.sqrt(2 * np.abs(np.log(s0 / discounted_strike)) / T)
+        guess = np.where(np.isfinite(guess) & (guess > 0), guess, fallback)
+        return np.where(np.isfinite(guess) & (guess > 0), guess, .2)
+
+    @instrument("implied_vol.solve", size=lambda result: result[0].size)
+    def solve(self, price: float | np.ndarray, s0: float | np.ndarray, K: float | np.ndarray, r: float | np.ndarray,
+              T: float | np.ndarray, is_call: bool | np.ndarray = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Back out implied volatilities from market option prices, solving all quotes at once.
+        Each iteration takes a Newton step using vega and falls back on bisection of a per-quote bracket whenever
+        vega is too small or the Newton step leaves the bracket. Converged quotes are masked out so they do no
+        further work.
+        Args:
+            price (float | np.ndarray): Market option price(s) (in $).
+            s0 (float | np.ndarray): Spot price(s) (in $).
+            K (float | np.ndarray): Strike price(s) (in $).
+            r (float | np.ndarray): Annualized risk-free interest rate(s).
+            T (float | np.ndarray): Time(s) to option expiration (in years).
+            is_call (bool | np.ndarray): Option type flag(s), True for calls and False for puts.
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Tuple containing:
+                - Implied volatilities, NaN where the quote failed (np.ndarray)
+                - Number of iterations performed per quote (np.ndarray)
+                - Mask of the quotes that failed to converge, violate no-arbitrage bounds or have an implied
+                  volatility outside [sigma_min, sigma_max] (np.ndarray)
+        """
+        price, s0, K, r, T, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (price, s0, K, r, T)), np.asarray(is_call, dtype=bool))
+        shape = price.shape
+        price, s0, K, r, T, is_call = (x.ravel() for x in (price, s0, K, r, T, is_call))
+
+        discounted_strike = K * np.exp(-r * T)
+        # put prices are mapped to call-equivalent prices through put-call parity for the bounds and initial guess
+        call = np.where(is_call, price, price + s0 - discounted_strike)
+        failed = (call <= np.maximum(s0 - discounted_strike, 0)) | (call >= s0) | ~(T > 0)
+
+        sigma = np.clip(self._initial_guess(call, s0, discounted_strike, T), self.sigma_min, self.sigma_max)
+        lower = np.full_like(sigma, self.sigma_min)
+        upper = np.full_like(sigma, self.sigma_max)
+        n_iter = np.zeros(sigma.shape, dtype=int)
+        converged = np.zeros(sigma.shape, dtype=bool)
+
+        active = np.flatnonzero(~failed)
+        for _ in range(self.max_iter):
+            if active.size == 0:
+                break
+            n_iter[active] += 1
+            sig = sigma[active]
+            greeks = BSM.compute_greeks_batch(s0[active], K[active], r[active], T[active], sig, is_call[active],
+                                              greeks=("price", "vega"))
+            diff = greeks["price"] - price[active]
+            vega = greeks["vega"]
+
+            # prices increase with volatility, so the sign of the error tells which end of the bracket to move
+            lo = np.where(diff < 0, sig, lower[active])
+            hi = np.where(diff > 0, sig, upper[active])
+            lower[active], upper[active] = lo, hi
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                newton = sig - diff / vega
+            use_bisection = ~(vega > 1e-8 * s0[active]) | ~(newton > lo) | ~(newton < hi)
+            new_sig = np.where(use_bisection, .5 * (lo + hi), newton)
+            sigma[active] = new_sig
+
+            matched = np.abs(diff) < self.price_tol
+            done = matched | (np.abs(new_sig - sig) < self.sigma_tol) | (hi - lo < self.sigma_tol)
+            # keep the evaluated volatility when the price already matched, since it is the one that was checked
+            sigma[active[done]] = np.where(matched[done], sig[done], new_sig[done])
+            # a bracket collapsed onto one of its ends with the price still off means the implied volatility lies
+            # outside [sigma_min, sigma_max], not that it was found
+            pinned = (new_sig - self.sigma_min < 10 * self.sigma_tol) | (self.sigma_max - new_sig < 10 * self.sigma_tol)
+            converged[active[done & (matched | ~pinned)]] = True
+            active = active[~done]
+
+        failed |= ~converged
+        if failed.any():
+            logger.warning(f"Implied volatility failed for {failed.sum()} out of {failed.size} quote(s)")
+        sigma[failed] = np.nan
+        return sigma.reshape(shape), n_iter.reshape(shape), failed.reshape(shape)
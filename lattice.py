@@ -0,0 +1,158 @@
+import numpy as np
+
+
+class Lattice:
+
+    METHODS = ("binomial", "trinomial")
+    # the Greeks are read off the nodes of step 2 (binomial) or step 1 (trinomial), which smaller trees lack
+    MIN_STEPS = {"binomial": 3, "trinomial": 2}
+
+    def __init__(self, n_steps: int = 500, method: str = "binomial"):
+        """
+        Lattice engine pricing European and American call/put options by backward induction, on a Cox-Ross-Rubinstein
+        binomial tree or a Kamrad-Ritchken trinomial tree. A batch of contracts is priced together, each time slice
+        being one vectorized update of a single preallocated buffer of node values per contract.
+        Args:
+            n_steps (int): Number of time steps of the tree, at least 3 for a binomial tree and 2 for a trinomial one.
+            method (str): Tree type, "binomial" or "trinomial".
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method {method}, expected one of {self.METHODS}")
+        if n_steps < self.MIN_STEPS[method]:
+            raise ValueError(f"A {method} tree needs at least {self.MIN_STEPS[method]} steps, got {n_steps}")
+        self.n_steps = n_steps
+        self.method = method
+
+    def compute_price(self, s0: float | np.ndarray, K: float | np.ndarray, r: float | np.ndarray,
+                      T: float | np.ndarray, sigma: float | np.ndarray, is_call: bool | np.ndarray = True,
+                      is_american: bool | np.ndarray = True) -> np.ndarray:
+        """
+        Compute option prices for a batch of contracts.
+        Args:
+            s0 (float | np.ndarray): Spot price(s) (in $).
+            K (float | np.ndarray): Strike price(s) (in $).
+            r (float | np.ndarray): Annualized risk-free interest rate(s).
+            T (float | np.ndarray): Time(s) to option expiration (in years).
+            sigma (float | np.ndarray): Volatility(ies) of the underlying asset.
+            is_call (bool | np.ndarray): Option type flag(s), True for calls and False for puts.
+            is_american (bool | np.ndarray): Exercise style flag(s), True for American and False for European.
+        Returns:
+            np.ndarray: Option prices, broadcast over all inputs.
+        """
+        return self.compute_greeks(s0, K, r, T, sigma, is_call, is_american)["price"]
+
+    def compute_greeks(self, s0: float | np.ndarray, K: float | np.ndarray, r: float | np.ndarray,
+                       T: float | np.ndarray, sigma: float | np.ndarray, is_call: bool | np.ndarray = True,
+                       is_american: bool | np.ndarray = True) -> dict[str, np.ndarray]:
+        """
+        Compute option prices along with delta, gamma and theta read off the first nodes of the tree, so that no
+        extra tree has to be built as with bump-and-reprice.
+        Args:
+            s0 (float | np.ndarray): Spot price(s) (in $).
+            K (float | np.ndarray): Strike price(s) (in $).
+            r (float | np.ndarray): Annualized risk-free interest rate(s).
+            T (float | np.ndarray): Time(s) to option expiration (in years).
+            sigma (float | np.ndarray): Volatility(ies) of the underlying asset.
+            is_call (bool | np.ndarray): Option type flag(s), True for calls and False for puts.
+            is_american (bool | np.ndarray): Exercise style flag(s), True for American and False for European.
+        Returns:
+            dict[str, np.ndarray]: "price", "delta", "gamma" and "theta", broadcast over all inputs.
+        """
+        s0, K, r, T, sigma, is_call, is_american = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (s0, K, r, T, sigma)),
+            np.asarray(is_call, dtype=bool), np.asarray(is_american, dtype=bool))
+        shape = s0.shape
+        # contracts along the first axis, tree nodes along the second
+        s0, K, r, T, sigma = (x.reshape(-1, 1) for x in (s0, K, r, T, sigma))
+        w = np.where(is_call, 1., -1.).reshape(-1, 1)
+        is_american = is_american.ravel()
+        has_american = bool(is_american.any())
+
+        if self.method == "binomial":
+            result = self._binomial(s0, K, r, T, sigma, w, is_american, has_american)
+        else:
+            result = self._trinomial(s0, K, r, T, sigma, w, is_american, has_american)
+        return {name: value.reshape(shape) for name, value in result.items()}
+
+    def _binomial(self, s0, K, r, T, sigma, w, is_american, has_american) -> dict[str, np.ndarray]:
+        n = self.n_steps
+        dt = T / n
+        u = np.exp(sigma * np.sqrt(dt))
+        p = (np.exp(r * dt) - 1 / u) / (u - 1 / u)
+        if np.any((p <= 0) | (p >= 1)):
+            raise ValueError("Binomial probabilities outside (0, 1), increase the number of steps")
+        discount = np.exp(-r * dt)
+        p_up, p_down = discount * p, discount * (1 - p)
+
+        # node j of step i sits at s0 * u^(2j - i), i.e. every other point of the log-spot grid k = -n..n
+        grid = s0 * u ** np.arange(-n, n + 1)
+        exercise = np.maximum(w * (grid - K), 0)
+        values = exercise[:, ::2].copy()
+        up = np.empty_like(values)
+        # option values are never negative, so a zero floor leaves European contracts untouched
+        exercise *= is_american[:, np.newaxis]
+        step_1 = step_2 = None
+
+        for i in range(n - 1, -1, -1):
+            v, v_up, tmp = values[:, :i + 1], values[:, 1:i + 2], up[:, :i + 1]
+            np.multiply(v_up, p_up, out=tmp)
+            v *= p_down
+            v += tmp
+            if has_american:
+                np.maximum(v, exercise[:, n - i:n + i + 1:2], out=v)
+            if i == 2:
+                step_2 = v.copy()
+            elif i == 1:
+                step_1 = v.copy()
+
+        price = values[:, 0]
+        s_up, s_down = s0[:, 0] * u[:, 0], s0[:, 0] / u[:, 0]
+        s_uu, s_dd = s_up * u[:, 0], s_down / u[:, 0]
+        delta = (step_1[:, 1] - step_1[:, 0]) / (s_up - s_down)
+        gamma = ((step_2[:, 2] - step_2[:, 1]) / (s_uu - s0[:, 0]) - (step_2[:, 1] - step_2[:, 0]) / (s0[:, 0] - s_dd)) \
+            / (.5 * (s_uu - s_dd))
+        theta = (step_2[:, 1] - price) / (2 * dt[:, 0])
+        return {"price": price, "delta": delta, "gamma": gamma, "theta": theta}
+
+    def _trinomial(self, s0, K, r, T, sigma, w, is_american, has_american) -> dict[str, np.ndarray]:
+        n = self.n_steps
+        dt = T / n
+        u = np.exp(sigma * np.sqrt(2 * dt))
+        a, b = np.exp(r * dt / 2), np.exp(sigma * np.sqrt(dt / 2))
+        p_u = ((a - 1 / b) / (b - 1 / b)) ** 2
+        p_d = ((b - a) / (b - 1 / b)) ** 2
+        p_m = 1 - p_u - p_d
+        if np.any((p_u <= 0) | (p_d <= 0) | (p_m < 0)):
+            raise ValueError("Trinomial probabilities outside [0, 1], increase the number of steps")
+        discount = np.exp(-r * dt)
+        p_u, p_m, p_d = discount * p_u, discount * p_m, discount * p_d
+
+        # node j of step i sits at s0 * u^(j - i), i.e. the points -i..i of the log-spot grid k = -n..n
+        grid = s0 * u ** np.arange(-n, n + 1)
+        exercise = np.maximum(w * (grid - K), 0)
+        values = exercise.copy()
+        tmp, tmp_up = np.empty_like(values), np.empty_like(values)
+        # option values are never negative, so a zero floor leaves European contracts untouched
+        exercise *= is_american[:, np.newaxis]
+        step_1 = None
+
+        for i in range(n - 1, -1, -1):
+            m = 2 * i + 1
+            v = values[:, :m]
+            np.multiply(values[:, 1:m + 1], p_m, out=tmp[:, :m])
+            np.multiply(values[:, 2:m + 2], p_u, out=tmp_up[:, :m])
+            v *= p_d
+            v += tmp[:, :m]
+            v += tmp_up[:, :m]
+            if has_american:
+                np.maximum(v, exercise[:, n - i:n + i + 1], out=v)
+            if i == 1:
+                step_1 = v.copy()
+
+        price = values[:, 0]
+        s_up, s_down = s0[:, 0] * u[:, 0], s0[:, 0] / u[:, 0]
+        delta = (step_1[:, 2] - step_1[:, 0]) / (s_up - s_down)
+        gamma = ((step_1[:, 2] - step_1[:, 1]) / (s_up - s0[:, 0]) - (step_1[:, 1] - step_1[:, 0]) / (s0[:, 0] - s_down)) \
+            / (.5 * (s_up - s_down))
+        theta = (step_1[:, 1] - price) / dt[:, 0]
+        return {"price": price, "delta": delta, "gamma": gamma, "theta": theta}
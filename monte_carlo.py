@@ -0,0 +1,291 @@
+from typing import Callable, Iterator
+import numpy as np
+from BSM import BSM
+from scipy.special import ndtri
+from utils import kernels
+from utils.metrics import instrument
+
+
+class MonteCarlo:
+
+    METHODS = ("standard", "antithetic", "control_variate", "sobol")
+
+    def __init__(self, spot: float, risk_free_rate: float, volatility: float, dtype: type = np.float64,
+                 seed: int | np.random.SeedSequence | np.random.Generator | None = None):
+        """
+        Monte Carlo engine simulating geometric Brownian motion paths under the risk-neutral measure.
+        Args:
+            spot (float): Current spot price (in $).
+            risk_free_rate (float): Annualized risk-free interest rate (e.g., .05 for 5%).
+            volatility (float): Volatility of the underlying asset (e.g., .20 for 20%).
+            dtype (type): Floating point type of the simulated paths (np.float32 or np.float64).
+            seed (int | np.random.SeedSequence | np.random.Generator | None): Seed of the random generator.
+        """
+        if np.dtype(dtype) not in (np.float32, np.float64):
+            raise ValueError(f"Unsupported dtype {dtype}, expected np.float32 or np.float64")
+        self.spot = spot
+        self.risk_free = risk_free_rate
+        self.volatility = volatility
+        self.dtype = np.dtype(dtype)
+        self.rng = np.random.default_rng(seed)
+        # ratio of the plain Monte Carlo variance to the variance achieved by the method of the last pricing run
+        self.variance_reduction = None
+
+    def _draw_brownian(self, n_paths: int, n_steps: int, T: float) -> np.ndarray:
+        """
+        Draw Brownian motion paths by accumulating i.i.d. normal increments.
+        Returns:
+            np.ndarray: An (n_steps+1, n_paths) time-major matrix of Brownian motion values, starting at 0.
+        """
+        w = np.empty((n_steps + 1, n_paths), dtype=self.dtype)
+        w[0] = 0
+        increments = w[1:]
+        self.rng.standard_normal(out=increments, dtype=self.dtype)
+        increments *= np.sqrt(T / n_steps)
+        np.cumsum(increments, axis=0, out=increments)
+        return w
+
+    @staticmethod
+    def _brownian_bridge(z: np.ndarray, T: float) -> np.ndarray:
+        """
+        Build Brownian motion paths from normals with the Brownian bridge construction: the first normal sets the
+        terminal value and each following one fills the midpoint of an interval, so that the leading (and best
+        distributed) quasi-random dimensions drive the largest scale moves of the paths.
+        Args:
+            z (np.ndarray): An (n_steps, n_paths) matrix of standard normals, ordered by importance.
+            T (float): Simulation horizon (in years).
+        Returns:
+            np.ndarray: An (n_steps+1, n_paths) time-major matrix of Brownian motion values, starting at 0.
+        """
+        n_steps = z.shape[0]
+        times = np.linspace(0, T, n_steps + 1)
+        w = np.empty((n_steps + 1, z.shape[1]), dtype=z.dtype)
+        w[0] = 0
+        w[n_steps] = np.sqrt(T) * z[0]
+        k = 1
+        intervals = [(0, n_steps)]
+        while intervals:
+            refined = []
+            for left, right in intervals:
+                if right - left < 2:
+                    continue
+                mid = (left + right) // 2
+                t_l, t_m, t_r = times[left], times[mid], times[right]
+                w[mid] = ((t_r - t_m) * w[left] + (t_m - t_l) * w[right]) / (t_r - t_l) \
+                    + np.sqrt((t_m - t_l) * (t_r - t_m) / (t_r - t_l)) * z[k]
+                k += 1
+                refined += [(left, mid), (mid, right)]
+            intervals = refined
+        return w
+
+    def _to_spot(self, w: np.ndarray, T: float) -> np.ndarray:
+        """
+        Map time-major Brownian motion values to GBM spot prices in place and return them path-major.
+        """
+        t = np.linspace(0, T, w.shape[0], dtype=self.dtype)[:, np.newaxis]
+        w *= self.volatility
+        w += (self.risk_free - .5 * self.volatility ** 2) * t
+        np.exp(w, out=w)
+        w *= self.spot
+        return w.T
+
+    def generate_paths(self, n_paths: int, n_steps: int, T: float) -> np.ndarray:
+        """
+        Generate GBM spot price paths in one vectorized operation.
+        Args:
+            n_paths (int): Number of paths to simulate.
+            n_steps (int): Number of time steps per path.
+            T (float): Simulation horizon (in years).
+        Returns:
+            np.ndarray: An (n_paths, n_steps+1) matrix of spot prices, the first column being the current spot.
+        """
+        if kernels.active_backend() == "numba":
+            # same time-major draws as _draw_brownian, turned into spot prices in place by one compiled pass
+            normals = np.empty((n_steps + 1, n_paths), dtype=self.dtype)
+            normals[0] = 0
+            self.rng.standard_normal(out=normals[1:], dtype=self.dtype)
+            return kernels.gbm_paths(self.spot, self.risk_free, self.volatility, np.linspace(0, T, n_steps + 1),
+                                     normals.T, out=normals.T)
+        # paths are built time-major so that each time slice is contiguous, and returned as a transposed view
+        return self._to_spot(self._draw_brownian(n_paths, n_steps, T), T)
+
+    def iter_paths(self, n_paths: int, n_steps: int, T: float, chunk_size: int = 100_000) -> Iterator[np.ndarray]:
+        """
+        Generate GBM spot price paths chunk by chunk, so that at most chunk_size paths are held in memory at once.
+        Args:
+            n_paths (int): Total number of paths to simulate.
+            n_steps (int): Number of time steps per path.
+            T (float): Simulation horizon (in years).
+            chunk_size (int): Maximum number of paths per chunk.
+        Yields:
+            np.ndarray: An (m, n_steps+1) matrix of spot prices with m <= chunk_size.
+        """
+        for start in range(0, n_paths, chunk_size):
+            yield self.generate_paths(min(chunk_size, n_paths - start), n_steps, T)
+
+    def iter_antithetic_paths(self, n_pairs: int, n_steps: int, T: float,
+                              chunk_size: int = 100_000) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Generate pairs of antithetic GBM paths, driven by opposite Brownian increments, chunk by chunk.
+        Yields:
+            tuple[np.ndarray, np.ndarray]: Two (m, n_steps+1) matrices of spot prices, row i of each forming a pair.
+        """
+        for start in range(0, n_pairs, chunk_size):
+            w = self._draw_brownian(min(chunk_size, n_pairs - start), n_steps, T)
+            mirrored = -w
+            yield self._to_spot(w, T), self._to_spot(mirrored, T)
+
+    def iter_sobol_paths(self, n_paths: int, n_steps: int, T: float, chunk_size: int = 100_000) -> Iterator[np.ndarray]:
+        """
+        Generate GBM paths from one scrambled Sobol sequence with Brownian bridge construction, chunk by chunk.
+        The number of paths should be a power of 2 to keep the balance properties of the sequence.
+        Yields:
+            np.ndarray: An (m, n_steps+1) matrix of spot prices with m <= chunk_size.
+        """
+        # scipy.stats is slow to import, so it is only loaded once Sobol paths are actually requested
+        from scipy.stats import qmc
+        sobol = qmc.Sobol(d=n_steps, scramble=True, seed=self.rng)
+        eps = np.finfo(np.float64).eps
+        for start in range(0, n_paths, chunk_size):
+            u = sobol.random(min(chunk_size, n_paths - start))
+            z = ndtri(np.clip(u.T, eps, 1 - eps)).astype(self.dtype)
+            yield self._to_spot(self._brownian_bridge(z, T), T)
+
+    @instrument("monte_carlo.compute_price")
+    def compute_price(self, payoff: Callable[[np.ndarray], np.ndarray], T: float, n_paths: int, n_steps: int = 1,
+                      chunk_size: int = 100_000, method: str = "standard", control_strike: float | None = None,
+                      n_replications: int = 16) -> tuple[float, float]:
+        """
+        Compute the Monte Carlo price of a European-style payoff along with its standard error.
+        The variance reduction of the chosen method against plain Monte Carlo with the same number of payoff
+        evaluations is stored in self.variance_reduction.
+        Args:
+            payoff (Callable[[np.ndarray], np.ndarray]): Maps an (m, n_steps+1) matrix of paths to m payoffs.
+            T (float): Option maturity (in years).
+            n_paths (int): Total number of simulated paths.
+            n_steps (int): Number of time steps per path.
+            chunk_size (int): Maximum number of paths simulated at once.
+            method (str): Simulation method, one of:
+                - "standard": plain pseudo-random Monte Carlo.
+                - "antithetic": pairs of paths driven by opposite Brownian increments.
+                - "control_variate": European call on the terminal spot, priced in closed form with BSM.compute_bsm.
+                - "sobol": randomized quasi-Monte Carlo with scrambled Sobol points and Brownian bridge.
+            control_strike (float | None): Strike of the control variate call, the current spot if None.
+            n_replications (int): Number of independently scrambled Sobol sequences, used for the standard error.
+        Returns:
+            tuple[float, float]: Tuple containing:
+                - Discounted expected payoff (float)
+                - Standard error of the estimate (float)
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method {method}, expected one of {self.METHODS}")
+        if method == "sobol" and n_paths < n_replications:
+            raise ValueError(f"Sobol pricing needs at least n_replications={n_replications} paths, got {n_paths}")
+        discount = np.exp(-self.risk_free * T)
+
+        if method == "standard":
+            stats = _Moments()
+            for paths in self.iter_paths(n_paths, n_steps, T, chunk_size):
+                stats.add(payoff(paths))
+            mean, variance = stats.mean, stats.variance / n_paths
+            self.variance_reduction = 1.
+
+        elif method == "antithetic":
+            pairs, stats = _Moments(), _Moments()
+            for paths, mirrored in self.iter_antithetic_paths(n_paths // 2, n_steps, T, chunk_size // 2 or 1):
+                y, y_mirrored = payoff(paths), payoff(mirrored)
+                pairs.add(.5 * (y + y_mirrored))
+                stats.add(y)
+                stats.add(y_mirrored)
+            mean, variance = pairs.mean, pairs.variance / pairs.count
+            self.variance_reduction = stats.variance / stats.count / variance if variance > 0 else np.inf
+
+        elif method == "control_variate":
+            control_strike = self.spot if control_strike is None else control_strike
+            # undiscounted expectation of the control, known in closed form
+            control_mean = BSM().compute_bsm(self.spot, control_strike, self.risk_free, T, self.volatility) / discount
+            y_stats, x_stats = _Moments(), _Moments()
+            xy = 0.
+            for paths in self.iter_paths(n_paths, n_steps, T, chunk_size):
+                y = np.asarray(payoff(paths), dtype=np.float64)
+                x = np.maximum(paths[:, -1] - control_strike, 0).astype(np.float64)
+                y_stats.add(y)
+                x_stats.add(x)
+                xy += np.dot(x, y)
+            covariance = (xy - n_paths * x_stats.mean * y_stats.mean) / max(n_paths - 1, 1)
+            beta = covariance / x_stats.variance if x_stats.variance > 0 else 0.
+            mean = y_stats.mean - beta * (x_stats.mean - control_mean)
+            residual_variance = max(y_stats.variance - beta * covariance, 0.)
+            variance = residual_variance / n_paths
+            self.variance_reduction = y_stats.variance / residual_variance if residual_variance > 0 else np.inf
+
+        else:
+            replications, stats = _Moments(), _Moments()
+            for _ in range(n_replications):
+                replication = _Moments()
+                for paths in self.iter_sobol_paths(n_paths // n_replications, n_steps, T, chunk_size):
+                    y = payoff(paths)
+                    replication.add(y)
+                    stats.add(y)
+                replications.add(np.array([replication.mean]))
+            mean, variance = replications.mean, replications.variance / n_replications
+            self.variance_reduction = stats.variance / stats.count / variance if variance > 0 else np.inf
+
+        return discount * mean, discount * np.sqrt(variance)
+
+    def compute_option_price(self, K: float, T: float, n_paths: int, is_call=True, chunk_size: int = 100_000,
+                             method: str = "standard", control_strike: float | None = None,
+                             n_replications: int = 16) -> tuple[float, float]:
+        """
+        Compute the Monte Carlo price of a European call/put option along with its standard error.
+        Only the terminal spot matters for a vanilla payoff, so each path is simulated in a single step.
+        Args:
+            K (float): Strike price (in $).
+            T (float): Option maturity (in years).
+            n_paths (int): Total number of simulated paths.
+            is_call (bool): True for a call, False for a put.
+            chunk_size (int): Maximum number of paths simulated at once.
+            method (str): Simulation method, see compute_price.
+            control_strike (float | None): Strike of the control variate call, the current spot if None.
+            n_replications (int): Number of independently scrambled Sobol sequences, used for the standard error.
+        Returns:
+            tuple[float, float]: Tuple containing:
+                - Option price (float)
+                - Standard error of the estimate (float)
+        """
+        w = 1. if is_call else -1.
+        return self.compute_price(lambda paths: np.maximum(w * (paths[:, -1] - K), 0), T, n_paths, 1, chunk_size,
+                                  method, control_strike, n_replications)
+
+
+class _Moments:
+    """
+    Running count, sum and sum of squares of a stream of samples, accumulated in float64.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.
+        self.total_sq = 0.
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        self.count += values.size
+        self.total += values.sum()
+        self.total_sq += np.dot(values, values)
+
+    def merge(self, other: "_Moments") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count
+
+    @property
+    def variance(self) -> float:
+        """
+        Unbiased sample variance.
+        """
+        return max(self.total_sq - self.count * self.mean ** 2, 0.) / max(self.count - 1, 1)
@@ -1,16 +1,27 @@
 import numpy as np
-import pandas as pd
 import dash_ag_grid as dag
 import plotly.graph_objects as go
 import dash_mantine_components as dmc
 import dash_bootstrap_components as dbc
 from BSM import BSM
+from delta_hedging import DeltaHedging
 from utils.data import DataManager
+from utils.jobs import JobManager
+from utils.path_store import PathStore, hedge_stored_paths
+from utils.transport import MAX_POINTS, lttb, page_records, typed_array
 from dash_iconify import DashIconify
-from dash import Input, State, Output, dcc, html, callback, _dash_renderer
+from dash import Input, State, Output, dcc, html, callback, no_update, _dash_renderer
+from dash.exceptions import PreventUpdate
 _dash_renderer._set_react_version("18.2.0")
 
-data = DataManager()
+data = DataManager("delta_sim")
+jobs = JobManager()
+path_store = PathStore()
+
+HEDGING_PATHS = 10_000
+HEDGING_CHUNKS = 8
+HEDGING_PAGE_SIZE = 100
+TIMESCALES = {"Daily": 1/252, "Weekly": 1/52}
 
 
 def create_delta_sim_layout():
@@ -48,6 +59,9 @@ def create_delta_sim_layout():
             html.H6(id="hedging_timescale_text", style={"color": "rgb(255, 255, 255)"}),
             dbc.Input(id="simulation_period_input", type="number"),
             html.Br(),
+            html.H6("Transaction cost:", style={"color": "rgb(255, 255, 255)"}),
+            dbc.Input(id="transaction_cost_input", type="number", min=0, step=.001, value=0),
+            html.Br(),
             dbc.Button(id="run_button", children="Run Simulation!")
         ])
     ]
@@ -65,6 +79,13 @@ def create_delta_sim_layout():
             ])
         ], color="#302e32"),
         html.Br(),
+        dbc.Row([
+            dbc.Col([dbc.Progress(id="hedging_progress", value=0, label="", striped=True)], width=10),
+            dbc.Col([dbc.Button(id="cancel_button", children="Cancel", color="secondary", size="sm")], width=2),
+        ], align="center"),
+        dcc.Store(id="hedging_job"),
+        dcc.Interval(id="hedging_poll", interval=250, disabled=True),
+        html.Br(),
         html.Div(id="simulation_result")
     ]
 
@@ -72,8 +93,8 @@ def create_delta_sim_layout():
 
 
 @callback(
-    Output("spot_simulation", "figure", allow_duplicate=True),
-    Output("simulation_result", "children"),
+    Output("hedging_job", "data"),
+    Output("hedging_poll", "disabled"),
     State("spot_input", "value"),
     State("strike_input", "value"),
     State("maturity_input", "value"),
@@ -83,76 +104,164 @@ def create_delta_sim_layout():
     State("shares_input", "value"),
     State("simulation_period_input", "value"),
     State("hedging_timescale", "value"),
+    State("transaction_cost_input", "value"),
+    State("session_id", "data"),
     Input("run_button", "n_clicks"),
     prevent_initial_call=True
 )
-def run_simulation(s0: int, K: int, T: int, r: float, sigma: float, option_type: str, n_shares: int, period: int, timescale: str, _: int):
+def run_simulation(s0: int, K: int, T: int, r: float, sigma: float, option_type: str, n_shares: int, period: int, timescale: str, transaction_cost: float, session_id: str, _: int):
     """
-
+    Submit the hedging simulation as a background job, its results being rendered by poll_simulation.
     """
     is_call = True if option_type == "Call" else False
-    scale_names = {"Daily": "Day", "Weekly": "Week"}
 
     bsm = BSM()
     bsm.initialize_bsm(s0, K, T, r, sigma / 100)
-    bsm.compute_spot_price(timescale, period)
+    data.dump_data(session_id, bsm)
 
-    fig = draw_spot_simulation(bsm.price, period)
-    data.dump_data(bsm)
+    return submit_hedging_job(bsm, n_shares, is_call, transaction_cost, period, timescale), False
 
-    _df = create_hedging_df(bsm, period, n_shares, is_call)
-    _df.rename(columns={"index": scale_names[timescale]}, inplace=True)
 
-    _cols = [
-        {"field": col_name} for col_name in _df.columns
-    ]
+@callback(
+    Output("hedging_job", "data", allow_duplicate=True),
+    Output("hedging_poll", "disabled", allow_duplicate=True),
+    State("simulation_period_input", "value"),
+    State("hedging_timescale", "value"),
+    State("option_type", "value"),
+    State("shares_input", "value"),
+    State("transaction_cost_input", "value"),
+    State("session_id", "data"),
+    Input("reload", "n_clicks"),
+    prevent_initial_call=True
+)
+def update_spot_simulation(period: int, timescale: str, option_type: str, n_shares: int, transaction_cost: float, session_id: str, _: int):
+    is_call = True if option_type == "Call" else False
 
-    grid = dag.AgGrid(
-        id="hedging_table",
-        columnDefs=_cols,
-        rowData=_df.to_dict("records")
-    )
-    result_layout = [
+    bsm = data.load_data(session_id)
+    if bsm is None:
+        raise PreventUpdate
+    # new spot paths, the run button replaying the stored ones of its market parameters
+    return submit_hedging_job(bsm, n_shares, is_call, transaction_cost, period, timescale, seed=None), False
+
+
+@callback(
+    Output("spot_simulation", "figure", allow_duplicate=True),
+    Output("simulation_result", "children"),
+    Output("hedging_progress", "value"),
+    Output("hedging_progress", "label"),
+    Output("hedging_poll", "disabled", allow_duplicate=True),
+    Input("hedging_poll", "n_intervals"),
+    State("hedging_job", "data"),
+    prevent_initial_call=True
+)
+def poll_simulation(_: int, job: dict | None):
+    """
+    Render the progress and the partial or final results of the running hedging job.
+    """
+    if job is None:
+        raise PreventUpdate
+    status = jobs.status(job["job_id"])
+    progress = round(100 * status["progress"])
+    finished = status["status"] != "running"
+    hedging = status["result"]
+
+    if status["status"] == "unknown":
+        return no_update, create_expired_layout(), progress, "Expired", True
+    if status["status"] == "failed":
+        return no_update, html.H6(f"Simulation failed {status.get('error', '')}"), progress, "Failed", True
+    label = "Cancelled" if status["status"] == "cancelled" else f"{progress}%"
+    if hedging is None:
+        return no_update, no_update, progress, label, finished
+
+    fig = draw_spot_simulation(hedging["Stock Price"][0], hedging["Stock Price"].shape[1] - 1)
+    if not finished:
+        # partial results: P&L statistics over the paths simulated so far, the table is only built once
+        return fig, create_summary_layout(hedging["P&L"]), progress, label, False
+    return fig, create_result_layout(hedging, job["timescale"]), progress, label, True
+
+
+@callback(
+    Output("hedging_progress", "label", allow_duplicate=True),
+    Input("cancel_button", "n_clicks"),
+    State("hedging_job", "data"),
+    prevent_initial_call=True
+)
+def cancel_simulation(_: int, job: dict | None):
+    if job is None or not jobs.cancel(job["job_id"]):
+        raise PreventUpdate
+    return "Cancelling..."
+
+
+def create_summary_layout(pnl: np.ndarray):
+    summary = DeltaHedging.summarize(pnl)
+    return [
         dbc.Row([
             dbc.Col([
                 dbc.Card([
-                    dbc.CardBody()
+                    dbc.CardBody([
+                        html.H6(f"Hedging P&L over {pnl.size:,} paths :"),
+                        html.H6(f"Mean ${summary['Mean']:.2f} | Std ${summary['Std']:.2f}")
+                    ])
                 ])
             ]),
             dbc.Col([
                 dbc.Card([
-                    dbc.CardBody()
+                    dbc.CardBody([
+                        html.H6("Hedging P&L quantiles :"),
+                        html.H6(f"5% ${summary['5%']:.2f} | 50% ${summary['Median']:.2f} | 95% ${summary['95%']:.2f}")
+                    ])
                 ])
             ]),
         ]),
-        html.Br(),
-        grid
     ]
-    return fig, result_layout
 
 
-@callback(
-    Output("spot_simulation", "figure", allow_duplicate=True),
-    Output("hedging_table", "rowData"),
-    State("simulation_period_input", "value"),
-    State("hedging_timescale", "value"),
-    State("option_type", "value"),
-    State("shares_input", "value"),
-    Input("reload", "n_clicks"),
-    prevent_initial_call=True
-)
-def update_spot_simulation(period: int, timescale: str, option_type: str, n_shares: int, _: int):
-    is_call = True if option_type == "Call" else False
-    scale_names = {"Daily": "Day", "Weekly": "Week"}
+def create_expired_layout():
+    return [html.H6("Simulation results expired, run the simulation again.")]
+
 
-    bsm = data.load_data()
-    bsm.compute_spot_price(timescale, period)
+def create_result_layout(hedging: dict[str, np.ndarray], timescale: str):
+    # rows are served page by page by page_hedging_table instead of being sent as one record list
+    _cols = [
+        {"field": col_name} for col_name in hedging_columns(hedging, timescale)
+    ]
+
+    grid = dag.AgGrid(
+        id="hedging_table",
+        columnDefs=_cols,
+        rowModelType="infinite",
+        dashGridOptions={"cacheBlockSize": HEDGING_PAGE_SIZE, "maxBlocksInCache": 10}
+    )
+    return create_summary_layout(hedging["P&L"]) + [html.Br(), grid]
+
+
+def hedging_columns(hedging: dict[str, np.ndarray], timescale: str, path: int = 0) -> dict[str, np.ndarray]:
+    scale_names = {"Daily": "Day", "Weekly": "Week"}
+    _cols = ["Stock Price", "Delta", "Shares Purchased", "Cost", "Cash"]
+    columns = {scale_names[timescale]: np.arange(hedging["Stock Price"].shape[1])}
+    columns.update({col: hedging[col][path] for col in _cols})
+    return columns
 
-    fig = draw_spot_simulation(bsm.price, period)
-    _df = create_hedging_df(bsm, period, n_shares, is_call)
-    _df.rename(columns={"index": scale_names[timescale]}, inplace=True)
 
-    return fig, _df.to_dict("records")
+@callback(
+    Output("hedging_table", "getRowsResponse"),
+    Output("simulation_result", "children", allow_duplicate=True),
+    Input("hedging_table", "getRowsRequest"),
+    State("hedging_job", "data"),
+    prevent_initial_call=True
+)
+def page_hedging_table(request: dict | None, job: dict | None):
+    if request is None or job is None:
+        raise PreventUpdate
+    hedging = jobs.status(job["job_id"])["result"]
+    if hedging is None:
+        # the finished job was forgotten by the job manager after its ttl, its rows cannot be served anymore
+        return {"rowData": [], "rowCount": 0}, create_expired_layout()
+    columns = hedging_columns(hedging, job["timescale"])
+    return {
+        "rowData": page_records(columns, request["startRow"], request["endRow"]),
+        "rowCount": hedging["Stock Price"].shape[1],
+    }, no_update
 
 
 @callback(
@@ -169,30 +278,49 @@ def update_hedging_timescale_text(timescale: str):
 def draw_spot_simulation(spot: list[np.array], period: int):
     spot_fig = go.Figure()
     t = np.arange(period+1)
+    if t.size > MAX_POINTS:
+        t, spot = lttb(t, np.asarray(spot))
     spot_fig.add_trace(
         go.Scatter(
-            x=t,
-            y=spot
+            x=typed_array(t),
+            y=typed_array(spot)
         )
     )
     spot_fig.update_layout(template="plotly_dark", paper_bgcolor="#302e32", plot_bgcolor="#302e32", margin=dict(l=10, r=10, t=20, b=20))
     return spot_fig
 
 
-def create_hedging_df(bsm_model: BSM, period: int, n_shares: int, is_call: bool):
-    _cols = ["Stock Price", "Delta", "Shares Purchased", "Cost"]
-    t = np.arange(period + 1)
-    _df = pd.DataFrame(data=.0, columns=_cols, index=t)
+def submit_hedging_job(bsm_model: BSM, n_shares: int, is_call: bool, transaction_cost: float, period: int, timescale: str,
+                       seed: int | None = 0) -> dict:
+    """
+    Split the hedging simulation into chunks of paths run in the background, each replaying the spot paths stored
+    under its own seed. A fixed seed makes runs on the same market reuse the stored paths whatever the option and
+    hedge settings. None draws new paths, simulated in memory since they are never reused. Identical requests still
+    running are joined rather than started twice.
+    """
+    hedging = DeltaHedging(bsm_model.spot, bsm_model.strike, bsm_model.maturity, bsm_model.risk_free,
+                           bsm_model.volatility, is_call, n_shares, transaction_cost or 0.)
+    seeds = np.random.SeedSequence(seed).generate_state(HEDGING_CHUNKS, np.uint64).tolist()
+    params = {"model": vars(hedging), "period": period, "timescale": timescale, "n_paths": HEDGING_PATHS,
+              "seeds": seeds}
+    chunk_paths = -(-HEDGING_PATHS // HEDGING_CHUNKS)
+    root = None if seed is None else path_store.root
+    tasks = [(hedge_stored_paths, (hedging, root, chunk_seed, min(chunk_paths, HEDGING_PATHS - start),
+                                   period, TIMESCALES[timescale]))
+             for start, chunk_seed in zip(range(0, HEDGING_PATHS, chunk_paths), seeds)]
+    job_id = jobs.submit("hedging", params, tasks, combine_hedging_chunks, cancellable=True)
+    return {"job_id": job_id, "timescale": timescale}
+
 
-    _df["Stock Price"] = bsm_model.price
-    _df["Delta"] = bsm_model.compute_delta(bsm_model.price,
-                                           bsm_model.strike,
-                                           bsm_model.risk_free,
-                                           bsm_model.period,
-                                           bsm_model.volatility,
-                                           is_call)
-    _df["Shares Purchased"] = (_df["Delta"] - _df["Delta"].shift(1, fill_value=0)) * n_shares
-    _df["Cost"] = _df["Shares Purchased"] * _df["Stock Price"]
+def combine_hedging_chunks(chunks: list[dict[str, np.ndarray]]) -> dict[str, np.ndarray] | None:
+    """
+    Merge finished chunks: the P&L of every simulated path, and the sample paths of the first chunk. Chunks
+    cancelled before simulating any path are skipped, None being returned if no chunk has any.
+    """
+    chunks = [chunk for chunk in chunks if chunk["P&L"].size]
+    if not chunks:
+        return None
+    combined = dict(chunks[0])
+    combined["P&L"] = np.concatenate([chunk["P&L"] for chunk in chunks])
+    return combined
 
-    _df.reset_index(inplace=True)
-    return _df
@@ -1,11 +1,14 @@
+from typing import TYPE_CHECKING
 import numpy as np
-import pandas as pd
 import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 from BSM import BSM
-from utils.data import DataManager
 from plotly.subplots import make_subplots
 from dash import Input, State, Output, dcc, html, callback
+from utils.transport import typed_array
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def create_greek_layout():
@@ -67,23 +70,22 @@ def create_greek_layout():
     prevent_initial_call=True
 )
 def run_greeks(s0, K, T, r, sigma, option_type, _):
+    import pandas as pd
+
     is_call = True if option_type == "Call" else False
-    bsm = BSM()
-    bsm.initialize_bsm(s0, K, T, r, sigma)
     time = np.linspace(0, T, 50)
-    greeks = pd.DataFrame(data=.0, columns=["Delta", "Gamma", "Theta", "Vega", "Rho"], index=time)
-    greeks["Delta"] = bsm.compute_delta(s0, K, r, time, sigma, is_call)
-    greeks["Gamma"] = bsm.compute_gamma(s0, K, r, time, sigma)
-    greeks["Theta"] = bsm.compute_theta(s0, K, r, time, sigma, is_call)
-    greeks["Vega"] = bsm.compute_vega(s0, K, r, time, sigma)
-    greeks["Rho"] = bsm.compute_rho(s0, K, r, time, sigma, is_call)
+    greeks = pd.DataFrame(
+        BSM.compute_greeks_batch(s0, K, r, time, sigma, is_call, greeks=("delta", "gamma", "theta", "vega", "rho")),
+        index=time
+    )
+    greeks.rename(columns=str.capitalize, inplace=True)
 
     greeks_plot = draw_greeks_plot(greeks)
 
     return greeks_plot
 
 
-def draw_greeks_plot(greeks: pd.DataFrame):
+def draw_greeks_plot(greeks: "pd.DataFrame"):
     title = ["∆", "Γ", "Θ", "V", "Ρ"]
     greeks_plot = make_subplots(rows=3, cols=2)
     s = 0
@@ -91,8 +93,8 @@ def draw_greeks_plot(greeks: pd.DataFrame):
         for i in range(3):
             greeks_plot.add_traces(
                 [go.Scatter(
-                    x=greeks.index,
-                    y=greeks[greeks.columns[s]],
+                    x=typed_array(greeks.index),
+                    y=typed_array(greeks[greeks.columns[s]]),
                     name=title[s]
                 )],
                 rows=i+1,
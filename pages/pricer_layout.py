@@ -1,11 +1,19 @@
+from typing import TYPE_CHECKING
 from BSM import BSM
 from utils.data import DataManager
+from utils.grid_cache import PriceGridCache, check_range, snap_axis
+from utils.transport import MAX_TEXT_CELLS, typed_array
 import numpy as np
 import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 from dash import Input, State, Output, dcc, html, callback
+from dash.exceptions import PreventUpdate
 
-data = DataManager()
+if TYPE_CHECKING:
+    from vol_surface import VolSurface
+
+data = DataManager("pricer")
+grid_cache = PriceGridCache()
 
 
 def create_pricer_layout():
@@ -88,10 +96,11 @@ def create_pricer_layout():
     State("maturity_input", "value"),
     State("rate_input", "value"),
     State("volatility_slider", "value"),
+    State("session_id", "data"),
     Input("compute_button", "n_clicks"),
     prevent_initial_call=True
 )
-def run_bsm(s0: int, K: int, T: int, r: float, sigma: float, _: int):
+def run_bsm(s0: int, K: int, T: int, r: float, sigma: float, session_id: str, _: int):
     bsm = BSM()
     bsm.initialize_bsm(s0, K, T, r, sigma/100)
     c, p = bsm.compute_option_price()
@@ -125,7 +134,7 @@ def run_bsm(s0: int, K: int, T: int, r: float, sigma: float, _: int):
             ])
         ])
     ]
-    data.dump_data(bsm)
+    data.dump_data(session_id, bsm)
     return call_result, put_result, graph_result, spot_range[0], spot_range[1], spot_range, volatility_range[0], volatility_range[1], volatility_range
 
 
@@ -135,24 +144,37 @@ def run_bsm(s0: int, K: int, T: int, r: float, sigma: float, _: int):
     Input("hm_size", "value"),
     Input("spot_range", "value"),
     Input("volatility_range", "value"),
+    State("session_id", "data"),
     prevent_initial_call=True,
 )
-def update_heat_maps(n: int, spot_range: list[int], sigma_range: list[float]):
-    bsm = data.load_data()
+def update_heat_maps(n: int, spot_range: list[int], sigma_range: list[float], session_id: str):
+    bsm = data.load_data(session_id)
+    if bsm is None:
+        raise PreventUpdate
     call_map_fig, put_map_fig = draw_options_heat_maps(n, spot_range, sigma_range, bsm.maturity, bsm.strike, bsm.risk_free)
 
     return call_map_fig, put_map_fig
 
 
-def draw_options_heat_maps(n: int, spot_range: list[int], volatility_range: list[float], T:int, K: int, r: float):
-    spots = np.linspace(spot_range[0], spot_range[1], n)
-    sigmas = np.linspace(volatility_range[0], volatility_range[1], n)
-    bsm = BSM()
-
-    call_map = np.array([[bsm.compute_bsm(s, K, r, T, sigma) for s in spots] for sigma in sigmas])
-    put_map = np.array([[bsm.compute_bsm(s, K, r, T, sigma, is_call=False) for s in spots] for sigma in sigmas])
-
-    call_fig = go.Figure(layout=go.Layout(template="plotly_dark", paper_bgcolor="#302e32", margin=dict(l=25, r=25, t=35, b=35)), data=go.Heatmap(z=call_map, x=spots, y=sigmas, texttemplate="%{z:$.2f}"))
-    put_fig = go.Figure(layout=go.Layout(template="plotly_dark", paper_bgcolor="#302e32", margin=dict(l=25, r=25, t=35, b=35)), data=go.Heatmap(z=put_map, x=spots, y=sigmas, texttemplate="%{z:$.2f}"))
+def draw_options_heat_maps(n: int, spot_range: list[int], volatility_range: list[float], T:int, K: int, r: float,
+                           surface: "VolSurface | None" = None):
+    # axes snapped to a lattice, so that moving a slider mostly hits cells already priced
+    spots = check_range(snap_axis(spot_range[0], spot_range[1], n), spot_range[0], spot_range[1])
+    sigmas = check_range(snap_axis(volatility_range[0], volatility_range[1], n), volatility_range[0], volatility_range[1])
+    pricing_sigmas = sigmas
+    if surface is not None:
+        # with a surface, the volatility axis is the at-the-money level, and each row is priced at that level plus
+        # the smile premium of the strike over the forward of the surface
+        forward = surface.spot * np.exp(surface.r * T)
+        pricing_sigmas = np.maximum(sigmas + float(surface(K, T) - surface(forward, T)), 1e-4)
+
+    # rows follow the volatility axis and columns the spot axis
+    call_map, put_map = grid_cache.get(spots, pricing_sigmas, K, r, T)
+
+    # per-cell labels are unreadable and costly on big grids, the hover label still shows the values
+    texttemplate = "%{z:$.2f}" if call_map.size <= MAX_TEXT_CELLS else None
+    spots, sigmas = typed_array(spots), typed_array(sigmas)
+    call_fig = go.Figure(layout=go.Layout(template="plotly_dark", paper_bgcolor="#302e32", margin=dict(l=25, r=25, t=35, b=35)), data=go.Heatmap(z=typed_array(call_map), x=spots, y=sigmas, texttemplate=texttemplate))
+    put_fig = go.Figure(layout=go.Layout(template="plotly_dark", paper_bgcolor="#302e32", margin=dict(l=25, r=25, t=35, b=35)), data=go.Heatmap(z=typed_array(put_map), x=spots, y=sigmas, texttemplate=texttemplate))
 
     return call_fig, put_fig
@@ -0,0 +1,172 @@
+import os
+from typing import Callable
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from monte_carlo import MonteCarlo, _Moments
+from delta_hedging import DeltaHedging
+
+
+class VanillaPayoff:
+
+    def __init__(self, K: float, is_call=True):
+        """
+        Picklable European call/put payoff on the terminal spot, to be shipped to worker processes.
+        Args:
+            K (float): Strike price (in $).
+            is_call (bool): True for a call, False for a put.
+        """
+        self.K = K
+        self.w = 1. if is_call else -1.
+
+    def __call__(self, paths: np.ndarray) -> np.ndarray:
+        return np.maximum(self.w * (paths[:, -1] - self.K), 0)
+
+
+def _run_shard(spot: float, risk_free_rate: float, volatility: float, dtype: type, seed: np.random.SeedSequence,
+               payoff: Callable[[np.ndarray], np.ndarray], T: float, n_paths: int, n_steps: int,
+               chunk_size: int) -> _Moments:
+    """
+    Simulate one shard of paths on its own random stream and return only the sufficient statistics of the payoff.
+    """
+    engine = MonteCarlo(spot, risk_free_rate, volatility, dtype, seed)
+    moments = _Moments()
+    for paths in engine.iter_paths(n_paths, n_steps, T, chunk_size):
+        moments.add(payoff(paths))
+    return moments
+
+
+def _run_hedging_shard(hedging: DeltaHedging, seed: np.random.SeedSequence, n_paths: int, n_steps: int, dt: float,
+                       chunk_size: int) -> _Moments:
+    """
+    Run one shard of a delta-hedging simulation, chunk by chunk, and return only the moments of the hedging P&L.
+    """
+    moments = _Moments()
+    n_chunks = -(-n_paths // chunk_size)
+    for i, stream in enumerate(seed.spawn(n_chunks)):
+        moments.add(hedging.simulate(min(chunk_size, n_paths - i * chunk_size), n_steps, dt, stream)["P&L"])
+    return moments
+
+
+class ParallelMonteCarlo:
+
+    def __init__(self, spot: float, risk_free_rate: float, volatility: float, n_workers: int | None = None,
+                 dtype: type = np.float64, seed: int | None = None):
+        """
+        Monte Carlo engine sharding paths across a process pool, each shard drawing from an independent stream
+        spawned from a single seed. Workers only send back payoff sums and sums of squares, never path arrays.
+        The pool is started on first use and kept until close(), so successive pricings do not pay its startup.
+        Args:
+            spot (float): Current spot price (in $).
+            risk_free_rate (float): Annualized risk-free interest rate (e.g., .05 for 5%).
+            volatility (float): Volatility of the underlying asset (e.g., .20 for 20%).
+            n_workers (int | None): Number of worker processes, the number of CPUs if None.
+            dtype (type): Floating point type of the simulated paths (np.float32 or np.float64).
+            seed (int | None): Root seed, from which one stream per shard is spawned.
+        """
+        self.spot = spot
+        self.risk_free = risk_free_rate
+        self.volatility = volatility
+        self.n_workers = n_workers or os.cpu_count()
+        self.dtype = dtype
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "ParallelMonteCarlo":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run_shards(self, fn: Callable[..., _Moments], args: list[tuple]) -> _Moments:
+        """
+        Run the shards on the pool, or inline with a single worker, and merge their moments in shard order.
+        """
+        if self.n_workers == 1:
+            shards = [fn(*a) for a in args]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.n_workers)
+            shards = list(self._executor.map(fn, *zip(*args)))
+        moments = _Moments()
+        for shard in shards:
+            moments.merge(shard)
+        return moments
+
+    def compute_price(self, payoff: Callable[[np.ndarray], np.ndarray], T: float, n_paths: int, n_steps: int = 1,
+                      chunk_size: int = 100_000, n_shards: int | None = None) -> tuple[float, float]:
+        """
+        Compute the Monte Carlo price of a European-style payoff along with its standard error.
+        Results are identical bit-for-bit for a given seed and number of shards (the number of workers by default),
+        since shard streams are spawned deterministically and shard statistics are merged in shard order.
+        Args:
+            payoff (Callable[[np.ndarray], np.ndarray]): Picklable callable mapping an (m, n_steps+1) matrix of
+                paths to m payoffs.
+            T (float): Option maturity (in years).
+            n_paths (int): Total number of simulated paths.
+            n_steps (int): Number of time steps per path.
+            chunk_size (int): Maximum number of paths simulated at once in each worker.
+            n_shards (int | None): Number of independent shards, the number of workers if None.
+        Returns:
+            tuple[float, float]: Tuple containing:
+                - Discounted expected payoff (float)
+                - Standard error of the estimate (float)
+        """
+        n_shards = n_shards or self.n_workers
+        # spawning from a copy keeps the streams of successive calls identical for the same root seed
+        streams = np.random.SeedSequence(self.seed_sequence.entropy).spawn(n_shards)
+        sizes = [n_paths // n_shards + (i < n_paths % n_shards) for i in range(n_shards)]
+        args = [(self.spot, self.risk_free, self.volatility, self.dtype, stream, payoff, T, size, n_steps, chunk_size)
+                for stream, size in zip(streams, sizes)]
+        moments = self._run_shards(_run_shard, args)
+        discount = np.exp(-self.risk_free * T)
+        return discount * moments.mean, discount * np.sqrt(moments.variance / moments.count)
+
+    def compute_option_price(self, K: float, T: float, n_paths: int, is_call=True, chunk_size: int = 100_000,
+                             n_shards: int | None = None) -> tuple[float, float]:
+        """
+        Compute the Monte Carlo price of a European call/put option along with its standard error.
+        Args:
+            K (float): Strike price (in $).
+            T (float): Option maturity (in years).
+            n_paths (int): Total number of simulated paths.
+            is_call (bool): True for a call, False for a put.
+            chunk_size (int): Maximum number of paths simulated at once in each worker.
+            n_shards (int | None): Number of independent shards, the number of workers if None.
+        Returns:
+            tuple[float, float]: Tuple containing:
+                - Option price (float)
+                - Standard error of the estimate (float)
+        """
+        return self.compute_price(VanillaPayoff(K, is_call), T, n_paths, 1, chunk_size, n_shards)
+
+    def compute_hedging_pnl(self, hedging: DeltaHedging, n_paths: int, n_steps: int, dt: float,
+                            chunk_size: int = 10_000, n_shards: int | None = None) -> tuple[float, float, float]:
+        """
+        Moments of the hedging error of a delta-hedging backtest, sharded across the pool like compute_price.
+        The simulation uses the market parameters of the hedging backtester, and workers only send back the P&L
+        moments of their shard.
+        Args:
+            hedging (DeltaHedging): Delta-hedging backtester.
+            n_paths (int): Total number of simulated paths.
+            n_steps (int): Number of rebalancing steps.
+            dt (float): Time between two rebalancing steps (in years).
+            chunk_size (int): Maximum number of paths simulated at once in each worker.
+            n_shards (int | None): Number of independent shards, the number of workers if None.
+        Returns:
+            tuple[float, float, float]: Tuple containing:
+                - Mean hedging P&L (float)
+                - Standard deviation of the hedging P&L (float)
+                - Standard error of the mean (float)
+        """
+        n_shards = n_shards or self.n_workers
+        streams = np.random.SeedSequence(self.seed_sequence.entropy).spawn(n_shards)
+        sizes = [n_paths // n_shards + (i < n_paths % n_shards) for i in range(n_shards)]
+        moments = self._run_shards(_run_hedging_shard, [(hedging, stream, size, n_steps, dt, chunk_size)
+                                                        for stream, size in zip(streams, sizes)])
+        std = np.sqrt(moments.variance)
+        return moments.mean, std, std / np.sqrt(moments.count)
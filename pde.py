@@ -0,0 +1,127 @@
+from functools import lru_cache
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+
+class FiniteDifference:
+
+    def __init__(self, n_space: int = 400, n_time: int = 200, width: float = 5., n_rannacher: int = 2):
+        """
+        Black-Scholes PDE solver using Crank-Nicolson time stepping on a log-spot grid. The tridiagonal system only
+        depends on (r, sigma, grid), so its sparse LU factorization is computed once and reused for every time step
+        and for every contract sharing it, all contracts being solved together as right-hand side columns.
+        Early exercise is handled with the Ikonen-Toivanen operator splitting, which keeps the same factorization.
+        Args:
+            n_space (int): Number of points of the log-spot grid.
+            n_time (int): Number of time steps.
+            width (float): Half-width of the grid around the spots of interest, in standard deviations sigma * sqrt(T).
+            n_rannacher (int): Number of initial fully implicit steps, damping the oscillations of the payoff kink.
+        """
+        self.n_space = n_space
+        self.n_time = n_time
+        self.width = width
+        self.n_rannacher = n_rannacher
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _factorize(r: float, sigma: float, dx: float, dt: float, n: int, theta: float):
+        """
+        LU factorization of (I - theta * dt * L) over the n interior points of the grid, L being the Black-Scholes
+        operator in log-spot. Cached so that contracts and solves sharing (r, sigma, grid) reuse it.
+        """
+        lower, diag, upper = FiniteDifference._operator(r, sigma, dx)
+        matrix = sparse.diags([-theta * dt * lower, 1 - theta * dt * diag, -theta * dt * upper], [-1, 0, 1],
+                              shape=(n, n), format="csc")
+        return splu(matrix)
+
+    @staticmethod
+    def _operator(r: float, sigma: float, dx: float) -> tuple[float, float, float]:
+        """
+        Coefficients of the Black-Scholes operator V_tau = 1/2 sigma^2 V_xx + (r - 1/2 sigma^2) V_x - r V.
+        """
+        alpha = .5 * sigma ** 2 / dx ** 2
+        beta = (r - .5 * sigma ** 2) / (2 * dx)
+        return alpha - beta, -2 * alpha - r, alpha + beta
+
+    def solve(self, spots: float | np.ndarray, K: float | np.ndarray, r: float, T: float, sigma: float,
+              is_call: bool | np.ndarray = True, is_american: bool | np.ndarray = False) -> dict[str, np.ndarray]:
+        """
+        Solve the pricing PDE of a batch of contracts sharing (r, T, sigma), and read price, delta and gamma at the
+        requested spots. One solve gives the whole spot axis, so a full row of the heat map costs a single solve.
+        Args:
+            spots (float | np.ndarray): Spot price(s) at which to read the solution (in $).
+            K (float | np.ndarray): Strike price(s) of the contracts (in $).
+            r (float): Annualized risk-free interest rate.
+            T (float): Time to option expiration (in years).
+            sigma (float): Volatility of the underlying asset.
+            is_call (bool | np.ndarray): Option type flag(s), True for calls and False for puts.
+            is_american (bool | np.ndarray): Exercise style flag(s), True for American and False for European.
+        Returns:
+            dict[str, np.ndarray]: "price", "delta" and "gamma", of shape (n_spots, n_contracts).
+        """
+        spots = np.atleast_1d(np.asarray(spots, dtype=float))
+        K, is_call, is_american = np.broadcast_arrays(np.atleast_1d(np.asarray(K, dtype=float)),
+                                                      np.asarray(is_call, dtype=bool), np.asarray(is_american, dtype=bool))
+        w = np.where(is_call, 1., -1.)
+
+        # grid covering the requested spots and strikes, with a margin of a few standard deviations
+        margin = self.width * sigma * np.sqrt(T)
+        x_lo = min(np.log(spots.min()), np.log(K.min())) - margin
+        x_hi = max(np.log(spots.max()), np.log(K.max())) + margin
+        x = np.linspace(x_lo, x_hi, self.n_space)
+        dx = x[1] - x[0]
+        dt = T / self.n_time
+        s = np.exp(x)[:, np.newaxis]
+
+        # (n_space, n_contracts) node values, starting from the payoff at tau = 0
+        intrinsic = np.maximum(w * (s - K), 0)
+        values = intrinsic.copy()
+        # European contracts get a -inf exercise floor, which leaves them untouched by the splitting below
+        floor = np.where(is_american, intrinsic, -np.inf)[1:-1]
+        multiplier = np.zeros_like(floor)
+        lower, diag, upper = self._operator(r, sigma, dx)
+
+        for step in range(1, self.n_time + 1):
+            theta = 1. if step <= self.n_rannacher else .5
+            lu = self._factorize(r, sigma, dx, dt, self.n_space - 2, theta)
+            tau = step * dt
+            explicit = lower * values[:-2] + diag * values[1:-1] + upper * values[2:]
+            rhs = values[1:-1] + (1 - theta) * dt * explicit + dt * multiplier
+
+            # Dirichlet boundaries, discounted intrinsic values floored by the exercise value for American contracts
+            bound_lo = np.maximum(w * (s[0] - K * np.exp(-r * tau)), 0)
+            bound_hi = np.maximum(w * (s[-1] - K * np.exp(-r * tau)), 0)
+            bound_lo = np.where(is_american, np.maximum(bound_lo, intrinsic[0]), bound_lo)
+            bound_hi = np.where(is_american, np.maximum(bound_hi, intrinsic[-1]), bound_hi)
+            rhs[0] += theta * dt * lower * bound_lo
+            rhs[-1] += theta * dt * upper * bound_hi
+
+            solution = lu.solve(rhs)
+            values[1:-1] = np.maximum(solution - dt * multiplier, floor)
+            np.maximum(multiplier + (floor - solution) / dt, 0, out=multiplier)
+            values[0], values[-1] = bound_lo, bound_hi
+
+        # derivatives in log-spot converted to spot: V_S = V_x / S, V_SS = (V_xx - V_x) / S^2
+        v_x = np.gradient(values, dx, axis=0)
+        v_xx = np.gradient(v_x, dx, axis=0)
+        surfaces = {"price": values, "delta": v_x / s, "gamma": (v_xx - v_x) / s ** 2}
+        return {name: self._interpolate(x, surface, np.log(spots)) for name, surface in surfaces.items()}
+
+    @staticmethod
+    def _interpolate(x: np.ndarray, surface: np.ndarray, x_query: np.ndarray) -> np.ndarray:
+        """
+        Linear interpolation of every column of a surface at once, the grid being shared by all columns.
+        """
+        idx = np.clip(np.searchsorted(x, x_query), 1, x.size - 1)
+        t = ((x_query - x[idx - 1]) / (x[idx] - x[idx - 1]))[:, np.newaxis]
+        return surface[idx - 1] * (1 - t) + surface[idx] * t
+
+    def compute_price(self, s0: float, K: float | np.ndarray, r: float, T: float, sigma: float,
+                      is_call: bool | np.ndarray = True, is_american: bool | np.ndarray = False) -> np.ndarray:
+        """
+        Compute option prices at a single spot for a batch of contracts sharing (r, T, sigma).
+        Returns:
+            np.ndarray: Option prices, one per contract.
+        """
+        return self.solve(s0, K, r, T, sigma, is_call, is_american)["price"][0]
@@ -0,0 +1,106 @@
+import numpy as np
+from BSM import BSM
+
+
+class Portfolio:
+
+    COLUMNS = ("underlying", "K", "T", "quantity", "is_call", "sigma")
+    EXPIRY_BUCKETS = (1 / 12, .25, .5, 1., 2., 5.)
+
+    def __init__(self, underlying: np.ndarray, K: np.ndarray, T: np.ndarray, quantity: np.ndarray,
+                 is_call: np.ndarray, sigma: np.ndarray, expiry_buckets: tuple[float, ...] = EXPIRY_BUCKETS):
+        """
+        Book of European option positions held column-wise, one NumPy array per field, so that the whole book is
+        valued in one vectorized pass and aggregated with a single bincount per output.
+        Args:
+            underlying (np.ndarray): Underlying id of each position, indexing the spot array given at valuation.
+            K (np.ndarray): Strike prices (in $).
+            T (np.ndarray): Times to option expiration (in years).
+            quantity (np.ndarray): Signed number of contracts, negative for short positions.
+            is_call (np.ndarray): Option type flags, True for calls and False for puts.
+            sigma (np.ndarray): Volatilities of the underlying assets.
+            expiry_buckets (tuple[float, ...]): Upper bounds (in years) of the expiry buckets, a last bucket
+                collecting every longer maturity.
+        """
+        self.underlying = np.asarray(underlying, dtype=np.intp)
+        self.K = np.asarray(K, dtype=float)
+        self.T = np.asarray(T, dtype=float)
+        self.quantity = np.asarray(quantity, dtype=float)
+        self.is_call = np.asarray(is_call, dtype=bool)
+        self.sigma = np.asarray(sigma, dtype=float)
+        self.expiry_buckets = np.asarray(expiry_buckets, dtype=float)
+        sizes = {getattr(self, name).shape for name in self.COLUMNS}
+        if len(sizes) != 1 or len(sizes.pop()) != 1:
+            raise ValueError("Position columns must be 1D arrays of the same length")
+
+    def __len__(self) -> int:
+        return self.K.size
+
+    @property
+    def n_underlyings(self) -> int:
+        return int(self.underlying.max()) + 1 if len(self) else 0
+
+    @property
+    def n_buckets(self) -> int:
+        return self.expiry_buckets.size + 1
+
+    def add(self, underlying: np.ndarray, K: np.ndarray, T: np.ndarray, quantity: np.ndarray,
+            is_call: np.ndarray, sigma: np.ndarray) -> None:
+        """
+        Append positions to the book, one concatenation per column.
+        """
+        new = Portfolio(*np.broadcast_arrays(underlying, K, T, quantity, is_call, sigma),
+                        expiry_buckets=tuple(self.expiry_buckets))
+        for name in self.COLUMNS:
+            setattr(self, name, np.concatenate((getattr(self, name), getattr(new, name))))
+
+    def compute_risk(self, spots: np.ndarray, r: float, greeks: tuple[str, ...] = BSM.GREEKS) -> dict[str, np.ndarray]:
+        """
+        Position-weighted price and Greeks of every position.
+        Args:
+            spots (np.ndarray): Spot price of each underlying, indexed by underlying id (in $).
+            r (float): Annualized risk-free interest rate.
+            greeks (tuple[str, ...]): Outputs to compute, any of "price", "delta", "gamma", "theta", "vega", "rho".
+        Returns:
+            dict[str, np.ndarray]: Requested outputs multiplied by the position quantities, one value per position.
+        """
+        s0 = np.asarray(spots, dtype=float)[self.underlying]
+        result = BSM.compute_greeks_batch(s0, self.K, r, self.T, self.sigma, self.is_call, greeks=greeks)
+        for value in result.values():
+            value *= self.quantity
+        return result
+
+    def aggregate(self, spots: np.ndarray, r: float,
+                  greeks: tuple[str, ...] = BSM.GREEKS) -> dict[str, dict[str, np.ndarray | float]]:
+        """
+        Aggregate the position-weighted price and Greeks of the book per underlying and per expiry bucket.
+        Args:
+            spots (np.ndarray): Spot price of each underlying, indexed by underlying id (in $).
+            r (float): Annualized risk-free interest rate.
+            greeks (tuple[str, ...]): Outputs to aggregate.
+        Returns:
+            dict[str, dict[str, np.ndarray | float]]: For each output:
+                - "grid": (n_underlyings, n_buckets) sums per underlying and expiry bucket (np.ndarray)
+                - "by_underlying": sums per underlying (np.ndarray)
+                - "by_expiry": sums per expiry bucket (np.ndarray)
+                - "total": sum over the book (float)
+        """
+        risk = self.compute_risk(spots, r, greeks)
+        n_underlyings, n_buckets = max(self.n_underlyings, len(spots)), self.n_buckets
+        # one flat group id per (underlying, bucket) cell, so that each output is a single bincount
+        group = self.underlying * n_buckets + np.searchsorted(self.expiry_buckets, self.T)
+        size = n_underlyings * n_buckets
+
+        result = {}
+        for name, value in risk.items():
+            grid = np.bincount(group, weights=value, minlength=size).reshape(n_underlyings, n_buckets)
+            result[name] = {"grid": grid, "by_underlying": grid.sum(axis=1), "by_expiry": grid.sum(axis=0),
+                            "total": float(grid.sum())}
+        return result
+
+    def bucket_labels(self) -> list[str]:
+        """
+        Labels of the expiry buckets, e.g. "<= 0.25y".
+        """
+        bounds = [f"{b:.2g}y" for b in self.expiry_buckets]
+        return [f"<= {b}" for b in bounds] + [f"> {bounds[-1]}"]
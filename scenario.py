@@ -0,0 +1,120 @@
+import numpy as np
+from BSM import BSM
+from utils.special import norm_cdf
+from portfolio import Portfolio
+
+
+class ScenarioEngine:
+
+    MIN_T = 1e-10
+    MIN_SIGMA = 1e-4
+
+    def __init__(self, spot_shocks: np.ndarray, vol_shocks: np.ndarray, time_shocks: np.ndarray = (0.,),
+                 max_cells: int = 2 ** 22):
+        """
+        Full revaluation of a set of European options under a cube of spot x volatility x time shocks, computed as
+        one broadcast BSM evaluation per chunk of contracts. Contracts are chunked so that a chunk never holds more
+        than max_cells values, and each chunk is reduced to the book cube right away.
+        Args:
+            spot_shocks (np.ndarray): Relative spot moves (e.g. -.1 for a 10% drop).
+            vol_shocks (np.ndarray): Absolute volatility moves (e.g. .05 for +5 vol points).
+            time_shocks (np.ndarray): Time decay (in years), maturities being floored at expiry.
+            max_cells (int): Maximum number of (scenario, contract) values held in memory at once.
+        """
+        self.spot_shocks = np.atleast_1d(np.asarray(spot_shocks, dtype=float))
+        self.vol_shocks = np.atleast_1d(np.asarray(vol_shocks, dtype=float))
+        self.time_shocks = np.atleast_1d(np.asarray(time_shocks, dtype=float))
+        self.max_cells = max_cells
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return self.spot_shocks.size, self.vol_shocks.size, self.time_shocks.size
+
+    def revalue(self, s0: float | np.ndarray, K: float | np.ndarray, r: float | np.ndarray,
+                T: float | np.ndarray, sigma: float | np.ndarray, is_call: bool | np.ndarray = True,
+                quantity: float | np.ndarray = 1.) -> dict[str, np.ndarray | float]:
+        """
+        Revalue the quantity-weighted sum of the contracts under every scenario of the cube.
+        Args:
+            s0 (float | np.ndarray): Spot price(s) (in $).
+            K (float | np.ndarray): Strike price(s) (in $).
+            r (float | np.ndarray): Annualized risk-free interest rate(s).
+            T (float | np.ndarray): Time(s) to option expiration (in years).
+            sigma (float | np.ndarray | VolSurface): Volatility(ies) of the underlying asset, or a surface evaluated
+                at every (K, T) before shocking.
+            is_call (bool | np.ndarray): Option type flag(s), True for calls and False for puts.
+            quantity (float | np.ndarray): Signed position size(s).
+        Returns:
+            dict[str, np.ndarray | float]: "base" value of the contracts, and the "value" and "pnl" cubes of shape
+                (n_spot_shocks, n_vol_shocks, n_time_shocks).
+        """
+        sigma = BSM._resolve_sigma(sigma, K, T)
+        s0, K, r, T, sigma, quantity, is_call = (np.ravel(x) for x in np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (s0, K, r, T, sigma, quantity)), np.asarray(is_call, dtype=bool)))
+        base = float(BSM.compute_bsm_batch(s0, K, r, T, sigma, is_call) @ quantity)
+
+        # shocks on the leading axes, contracts on the last one
+        spot_moves = 1 + self.spot_shocks[:, np.newaxis, np.newaxis, np.newaxis]
+        vol_moves = self.vol_shocks[np.newaxis, :, np.newaxis, np.newaxis]
+        time_moves = self.time_shocks[np.newaxis, np.newaxis, :, np.newaxis]
+        chunk_size = max(1, self.max_cells // int(np.prod(self.shape)))
+        w = np.where(is_call, 1., -1.)
+        # the outer w of the BSM price is folded into the position weights
+        weights = w * quantity
+
+        value = np.zeros(self.shape)
+        buffers = np.empty((2, *self.shape, min(chunk_size, s0.size)))
+        for start in range(0, s0.size, chunk_size):
+            chunk = slice(start, start + chunk_size)
+            n = s0[chunk].size
+            d1, d2 = buffers[0, ..., :n], buffers[1, ..., :n]
+            # d1 is separable: log-moneyness only depends on the spot shocks, drift and sigma * sqrt(T) on the
+            # vol and time shocks, so the transcendental terms are evaluated on the small factors only
+            spots = s0[chunk] * spot_moves
+            log_moneyness = np.log(spots / K[chunk])
+            shocked_t = np.maximum(T[chunk] - time_moves, self.MIN_T)
+            shocked_sigma = np.maximum(sigma[chunk] + vol_moves, self.MIN_SIGMA)
+            sigma_sqrt_t = shocked_sigma * np.sqrt(shocked_t)
+            drift = (r[chunk] + .5 * shocked_sigma ** 2) * shocked_t
+            discounted_strike = K[chunk] * np.exp(-r[chunk] * shocked_t)
+
+            np.add(log_moneyness, drift, out=d1)
+            d1 /= sigma_sqrt_t
+            np.subtract(d1, sigma_sqrt_t, out=d2)
+            d1 *= w[chunk]
+            d2 *= w[chunk]
+            norm_cdf(d1, out=d1)
+            norm_cdf(d2, out=d2)
+            d1 *= spots
+            d2 *= discounted_strike
+            d1 -= d2
+            value += d1 @ weights[chunk]
+        return {"base": base, "value": value, "pnl": value - base}
+
+    def revalue_portfolio(self, book: Portfolio, spots: np.ndarray, r: float) -> dict[str, np.ndarray | float]:
+        """
+        Revalue a whole book, the spot shocks being applied to every underlying at once.
+        """
+        return self.revalue(np.asarray(spots, dtype=float)[book.underlying], book.K, r, book.T, book.sigma,
+                            book.is_call, book.quantity)
+
+    def summarize(self, pnl: np.ndarray) -> dict[str, float | dict[str, float] | np.ndarray]:
+        """
+        Worst-case summary of a P&L cube.
+        Args:
+            pnl (np.ndarray): P&L cube returned by revalue.
+        Returns:
+            dict[str, float | dict[str, float] | np.ndarray]: "worst" and "best" P&L, the shocks of the
+                "worst_scenario", and the worst P&L per spot shock ("worst_by_spot"), per volatility shock
+                ("worst_by_vol") and per time shock ("worst_by_time").
+        """
+        i, j, k = np.unravel_index(np.argmin(pnl), pnl.shape)
+        return {
+            "worst": float(pnl[i, j, k]),
+            "best": float(pnl.max()),
+            "worst_scenario": {"spot": float(self.spot_shocks[i]), "vol": float(self.vol_shocks[j]),
+                               "time": float(self.time_shocks[k])},
+            "worst_by_spot": pnl.min(axis=(1, 2)),
+            "worst_by_vol": pnl.min(axis=(0, 2)),
+            "worst_by_time": pnl.min(axis=(0, 1)),
+        }
@@ -0,0 +1,264 @@
+import json
+import time
+import asyncio
+import logging
+import argparse
+from collections import deque
+import numpy as np
+from BSM import BSM
+from implied_vol import ImpliedVolSolver
+
+logger = logging.getLogger("PricingService")
+
+
+class ServiceMetrics:
+
+    def __init__(self, max_samples: int = 100_000):
+        """
+        Request latency and batch size metrics of the pricing service.
+        Args:
+            max_samples (int): Number of most recent latencies kept for the percentiles.
+        """
+        self.start = time.perf_counter()
+        self.requests = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.latencies = deque(maxlen=max_samples)
+
+    def record_request(self, latency: float) -> None:
+        self.requests += 1
+        self.latencies.append(latency)
+
+    def record_batch(self, size: int) -> None:
+        self.batches += 1
+        self.batched_requests += size
+
+    def snapshot(self) -> dict[str, float]:
+        latencies = np.array(self.latencies) * 1e3 if self.latencies else np.zeros(1)
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        return {
+            "requests": self.requests,
+            "throughput": self.requests / (time.perf_counter() - self.start),
+            "latency_p50_ms": p50,
+            "latency_p90_ms": p90,
+            "latency_p99_ms": p99,
+            "latency_max_ms": latencies.max(),
+            "mean_batch_size": self.batched_requests / max(self.batches, 1),
+        }
+
+
+class MicroBatcher:
+
+    KINDS = ("price", "greeks", "implied_vol")
+
+    def __init__(self, window: float = .001, max_batch: int = 4096, metrics: ServiceMetrics | None = None):
+        """
+        Coalesce concurrent single-contract requests into vectorized batches. A batch is flushed once max_batch
+        requests are pending or window seconds after its first request, whichever comes first, and each result is
+        fanned back out to the future of its request.
+        Args:
+            window (float): Maximum time (in seconds) a request waits for its batch to fill up.
+            max_batch (int): Maximum number of requests per batch.
+            metrics (ServiceMetrics | None): Metrics to record batch sizes into.
+        """
+        self.window = window
+        self.max_batch = max_batch
+        self.metrics = metrics or ServiceMetrics()
+        self.solver = ImpliedVolSolver()
+        self._pending: list[tuple[str, tuple, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    async def submit(self, kind: str, params: dict) -> dict[str, float]:
+        """
+        Queue a request and wait for the result of its batch.
+        Args:
+            kind (str): Request type, one of "price", "greeks" or "implied_vol".
+            params (dict): Contract parameters "s0", "K", "r", "T", "is_call", with "sigma" for "price" and
+                "greeks" requests, and the market "price" for "implied_vol" requests.
+        Returns:
+            dict[str, float]: Result of the request.
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown request type {kind}, expected one of {self.KINDS}")
+        # a malformed request fails here, on its own, rather than the whole batch it would have joined
+        contract = self._parse(kind, params)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((kind, contract, future))
+        if len(self._pending) >= self.max_batch or self.window <= 0:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.metrics.record_batch(len(batch))
+        for kind in self.KINDS:
+            requests = [(params, future) for k, params, future in batch if k == kind]
+            if not requests:
+                continue
+            try:
+                results = self._compute(kind, [contract for contract, _ in requests])
+            except Exception:
+                # requests are validated on submission, but should a batch still fail, each request is retried
+                # alone so that the error only reaches the request causing it
+                results = []
+                for contract, _ in requests:
+                    try:
+                        results.append(self._compute(kind, [contract])[0])
+                    except Exception as e:
+                        results.append(e)
+            for (_, future), result in zip(requests, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    @staticmethod
+    def _parse(kind: str, params: dict) -> tuple:
+        """
+        Validate the parameters of a request and convert them to a (s0, K, r, T, sigma or price, is_call) tuple.
+        """
+        if not isinstance(params, dict):
+            raise TypeError(f"Expected an object of contract parameters, got {type(params).__name__}")
+        names = ("s0", "K", "r", "T", "price" if kind == "implied_vol" else "sigma")
+        missing = [name for name in names if params.get(name) is None]
+        if missing:
+            raise ValueError(f"Missing parameter(s) {', '.join(missing)}")
+        values = []
+        for name in names:
+            value = params[name]
+            if isinstance(value, (str, bytes)):
+                raise ValueError(f"Parameter {name} must be a number, got {value!r}")
+            value = float(value)
+            if not np.isfinite(value):
+                raise ValueError(f"Parameter {name} must be finite, got {value}")
+            values.append(value)
+        # "false" or 0 would silently turn into a call through bool(), only JSON booleans are accepted
+        is_call = params.get("is_call", True)
+        if not isinstance(is_call, bool):
+            raise ValueError(f"Parameter is_call must be true or false, got {is_call!r}")
+        return *values, is_call
+
+    def _compute(self, kind: str, contracts: list[tuple]) -> list[dict[str, float]]:
+        """
+        Price a batch of parsed requests of the same type with one call of the vectorized kernels.
+        """
+        s0, K, r, T, last = (np.array(column, dtype=float) for column in list(zip(*contracts))[:5])
+        is_call = np.array([contract[5] for contract in contracts], dtype=bool)
+        if kind == "implied_vol":
+            sigma, n_iter, failed = self.solver.solve(last, s0, K, r, T, is_call)
+            return [{"sigma": None if f else float(s), "iterations": int(i)} for s, i, f in zip(sigma, n_iter, failed)]
+
+        greeks = BSM.GREEKS if kind == "greeks" else ("price",)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = BSM.compute_greeks_batch(s0, K, r, T, last, is_call, greeks=greeks)
+        values = np.column_stack([result[name] for name in greeks])
+        finite = np.isfinite(values)
+        return [dict(zip(greeks, row)) if ok.all() else self._undefined(greeks, row, ok)
+                for row, ok in zip(values.tolist(), finite)]
+
+    @staticmethod
+    def _undefined(greeks: tuple[str, ...], row: list[float], finite: np.ndarray) -> dict:
+        """
+        Result of a degenerate contract (zero maturity or volatility), whose undefined values are sent as null
+        with an error naming them, NaN and infinity not being valid JSON.
+        """
+        result = {name: value if ok else None for name, value, ok in zip(greeks, row, finite)}
+        undefined = [name for name, ok in zip(greeks, finite) if not ok]
+        result["error"] = f"Undefined {', '.join(undefined)} for this contract"
+        return result
+
+
+class PricingService:
+
+    def __init__(self, window: float = .001, max_batch: int = 4096):
+        """
+        Asyncio pricing server around the vectorized BSM kernels, speaking newline-delimited JSON over TCP or a
+        Unix socket. Each line is a request {"id": ..., "type": "price" | "greeks" | "implied_vol" | "metrics",
+        ...contract parameters}, answered by a line {"id": ..., "result": ...} or {"id": ..., "error": ...}.
+        Requests of a connection are processed concurrently, so that pipelined requests share batches.
+        Args:
+            window (float): Batching window (in seconds), 0 to disable batching.
+            max_batch (int): Maximum number of requests per batch.
+        """
+        self.metrics = ServiceMetrics()
+        self.batcher = MicroBatcher(window, max_batch, self.metrics)
+
+    async def handle_request(self, request: dict) -> dict:
+        if not isinstance(request, dict):
+            return {"id": None, "error": f"Invalid request: expected a JSON object, got {type(request).__name__}"}
+        start = time.perf_counter()
+        kind = request.pop("type", "price")
+        request_id = request.pop("id", None)
+        if kind == "metrics":
+            return {"id": request_id, "result": self.metrics.snapshot()}
+        try:
+            response = {"id": request_id, "result": await self.batcher.submit(kind, request)}
+        except Exception as e:
+            response = {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+        self.metrics.record_request(time.perf_counter() - start)
+        return response
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tasks = set()
+
+        async def respond(line: bytes) -> None:
+            try:
+                response = await self.handle_request(json.loads(line))
+            except json.JSONDecodeError as e:
+                response = {"id": None, "error": f"Invalid request: {e}"}
+            try:
+                line = json.dumps(response, allow_nan=False)
+            except ValueError as e:
+                line = json.dumps({"id": response.get("id"), "error": f"Invalid response: {e}"})
+            writer.write(line.encode() + b"\n")
+
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                if writer.transport.get_write_buffer_size() > 2 ** 20:
+                    await writer.drain()
+            if tasks:
+                await asyncio.gather(*tasks)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix_path: str | None = None) -> asyncio.Server:
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        logger.info(f"Pricing service listening on {unix_path or f'{host}:{port}'}")
+        return server
+
+
+async def main(host: str, port: int, unix_path: str | None, window: float, max_batch: int) -> None:
+    server = await PricingService(window, max_batch).start(host, port, unix_path)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Micro-batching BSM pricing service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", dest="unix_path", default=None, help="Unix socket path, overrides host/port")
+    parser.add_argument("--window", type=float, default=.001, help="Batching window in seconds, 0 to disable")
+    parser.add_argument("--max-batch", type=int, default=4096)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.unix_path, args.window, args.max_batch))
@@ -0,0 +1,139 @@
+import csv
+import time
+import asyncio
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+import numpy as np
+from utils.special import norm_cdf, norm_pdf
+
+
+def replay_ticks(path: str, delay: float | None = None) -> Iterator[tuple[float, float]]:
+    """
+    Replay (timestamp, spot) ticks from a CSV file with one "timestamp,spot" row per tick.
+    Args:
+        path (str): Path of the tick file.
+        delay (float | None): Pause between two ticks (in seconds), as fast as possible if None.
+    Yields:
+        tuple[float, float]: (timestamp, spot) ticks.
+    """
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#"):
+                continue
+            yield float(row[0]), float(row[1])
+            if delay:
+                time.sleep(delay)
+
+
+async def areplay_ticks(path: str, delay: float | None = None) -> AsyncIterator[tuple[float, float]]:
+    """
+    Asynchronous version of replay_ticks, yielding control to the event loop between ticks.
+    """
+    for tick in replay_ticks(path):
+        yield tick
+        await asyncio.sleep(delay or 0)
+
+
+class StreamingPricer:
+
+    def __init__(self, K: float | np.ndarray, T: float | np.ndarray, r: float | np.ndarray,
+                 sigma: float | np.ndarray, is_call: bool | np.ndarray = True, threshold: float = .05):
+        """
+        Tick-driven repricer of a book of European options on one underlying. Per-contract constants (log K,
+        sigma * sqrt(T), drift and discounted strike) are computed once at registration. On each tick, contracts
+        whose spot move since their last full pricing is small are updated with a delta-gamma expansion, and only
+        the others are fully repriced. Maturities are taken as fixed over the stream (intraday repricing).
+        Args:
+            K (float | np.ndarray): Strike price(s) of the book (in $).
+            T (float | np.ndarray): Time(s) to option expiration (in years).
+            r (float | np.ndarray): Annualized risk-free interest rate(s).
+            sigma (float | np.ndarray): Volatility(ies) of the underlying asset.
+            is_call (bool | np.ndarray): Option type flag(s), True for calls and False for puts.
+            threshold (float): Log spot move, in units of sigma * sqrt(T), above which a contract is fully repriced.
+        """
+        K, T, r, sigma, is_call = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (K, T, r, sigma)), np.asarray(is_call, dtype=bool))
+        self.threshold = threshold
+        self.w = np.where(is_call, 1., -1.)
+        self.log_strike = np.log(K)
+        self.sigma_sqrt_t = sigma * np.sqrt(T)
+        self.drift = (r + .5 * sigma ** 2) * T
+        self.discounted_strike = K * np.exp(-r * T)
+
+        n = K.size
+        self.spot_ref = np.full(n, np.nan)
+        self.price_ref = np.zeros(n)
+        self.delta_ref = np.zeros(n)
+        self.gamma = np.zeros(n)
+        self.price = np.zeros(n)
+        self.delta = np.zeros(n)
+        self.last_spot = None
+        self.n_updates = 0
+        self.n_full = 0
+
+    def _full_reprice(self, idx: np.ndarray | slice, spot: float) -> None:
+        """
+        Closed-form price, delta and gamma of the selected contracts, which become the new expansion points.
+        """
+        sigma_sqrt_t, w = self.sigma_sqrt_t[idx], self.w[idx]
+        d1 = (np.log(spot) - self.log_strike[idx] + self.drift[idx]) / sigma_sqrt_t
+        cdf_d1 = norm_cdf(w * d1)
+        cdf_d2 = norm_cdf(w * (d1 - sigma_sqrt_t))
+        self.price_ref[idx] = w * (spot * cdf_d1 - self.discounted_strike[idx] * cdf_d2)
+        self.delta_ref[idx] = w * cdf_d1
+        self.gamma[idx] = norm_pdf(d1) / (spot * sigma_sqrt_t)
+        self.spot_ref[idx] = spot
+
+    def reprice(self, timestamp: float, spot: float) -> dict[str, float | int | np.ndarray] | None:
+        """
+        Reprice the book on a new tick.
+        Args:
+            timestamp (float): Tick timestamp.
+            spot (float): New spot price (in $).
+        Returns:
+            dict[str, float | int | np.ndarray] | None: "timestamp", the per-contract "price_change" and
+                "delta_change" since the previous tick, and "n_full", the number of contracts fully repriced,
+                or None if the spot did not move.
+        """
+        if spot == self.last_spot:
+            return None
+        self.last_spot = spot
+
+        move = np.abs(np.log(spot / self.spot_ref)) / self.sigma_sqrt_t
+        stale = np.flatnonzero(~(move < self.threshold))
+        if stale.size:
+            self._full_reprice(stale, spot)
+
+        # delta-gamma expansion around each contract's last full pricing (exact for the ones just repriced)
+        ds = spot - self.spot_ref
+        gamma_ds = self.gamma * ds
+        price = self.price_ref + ds * (self.delta_ref + .5 * gamma_ds)
+        delta = self.delta_ref + gamma_ds
+
+        update = {
+            "timestamp": timestamp,
+            "price_change": price - self.price,
+            "delta_change": delta - self.delta,
+            "n_full": stale.size,
+        }
+        self.price, self.delta = price, delta
+        self.n_updates += price.size
+        self.n_full += stale.size
+        return update
+
+    def run(self, ticks: Iterable[tuple[float, float]]) -> Iterator[dict[str, float | int | np.ndarray]]:
+        """
+        Generator stage consuming (timestamp, spot) ticks and yielding the book updates.
+        """
+        for timestamp, spot in ticks:
+            update = self.reprice(timestamp, spot)
+            if update is not None:
+                yield update
+
+    async def arun(self, ticks: AsyncIterable[tuple[float, float]]) -> AsyncIterator[dict[str, float | int | np.ndarray]]:
+        """
+        Async iterator stage consuming (timestamp, spot) ticks and yielding the book updates.
+        """
+        async for timestamp, spot in ticks:
+            update = self.reprice(timestamp, spot)
+            if update is not None:
+                yield update
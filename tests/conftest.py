@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the modules live at the repository root, which is itself a package, so it is put on the path explicitly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from BSM import BSM
+
+
+@pytest.fixture
+def model():
+    model = BSM()
+    model.initialize_bsm(100., 105., 1., .03, .2)
+    return model
+
+
+@pytest.fixture
+def contracts():
+    rng = np.random.default_rng(0)
+    n = 1_000
+    return rng.uniform(50, 150, n), rng.uniform(50, 150, n), rng.uniform(0, .1, n), rng.uniform(.05, 3, n), \
+        rng.uniform(.1, .6, n)
+
+
+@pytest.mark.parametrize("is_call", [True, False])
+def test_single_greeks_match_the_batch_kernel(model, contracts, is_call):
+    s0, K, r, T, sigma = contracts
+    expected = BSM.compute_greeks_batch(s0, K, r, T, sigma, is_call)
+    single = {
+        "delta": model.compute_delta(s0, K, r, T, sigma, is_call),
+        "gamma": model.compute_gamma(s0, K, r, T, sigma),
+        "theta": model.compute_theta(s0, K, r, T, sigma, is_call),
+        "vega": model.compute_vega(s0, K, r, T, sigma),
+        "rho": model.compute_rho(s0, K, r, T, sigma, is_call),
+    }
+    for name, value in single.items():
+        np.testing.assert_allclose(value, expected[name], rtol=1e-12, atol=1e-12, err_msg=name)
+
+
+def test_scalar_greeks(model):
+    delta = model.compute_delta(100., 105., .03, .5, .2)
+    assert isinstance(delta, float)
+    expected = BSM.compute_greeks_batch(100., 105., .03, .5, .2, greeks=("delta", "gamma"))
+    assert delta == pytest.approx(float(expected["delta"]), abs=1e-15)
+    assert model.compute_gamma(100., 105., .03, .5, .2) == pytest.approx(float(expected["gamma"]), abs=1e-15)
+    # put-call parity of deltas
+    assert model.compute_delta(100., 105., .03, .5, .2, False) == pytest.approx(delta - 1, abs=1e-15)
+
+
+def test_greeks_by_finite_differences(model):
+    s0, K, r, T, sigma, h = 100., 105., .03, .75, .25, 1e-3
+    price = lambda **kw: float(BSM.compute_bsm_batch(**{"s0": s0, "K": K, "r": r, "T": T, "sigma": sigma, **kw}))
+    assert model.compute_delta(s0, K, r, T, sigma) == pytest.approx(
+        (price(s0=s0 + h) - price(s0=s0 - h)) / (2 * h), rel=1e-6)
+    assert model.compute_gamma(s0, K, r, T, sigma) == pytest.approx(
+        (price(s0=s0 + h) - 2 * price() + price(s0=s0 - h)) / h ** 2, rel=1e-4)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from bulk import BatchWriter, price_batch, price_file, read_batches
+
+
+@pytest.fixture
+def chain():
+    rng = np.random.default_rng(0)
+    n = 1_000
+    is_call = rng.random(n) < .5
+    columns = {"spot": rng.uniform(50, 150, n), "strike": rng.uniform(50, 150, n), "rate": np.full(n, .03),
+               "maturity": rng.uniform(.05, 2, n), "vol": rng.uniform(.1, .6, n)}
+    return columns, is_call
+
+
+@pytest.mark.parametrize("encode", [
+    lambda is_call: is_call,
+    lambda is_call: is_call.astype(np.int64),
+    lambda is_call: is_call.astype(float),
+    lambda is_call: np.where(is_call, "C", "P"),
+    lambda is_call: np.where(is_call, "call", "put").astype(object),
+], ids=["bool", "int", "float", "letter", "word"])
+def test_option_types(chain, encode):
+    columns, is_call = chain
+    expected = BSM.compute_bsm_batch(columns["spot"], columns["strike"], columns["rate"], columns["maturity"],
+                                     columns["vol"], is_call)
+    result = price_batch({**columns, "type": encode(is_call)}, greeks=("price",))
+    np.testing.assert_allclose(result["model_price"], expected, rtol=1e-12)
+
+
+def test_implied_vol(chain):
+    columns, is_call = chain
+    price = BSM.compute_bsm_batch(columns["spot"], columns["strike"], columns["rate"], columns["maturity"],
+                                  columns["vol"], is_call)
+    batch = {name: value for name, value in columns.items() if name != "vol"}
+    result = price_batch({**batch, "price": price, "is_call": is_call}, greeks=())
+    # deep out-of-the-money options carry too little vega to recover their volatility
+    vega = BSM.compute_greeks_batch(columns["spot"], columns["strike"], columns["rate"], columns["maturity"],
+                                    columns["vol"], is_call, greeks=("vega",))["vega"]
+    liquid = vega > 1e-2
+    np.testing.assert_allclose(result["implied_vol"][liquid], columns["vol"][liquid], atol=1e-6)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow", "csv"])
+def test_round_trip(tmp_path, chain, fmt):
+    if fmt != "csv":
+        pytest.importorskip("pyarrow")
+    columns, is_call = chain
+    src, dst = tmp_path / f"chain.{fmt}", tmp_path / f"priced.{fmt}"
+    with BatchWriter(str(src)) as writer:
+        for start in range(0, is_call.size, 300):
+            rows = slice(start, start + 300)
+            writer.write({**{name: value[rows] for name, value in columns.items()},
+                          "option_type": np.where(is_call[rows], "C", "P")})
+
+    stats = price_file(str(src), str(dst), batch_size=128)
+    assert stats["rows"] == is_call.size
+    assert stats["batches"] == -(-is_call.size // 128)
+
+    batches = list(read_batches(str(dst), batch_size=256))
+    # whatever the batches of the file, every batch but the last one is full
+    assert [len(batch["spot"]) for batch in batches] == [256, 256, 256, 232]
+    output = {name: np.concatenate([np.asarray(batch[name]) for batch in batches]) for name in batches[0]}
+    # CSV text may round the last bit of the inputs
+    np.testing.assert_allclose(output["spot"], columns["spot"], rtol=1e-15)
+    expected = BSM.compute_greeks_batch(columns["spot"], columns["strike"], columns["rate"], columns["maturity"],
+                                        columns["vol"], is_call)
+    np.testing.assert_allclose(output["model_price"], expected["price"], rtol=1e-10, atol=1e-12)
+    for name in BSM.GREEKS[1:]:
+        np.testing.assert_allclose(output[name], expected[name], rtol=1e-10, atol=1e-12, err_msg=name)
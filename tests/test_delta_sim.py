@@ -0,0 +1,34 @@
+import time
+from BSM import BSM
+from pages import delta_sim
+
+REQUEST = {"startRow": 0, "endRow": delta_sim.HEDGING_PAGE_SIZE}
+
+
+def run_job() -> dict:
+    model = BSM()
+    model.initialize_bsm(100., 105., 1., .03, .2)
+    job = delta_sim.submit_hedging_job(model, 1, True, 0., 52, "Weekly", seed=None)
+    while delta_sim.jobs.status(job["job_id"])["status"] == "running":
+        time.sleep(.01)
+    return job
+
+
+def test_pages_of_a_finished_job():
+    rows, layout = delta_sim.page_hedging_table(REQUEST, run_job())
+    assert rows["rowCount"] == 53
+    # 52 weekly steps and the initial date, on a single page
+    assert len(rows["rowData"]) == 53
+    assert layout is delta_sim.no_update
+
+
+def test_expired_job_asks_for_a_new_run(monkeypatch):
+    job = run_job()
+    # forgotten by the job manager, on the next submission, once its ttl has passed
+    monkeypatch.setattr(delta_sim.jobs, "ttl", 0.)
+    run_job()
+    assert delta_sim.jobs.status(job["job_id"])["status"] == "unknown"
+    rows, layout = delta_sim.page_hedging_table(REQUEST, job)
+    assert rows == {"rowData": [], "rowCount": 0}
+    assert "expired" in str(layout)
+    assert delta_sim.poll_simulation(1, job)[3] == "Expired"
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from utils.grid_cache import PriceGridCache, check_range, snap_axis
+
+RANGES = [(100, 110), (80, 120), (100., 112.5), (.2, .5), (.01, 1.), (0, 130), (99.9, 100.1)]
+
+
+@pytest.mark.parametrize("lo, hi", RANGES)
+@pytest.mark.parametrize("n", [2, 3, 10, 50, 200])
+def test_axis_spans_the_requested_range(lo, hi, n):
+    axis = check_range(snap_axis(lo, hi, n), lo, hi)
+    assert axis.size == n
+    assert axis[0] == lo and axis[-1] == hi
+    assert np.all(np.diff(axis) > 0)
+
+
+@pytest.mark.parametrize("lo, hi", RANGES)
+def test_inner_points_on_a_lattice(lo, hi):
+    inner = snap_axis(lo, hi, 20)[1:-1]
+    steps = np.diff(inner)
+    np.testing.assert_allclose(steps, steps[0], rtol=1e-9)
+    np.testing.assert_allclose(inner / steps[0], np.round(inner / steps[0]), atol=1e-6)
+
+
+def test_check_range_rejects_other_ranges():
+    with pytest.raises(ValueError):
+        check_range(np.array([99.6, 105., 110.4]), 100, 110)
+    with pytest.raises(ValueError):
+        check_range(np.array([100., 100., 110.]), 100, 110)
+
+
+def test_degenerate_range():
+    np.testing.assert_array_equal(snap_axis(100, 100, 5), np.full(5, 100.))
+    np.testing.assert_array_equal(snap_axis(100, 110, 1), [100.])
+
+
+def test_cached_grid_is_exact():
+    cache = PriceGridCache()
+    sigmas = snap_axis(.2, .5, 30)
+    cache.get(snap_axis(100, 120, 30), sigmas, 105., .03, 1.)
+    spots = snap_axis(100, 125, 30)
+    call, put = cache.get(spots, sigmas, 105., .03, 1.)
+    expected_call, expected_put = BSM.compute_call_put_batch(spots[np.newaxis, :], 105., .03, 1.,
+                                                             sigmas[:, np.newaxis])
+    np.testing.assert_array_equal(call, expected_call)
+    np.testing.assert_array_equal(put, expected_put)
+
+
+def test_slider_drag_hits_the_cache():
+    cache = PriceGridCache()
+    sigmas = snap_axis(.2, .5, 50)
+    for lo in range(80, 121):
+        cache.get(snap_axis(lo, lo + 20, 50), sigmas, 105., .03, 1.)
+    assert cache.stats()["hit_ratio"] > .8
+
+
+def test_heat_maps_with_a_surface_keep_the_at_the_money_axis():
+    from vol_surface import VolSurface
+    from pages.pricer_layout import draw_options_heat_maps
+    k = np.linspace(-.5, .5, 21)
+    surface = VolSurface.from_quotes(100., .03, 100. * np.exp(.03 + k), 1., .2 - .3 * k + .1 * k ** 2)
+    call_fig, put_fig = draw_options_heat_maps(10, [90, 110], [.2, .5], 1., 120., .03, surface)
+    sigmas = snap_axis(.2, .5, 10)
+    np.testing.assert_allclose(call_fig.data[0].y, sigmas, rtol=1e-6)
+    # each row is priced at its at-the-money level plus the smile premium of the strike
+    premium = float(surface(120., 1.) - surface(100. * np.exp(.03), 1.))
+    assert premium < 0
+    expected_call, expected_put = BSM.compute_call_put_batch(snap_axis(90, 110, 10)[np.newaxis, :], 120., .03, 1.,
+                                                             sigmas[:, np.newaxis] + premium)
+    np.testing.assert_allclose(call_fig.data[0].z, expected_call, rtol=1e-6)
+    np.testing.assert_allclose(put_fig.data[0].z, expected_put, rtol=1e-6)
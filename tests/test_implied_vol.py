@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from implied_vol import ImpliedVolSolver
+
+
+@pytest.fixture
+def quotes():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    return (rng.uniform(50, 150, n), rng.uniform(50, 150, n), rng.uniform(0, .1, n), rng.uniform(.05, 3, n),
+            rng.uniform(.05, 3, n), rng.random(n) < .5)
+
+
+def test_round_trip_in_range(quotes):
+    s0, K, r, T, sigma, is_call = quotes
+    price = BSM.compute_bsm_batch(s0, K, r, T, sigma, is_call)
+    implied_vol, n_iter, failed = ImpliedVolSolver().solve(price, s0, K, r, T, is_call)
+    # quotes with almost no time value carry too little vega to pin their volatility down
+    vega = BSM.compute_greeks_batch(s0, K, r, T, sigma, is_call, greeks=("vega",))["vega"]
+    liquid = vega > 1e-3
+    assert liquid.mean() > .9
+    assert not failed[liquid].any()
+    # a price error within price_tol moves the volatility by up to price_tol / vega
+    assert np.all(np.abs(implied_vol[liquid] - sigma[liquid]) <= 1e-9 + 2e-10 / vega[liquid])
+    assert n_iter.max() <= 100
+
+
+@pytest.mark.parametrize("sigma", [10.5, 12., 15.])
+@pytest.mark.parametrize("is_call", [True, False])
+def test_volatility_above_the_bracket_fails(sigma, is_call):
+    price = BSM.compute_bsm_batch(100., 100., .03, 1., sigma, is_call)
+    implied_vol, _, failed = ImpliedVolSolver(sigma_max=10.).solve(price, 100., 100., .03, 1., is_call)
+    assert failed
+    assert np.isnan(implied_vol)
+
+
+def test_volatility_below_the_bracket_fails():
+    price = BSM.compute_bsm_batch(100., 100., .03, .5, .05, True)
+    implied_vol, _, failed = ImpliedVolSolver(sigma_min=.1).solve(price, 100., 100., .03, .5, True)
+    assert failed and np.isnan(implied_vol)
+
+
+def test_arbitrage_violations_fail():
+    s0, K, r, T = 100., 90., .03, 1.
+    discounted_strike = K * np.exp(-r * T)
+    prices = np.array([
+        s0 - discounted_strike - .5,  # call below its lower bound
+        s0 + 1.,  # call above the spot
+        -1.,  # negative price
+        max(discounted_strike - s0, 0) - .5,  # put below its lower bound (0 here)
+        discounted_strike + 1.,  # put above the discounted strike
+    ])
+    is_call = np.array([True, True, True, False, False])
+    implied_vol, n_iter, failed = ImpliedVolSolver().solve(prices, s0, K, r, T, is_call)
+    assert failed.all()
+    assert np.isnan(implied_vol).all()
+    # rejected before any iteration
+    assert (n_iter == 0).all()
+
+
+def test_expired_quotes_fail():
+    _, _, failed = ImpliedVolSolver().solve(5., 100., 100., .03, 0., True)
+    assert failed
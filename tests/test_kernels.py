@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from monte_carlo import MonteCarlo
+from utils import kernels
+
+pytest.importorskip("numba")
+
+
+@pytest.fixture
+def backend():
+    """
+    Run a test body under each backend by calling the returned setter, restoring "auto" afterwards.
+    """
+    yield kernels.set_backend
+    kernels.set_backend("auto")
+
+
+@pytest.fixture
+def contracts():
+    rng = np.random.default_rng(0)
+    n = 10_000
+    return (rng.uniform(50, 150, n), rng.uniform(50, 150, n), rng.uniform(0, .1, n), rng.uniform(.01, 3, n),
+            rng.uniform(.05, .8, n), rng.random(n) < .5)
+
+
+def run_both(backend, fn):
+    results = {}
+    for name in ("numpy", "numba"):
+        backend(name)
+        results[name] = fn()
+    return results["numpy"], results["numba"]
+
+
+def test_greeks(backend, contracts):
+    expected, actual = run_both(backend, lambda: BSM.compute_greeks_batch(*contracts))
+    assert list(actual) == list(BSM.GREEKS)
+    for name in BSM.GREEKS:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-9, atol=1e-10, err_msg=name)
+
+
+@pytest.mark.parametrize("greeks", [("price",), ("gamma", "delta"), ("rho", "theta", "vega")])
+def test_greeks_subset(backend, contracts, greeks):
+    expected, actual = run_both(backend, lambda: BSM.compute_greeks_batch(*contracts, greeks=greeks))
+    assert list(actual) == list(greeks)
+    for name in greeks:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-9, atol=1e-10, err_msg=name)
+
+
+def test_broadcast_shape(backend):
+    s0, sigma = np.linspace(80, 120, 7)[np.newaxis, :], np.linspace(.1, .5, 5)[:, np.newaxis]
+    expected, actual = run_both(backend, lambda: BSM.compute_call_put_batch(s0, 105., .03, 1., sigma))
+    for x, y in zip(actual, expected):
+        assert x.shape == (5, 7)
+        np.testing.assert_allclose(x, y, rtol=1e-9, atol=1e-10)
+
+
+def test_simulate_spot_price(backend):
+    model = BSM()
+    model.initialize_bsm(100., 105., 1., .03, .2)
+    expected, actual = run_both(backend, lambda: model.simulate_spot_price(100, "Daily", 50, np.random.default_rng(1)))
+    np.testing.assert_allclose(actual, expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize("dtype, rtol", [(np.float64, 1e-10), (np.float32, 1e-4)])
+def test_generate_paths(backend, dtype, rtol):
+    expected, actual = run_both(backend, lambda: MonteCarlo(100., .03, .2, dtype=dtype, seed=2).generate_paths(100, 50, 1.))
+    assert actual.shape == (100, 51) and actual.dtype == dtype
+    np.testing.assert_allclose(actual[:, 0], 100.)
+    np.testing.assert_allclose(actual, expected, rtol=rtol)
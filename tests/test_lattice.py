@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from lattice import Lattice
+
+
+@pytest.fixture
+def contracts():
+    rng = np.random.default_rng(0)
+    n = 50
+    return rng.uniform(80, 120, n), rng.uniform(80, 120, n), rng.uniform(0, .08, n), rng.uniform(.1, 2, n), \
+        rng.uniform(.1, .5, n), rng.random(n) < .5
+
+
+@pytest.mark.parametrize("method", Lattice.METHODS)
+def test_european_prices_converge_to_bsm(contracts, method):
+    s0, K, r, T, sigma, is_call = contracts
+    expected = BSM.compute_bsm_batch(s0, K, r, T, sigma, is_call)
+    errors = [np.abs(Lattice(n_steps, method).compute_price(s0, K, r, T, sigma, is_call, False) - expected).max()
+              for n_steps in (50, 200, 800)]
+    assert errors[0] > errors[1] > errors[2]
+    assert errors[2] < 2e-2
+
+
+@pytest.mark.parametrize("method", Lattice.METHODS)
+def test_greeks_converge_to_bsm(contracts, method):
+    s0, K, r, T, sigma, is_call = contracts
+    expected = BSM.compute_greeks_batch(s0, K, r, T, sigma, is_call, greeks=("delta", "gamma", "theta"))
+    result = Lattice(800, method).compute_greeks(s0, K, r, T, sigma, is_call, False)
+    np.testing.assert_allclose(result["delta"], expected["delta"], atol=5e-3)
+    np.testing.assert_allclose(result["gamma"], expected["gamma"], atol=5e-3)
+    np.testing.assert_allclose(result["theta"], expected["theta"], atol=5e-2)
+
+
+@pytest.mark.parametrize("method", Lattice.METHODS)
+def test_early_exercise(contracts, method):
+    s0, K, r, T, sigma, _ = contracts
+    lattice = Lattice(400, method)
+    # without dividends an American call is never exercised early, while an American put is worth at least
+    # its European counterpart and its intrinsic value
+    np.testing.assert_allclose(lattice.compute_price(s0, K, r, T, sigma, True, True),
+                               lattice.compute_price(s0, K, r, T, sigma, True, False), rtol=1e-10)
+    american_put = lattice.compute_price(s0, K, r, T, sigma, False, True)
+    assert np.all(american_put >= lattice.compute_price(s0, K, r, T, sigma, False, False) - 1e-12)
+    assert np.all(american_put >= np.maximum(K - s0, 0) - 1e-12)
@@ -0,0 +1,35 @@
+import os
+import pstats
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = textwrap.dedent("""
+    import threading
+    from utils import metrics
+
+    def threaded_work():
+        return sum(range(100_000))
+
+    def serve():
+        with metrics.profiled():
+            threaded_work()
+
+    metrics.start_profiler()
+    threads = [threading.Thread(target=serve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+""")
+
+
+def test_profiler_sees_worker_threads(tmp_path):
+    # a fresh interpreter, the profiling session being set up at import and dumped at exit
+    path = tmp_path / "profile.pstats"
+    subprocess.run([sys.executable, "-c", SCRIPT], check=True, cwd=str(tmp_path),
+                   env={"OPTION_PRICER_PROFILE": str(path), "PYTHONPATH": ROOT})
+    stats = pstats.Stats(str(path)).stats
+    calls = [value[1] for (_, _, name), value in stats.items() if name == "threaded_work"]
+    assert calls == [4]
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from monte_carlo import MonteCarlo
+
+S0, K, R, T, SIGMA = 100., 105., .03, 1., .2
+
+
+# Sobol points keep their balance properties for a power of 2 of paths per replication
+@pytest.mark.parametrize("method", MonteCarlo.METHODS)
+@pytest.mark.parametrize("is_call", [True, False])
+def test_price_within_standard_errors_of_bsm(method, is_call):
+    price, stderr = MonteCarlo(S0, R, SIGMA, seed=1).compute_option_price(K, T, 2 ** 17, is_call, method=method)
+    expected = float(BSM.compute_bsm_batch(S0, K, R, T, SIGMA, is_call))
+    assert 0 < stderr < .05
+    assert abs(price - expected) <= 4 * stderr
+
+
+@pytest.mark.parametrize("method", ["antithetic", "control_variate", "sobol"])
+def test_variance_reduction(method):
+    engine = MonteCarlo(S0, R, SIGMA, seed=1)
+    engine.compute_option_price(K, T, 2 ** 17, method=method)
+    assert engine.variance_reduction > 1
+
+
+def test_path_dependent_payoff():
+    # arithmetic average of a single-step path is (s0 + S_T) / 2, whose discounted expectation is known
+    engine = MonteCarlo(S0, R, SIGMA, seed=2)
+    price, stderr = engine.compute_price(lambda paths: paths.mean(axis=1), T, 100_000, n_steps=1, chunk_size=10_000)
+    assert abs(price - .5 * (S0 * np.exp(-R * T) + S0)) <= 4 * stderr
+
+
+def test_float32_paths():
+    price, stderr = MonteCarlo(S0, R, SIGMA, dtype=np.float32, seed=3).compute_option_price(K, T, 100_000)
+    assert abs(price - float(BSM.compute_bsm_batch(S0, K, R, T, SIGMA))) <= 4 * stderr
+
+
+def test_seeded_runs_are_reproducible():
+    first = MonteCarlo(S0, R, SIGMA, seed=4).compute_option_price(K, T, 50_000, chunk_size=7_000)
+    second = MonteCarlo(S0, R, SIGMA, seed=4).compute_option_price(K, T, 50_000, chunk_size=7_000)
+    assert first == second
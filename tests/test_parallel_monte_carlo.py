@@ -0,0 +1,37 @@
+import pytest
+from BSM import BSM
+from delta_hedging import DeltaHedging
+from parallel_monte_carlo import ParallelMonteCarlo
+
+S0, K, R, T, SIGMA = 100., 105., .03, 1., .2
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ParallelMonteCarlo(S0, R, SIGMA, n_workers=2, seed=5) as engine:
+        yield engine
+
+
+@pytest.mark.parametrize("is_call", [True, False])
+def test_price_within_standard_errors_of_bsm(pool, is_call):
+    price, stderr = pool.compute_option_price(K, T, 100_000, is_call, n_shards=4)
+    assert abs(price - float(BSM.compute_bsm_batch(S0, K, R, T, SIGMA, is_call))) <= 4 * stderr
+
+
+def test_seeded_shards_are_reproducible(pool):
+    result = pool.compute_option_price(K, T, 50_000, chunk_size=3_000, n_shards=4)
+    # the same seed and number of shards give the same result on every call, whatever the number of workers
+    assert pool.compute_option_price(K, T, 50_000, chunk_size=3_000, n_shards=4) == result
+    with ParallelMonteCarlo(S0, R, SIGMA, n_workers=1, seed=5) as inline:
+        assert inline.compute_option_price(K, T, 50_000, chunk_size=3_000, n_shards=4) == result
+    with ParallelMonteCarlo(S0, R, SIGMA, n_workers=1, seed=6) as other:
+        assert other.compute_option_price(K, T, 50_000, chunk_size=3_000, n_shards=4) != result
+
+
+def test_seeded_hedging_shards_are_reproducible(pool):
+    hedging = DeltaHedging(S0, K, T, R, SIGMA)
+    result = pool.compute_hedging_pnl(hedging, 2_000, 12, T / 12, chunk_size=300, n_shards=3)
+    with ParallelMonteCarlo(S0, R, SIGMA, n_workers=1, seed=5) as inline:
+        assert inline.compute_hedging_pnl(hedging, 2_000, 12, T / 12, chunk_size=300, n_shards=3) == result
+    mean, std, stderr = result
+    assert stderr == pytest.approx(std / 2_000 ** .5)
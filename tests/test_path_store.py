@@ -0,0 +1,48 @@
+import os
+import time
+import numpy as np
+from delta_hedging import DeltaHedging
+from monte_carlo import MonteCarlo
+from utils.path_store import PathStore, hedge_stored_paths
+
+
+def test_write_is_reused(tmp_path):
+    store = PathStore(str(tmp_path))
+    engine = MonteCarlo(100., .03, .2)
+    dataset_id = store.simulate_paths(engine, 1_000, 16, 1., seed=3, chunk_bytes=2 ** 14)
+    assert store.simulate_paths(engine, 1_000, 16, 1., seed=3, chunk_bytes=2 ** 14) == dataset_id
+    assert os.listdir(tmp_path) == [dataset_id]
+    paths = store.open(dataset_id)["paths"]
+    assert paths.shape == (1_000, 17)
+    np.testing.assert_array_equal(paths[:, 0], 100.)
+
+
+def test_replay_does_not_depend_on_the_store(tmp_path):
+    hedging = DeltaHedging(100., 105., 1., .03, .2)
+    stored = hedge_stored_paths(hedging, str(tmp_path), 7, 500, 52, 1 / 52)
+    replayed = hedge_stored_paths(hedging, str(tmp_path), 7, 500, 52, 1 / 52)
+    in_memory = hedge_stored_paths(hedging, None, 7, 500, 52, 1 / 52)
+    np.testing.assert_array_equal(replayed["P&L"], stored["P&L"])
+    np.testing.assert_array_equal(in_memory["P&L"], stored["P&L"])
+
+
+def test_evicted_dataset_gives_the_same_paths(tmp_path, monkeypatch):
+    hedging = DeltaHedging(100., 105., 1., .03, .2)
+    stored = hedge_stored_paths(hedging, str(tmp_path), 7, 500, 52, 1 / 52)
+    # evicted by another process between the write and the read
+    monkeypatch.setattr(PathStore, "open", lambda self, dataset_id: None)
+    np.testing.assert_array_equal(hedge_stored_paths(hedging, str(tmp_path), 7, 500, 52, 1 / 52)["P&L"],
+                                  stored["P&L"])
+
+
+def test_one_off_jobs_write_nothing(tmp_path, monkeypatch):
+    from BSM import BSM
+    from pages import delta_sim
+    monkeypatch.setattr(delta_sim, "path_store", PathStore(str(tmp_path)))
+    model = BSM()
+    model.initialize_bsm(100., 105., 1., .03, .2)
+    job = delta_sim.submit_hedging_job(model, 1, True, 0., 52, "Weekly", seed=None)
+    while delta_sim.jobs.status(job["job_id"])["status"] == "running":
+        time.sleep(.01)
+    assert delta_sim.jobs.status(job["job_id"])["status"] == "done"
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from lattice import Lattice
+from pde import FiniteDifference
+
+S0, R, T, SIGMA = 100., .03, 1., .2
+STRIKES = np.linspace(80, 120, 9)
+
+
+@pytest.mark.parametrize("is_call", [True, False])
+def test_european_prices_converge_to_bsm(is_call):
+    expected = BSM.compute_bsm_batch(S0, STRIKES, R, T, SIGMA, is_call)
+    errors = [np.abs(FiniteDifference(n_space, n_time).compute_price(S0, STRIKES, R, T, SIGMA, is_call) - expected).max()
+              for n_space, n_time in ((100, 50), (200, 100), (400, 200))]
+    assert errors[0] > errors[1] > errors[2]
+    assert errors[2] < 5e-3
+
+
+def test_greeks_along_the_spot_axis():
+    spots = np.linspace(85, 115, 7)
+    result = FiniteDifference().solve(spots, STRIKES, R, T, SIGMA, True)
+    expected = BSM.compute_greeks_batch(spots[:, np.newaxis], STRIKES, R, T, SIGMA, True, greeks=("price", "delta", "gamma"))
+    for name in ("price", "delta", "gamma"):
+        assert result[name].shape == (spots.size, STRIKES.size)
+        np.testing.assert_allclose(result[name], expected[name], atol=5e-3, err_msg=name)
+
+
+def test_american_put_matches_the_lattice():
+    american = FiniteDifference().compute_price(S0, STRIKES, R, T, SIGMA, False, True)
+    np.testing.assert_allclose(american, Lattice(1_000).compute_price(S0, STRIKES, R, T, SIGMA, False, True), atol=2e-2)
+    assert np.all(american >= BSM.compute_bsm_batch(S0, STRIKES, R, T, SIGMA, False) - 1e-10)
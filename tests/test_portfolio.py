@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from portfolio import Portfolio
+
+R = .03
+
+
+@pytest.fixture
+def book():
+    rng = np.random.default_rng(0)
+    n = 500
+    return Portfolio(rng.integers(0, 4, n), rng.uniform(60, 140, n), rng.uniform(.01, 6, n),
+                     rng.integers(-10, 11, n), rng.random(n) < .5, rng.uniform(.1, .5, n))
+
+
+@pytest.fixture
+def spots():
+    return np.array([90., 100., 110., 120.])
+
+
+def naive_aggregate(book: Portfolio, spots: np.ndarray) -> dict[str, np.ndarray]:
+    grid = {name: np.zeros((spots.size, book.n_buckets)) for name in BSM.GREEKS}
+    for i in range(len(book)):
+        bucket = sum(book.T[i] > bound for bound in book.expiry_buckets)
+        greeks = BSM.compute_greeks_batch(spots[book.underlying[i]], book.K[i], R, book.T[i], book.sigma[i],
+                                          book.is_call[i])
+        for name in BSM.GREEKS:
+            grid[name][book.underlying[i], bucket] += book.quantity[i] * float(greeks[name])
+    return grid
+
+
+def test_aggregate_matches_a_loop_over_positions(book, spots):
+    result = book.aggregate(spots, R)
+    expected = naive_aggregate(book, spots)
+    for name in BSM.GREEKS:
+        np.testing.assert_allclose(result[name]["grid"], expected[name], rtol=1e-10, atol=1e-8, err_msg=name)
+        np.testing.assert_allclose(result[name]["by_underlying"], expected[name].sum(axis=1), rtol=1e-10, atol=1e-8)
+        np.testing.assert_allclose(result[name]["by_expiry"], expected[name].sum(axis=0), rtol=1e-10, atol=1e-8)
+        assert result[name]["total"] == pytest.approx(expected[name].sum(), rel=1e-10, abs=1e-8)
+
+
+def test_added_positions_are_aggregated(book, spots):
+    before = book.aggregate(spots, R, greeks=("price",))["price"]["total"]
+    book.add(3, 100., .5, [2, -1], [True, False], .25)
+    assert len(book) == 502
+    added = 2 * BSM.compute_bsm_batch(120., 100., R, .5, .25, True) - BSM.compute_bsm_batch(120., 100., R, .5, .25, False)
+    assert book.aggregate(spots, R, greeks=("price",))["price"]["total"] == pytest.approx(before + float(added))
+
+
+def test_unheld_underlyings_have_empty_rows(spots):
+    book = Portfolio([1], [100.], [1.], [1.], [True], [.2])
+    grid = book.aggregate(spots, R, greeks=("delta",))["delta"]["grid"]
+    assert grid.shape == (spots.size, book.n_buckets)
+    # bucket bounds are inclusive, a one-year option falls in the "<= 1y" bucket
+    assert book.bucket_labels()[3] == "<= 1y"
+    assert np.count_nonzero(grid) == 1 and grid[1, 3] > 0
+
+
+def test_columns_must_have_the_same_length():
+    with pytest.raises(ValueError):
+        Portfolio([0, 1], [100.], [1.], [1.], [True], [.2])
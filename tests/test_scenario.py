@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from portfolio import Portfolio
+from scenario import ScenarioEngine
+
+R = .03
+SPOT_SHOCKS, VOL_SHOCKS, TIME_SHOCKS = np.linspace(-.2, .2, 5), np.array([-.3, -.05, 0., .1]), np.array([0., .1, 2.])
+
+
+@pytest.fixture
+def contracts():
+    rng = np.random.default_rng(0)
+    n = 300
+    return rng.uniform(80, 120, n), rng.uniform(60, 140, n), rng.uniform(.05, 3, n), rng.uniform(.1, .5, n), \
+        rng.random(n) < .5, rng.integers(-10, 11, n).astype(float)
+
+
+def naive_revalue(s0, K, T, sigma, is_call, quantity) -> np.ndarray:
+    value = np.zeros((SPOT_SHOCKS.size, VOL_SHOCKS.size, TIME_SHOCKS.size))
+    for i, spot_shock in enumerate(SPOT_SHOCKS):
+        for j, vol_shock in enumerate(VOL_SHOCKS):
+            for k, time_shock in enumerate(TIME_SHOCKS):
+                price = BSM.compute_bsm_batch(s0 * (1 + spot_shock), K, R,
+                                              np.maximum(T - time_shock, ScenarioEngine.MIN_T),
+                                              np.maximum(sigma + vol_shock, ScenarioEngine.MIN_SIGMA), is_call)
+                value[i, j, k] = price @ quantity
+    return value
+
+
+@pytest.mark.parametrize("max_cells", [2 ** 22, 1_000, 1])
+def test_revalue_matches_a_loop_over_scenarios(contracts, max_cells):
+    s0, K, T, sigma, is_call, quantity = contracts
+    engine = ScenarioEngine(SPOT_SHOCKS, VOL_SHOCKS, TIME_SHOCKS, max_cells=max_cells)
+    result = engine.revalue(s0, K, R, T, sigma, is_call, quantity)
+    expected = naive_revalue(s0, K, T, sigma, is_call, quantity)
+    assert result["base"] == pytest.approx(float(BSM.compute_bsm_batch(s0, K, R, T, sigma, is_call) @ quantity))
+    np.testing.assert_allclose(result["value"], expected, rtol=1e-10, atol=1e-8)
+    np.testing.assert_allclose(result["pnl"], expected - result["base"], rtol=1e-10, atol=1e-8)
+
+
+def test_revalue_portfolio(contracts):
+    s0, K, T, sigma, is_call, quantity = contracts
+    spots = np.array([95., 105.])
+    underlying = np.arange(K.size) % 2
+    book = Portfolio(underlying, K, T, quantity, is_call, sigma)
+    engine = ScenarioEngine(SPOT_SHOCKS, VOL_SHOCKS, TIME_SHOCKS)
+    result = engine.revalue_portfolio(book, spots, R)
+    np.testing.assert_allclose(result["value"], naive_revalue(spots[underlying], K, T, sigma, is_call, quantity),
+                               rtol=1e-10, atol=1e-8)
+
+
+def test_summarize(contracts):
+    engine = ScenarioEngine(SPOT_SHOCKS, VOL_SHOCKS, TIME_SHOCKS)
+    pnl = engine.revalue(*contracts[:2], R, *contracts[2:])["pnl"]
+    summary = engine.summarize(pnl)
+    assert summary["worst"] == pnl.min() and summary["best"] == pnl.max()
+    i, j, k = (list(shocks).index(summary["worst_scenario"][name])
+               for shocks, name in ((SPOT_SHOCKS, "spot"), (VOL_SHOCKS, "vol"), (TIME_SHOCKS, "time")))
+    assert pnl[i, j, k] == summary["worst"]
+    np.testing.assert_array_equal(summary["worst_by_spot"], pnl.min(axis=(1, 2)))
@@ -0,0 +1,39 @@
+import asyncio
+import json
+import pytest
+from BSM import BSM
+from service import PricingService
+
+CONTRACT = {"s0": 100., "K": 105., "r": .03, "T": 1., "sigma": .2}
+
+
+def request(payload: dict) -> dict:
+    return asyncio.run(PricingService(window=0).handle_request(dict(payload)))
+
+
+@pytest.mark.parametrize("is_call", [True, False])
+def test_price(is_call):
+    response = request({"id": 1, **CONTRACT, "is_call": is_call})
+    assert response["id"] == 1
+    assert response["result"]["price"] == pytest.approx(float(BSM.compute_bsm_batch(*CONTRACT.values(), is_call)))
+
+
+@pytest.mark.parametrize("is_call", ["false", "0", 0, 1, None, "true"])
+def test_is_call_must_be_a_boolean(is_call):
+    response = request({"id": 1, **CONTRACT, "is_call": is_call})
+    assert "result" not in response
+    assert "is_call" in response["error"]
+
+
+@pytest.mark.parametrize("name", ["s0", "sigma"])
+def test_non_finite_parameters_fail(name):
+    response = request({**CONTRACT, name: float("nan")})
+    assert "result" not in response and name in response["error"]
+
+
+def test_undefined_greeks_are_null():
+    response = request({"type": "greeks", **CONTRACT, "T": 0.})
+    result = response["result"]
+    assert result["gamma"] is None and "gamma" in result["error"]
+    # the response is valid JSON
+    json.dumps(response, allow_nan=False)
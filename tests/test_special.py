@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from scipy.stats import norm
+from BSM import BSM
+from utils.special import norm_cdf, norm_pdf
+
+TOL = 1e-14
+
+
+@pytest.mark.parametrize("x", [0., 1.3, -2.7, 5, -8.25, 37.5])
+def test_scalars(x):
+    assert isinstance(norm_cdf(x), float)
+    assert norm_cdf(x) == pytest.approx(norm.cdf(x), abs=TOL)
+    assert norm_pdf(x) == pytest.approx(norm.pdf(x), abs=TOL)
+
+
+def test_arrays():
+    x = np.linspace(-10, 10, 100_001)
+    np.testing.assert_allclose(norm_cdf(x), norm.cdf(x), rtol=0, atol=TOL)
+    np.testing.assert_allclose(norm_pdf(x), norm.pdf(x), rtol=0, atol=TOL)
+    x = x.reshape(-1, 1)[::1000] + np.zeros(3)
+    assert norm_cdf(x).shape == x.shape
+    assert norm_pdf(x).shape == x.shape
+
+
+def test_tails():
+    x = np.concatenate((np.linspace(-38, -10, 1_001), np.linspace(10, 38, 1_001)))
+    # in the far tails absolute errors vanish, so the left tail and the density are also checked in relative terms
+    np.testing.assert_allclose(norm_cdf(x), norm.cdf(x), rtol=1e-13, atol=TOL)
+    np.testing.assert_allclose(norm_pdf(x), norm.pdf(x), rtol=1e-13, atol=TOL)
+    for v in (-38., -20., 20., 38.):
+        assert norm_cdf(v) == pytest.approx(norm.cdf(v), rel=1e-13, abs=TOL)
+        assert norm_pdf(v) == pytest.approx(norm.pdf(v), rel=1e-13, abs=TOL)
+
+
+def test_out_buffer():
+    x = np.linspace(-6, 6, 1_001)
+    out = np.empty_like(x)
+    assert norm_cdf(x, out=out) is out
+    np.testing.assert_allclose(out, norm.cdf(x), rtol=0, atol=TOL)
+    assert norm_pdf(x, out=out) is out
+    np.testing.assert_allclose(out, norm.pdf(x), rtol=0, atol=TOL)
+    # in place, as in the BSM batch kernels
+    y = x.copy()
+    norm_cdf(y, out=y)
+    np.testing.assert_allclose(y, norm.cdf(x), rtol=0, atol=TOL)
+
+
+def test_bsm_batch_scalar_inputs():
+    price = BSM.compute_bsm_batch(100., 100., .05, 1., .2)
+    greeks = BSM.compute_greeks_batch(100., 100., .05, 1., .2)
+    assert price == pytest.approx(BSM().compute_bsm(100., 100., .05, 1., .2), abs=1e-12)
+    assert greeks["price"] == pytest.approx(price, abs=1e-12)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from streaming import StreamingPricer
+
+
+@pytest.fixture
+def book():
+    rng = np.random.default_rng(0)
+    n = 200
+    return rng.uniform(80, 120, n), rng.uniform(.1, 2, n), .03, rng.uniform(.1, .5, n), rng.random(n) < .5
+
+
+@pytest.fixture
+def ticks():
+    rng = np.random.default_rng(1)
+    return list(enumerate(100 * np.exp(np.cumsum(rng.normal(0, 2e-4, 500)))))
+
+
+def test_full_repricing_matches_bsm(book, ticks):
+    K, T, r, sigma, is_call = book
+    pricer = StreamingPricer(K, T, r, sigma, is_call, threshold=0.)
+    price = np.zeros(K.size)
+    for update in pricer.run(ticks):
+        price += update["price_change"]
+    expected = BSM.compute_greeks_batch(ticks[-1][1], K, r, T, sigma, is_call, greeks=("price", "delta"))
+    np.testing.assert_allclose(price, expected["price"], atol=1e-9)
+    np.testing.assert_allclose(pricer.delta, expected["delta"], atol=1e-12)
+    assert pricer.n_full == pricer.n_updates
+
+
+def test_delta_gamma_updates_stay_close_to_bsm(book, ticks):
+    K, T, r, sigma, is_call = book
+    pricer = StreamingPricer(K, T, r, sigma, is_call)
+    updates = list(pricer.run(ticks))
+    expected = BSM.compute_bsm_batch(ticks[-1][1], K, r, T, sigma, is_call)
+    np.testing.assert_allclose(sum(update["price_change"] for update in updates), expected, atol=1e-3)
+    # most ticks only update the expansion
+    assert pricer.n_full < .2 * pricer.n_updates
+
+
+def test_unchanged_spot_is_skipped(book):
+    pricer = StreamingPricer(*book)
+    assert pricer.reprice(0., 100.) is not None
+    assert pricer.reprice(1., 100.) is None
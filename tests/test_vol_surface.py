@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from BSM import BSM
+from vol_surface import VolSurface
+
+S0, R = 100., .03
+EXPIRIES = np.array([.25, .5, 1., 2.])
+
+
+def smile(K: np.ndarray, T: np.ndarray) -> np.ndarray:
+    k = np.log(K / S0) - R * T
+    return .2 + .05 / np.sqrt(T) * (-.5 * k + k ** 2)
+
+
+@pytest.fixture
+def quotes():
+    K, T = np.meshgrid(np.linspace(70, 140, 15), EXPIRIES)
+    return K.ravel(), T.ravel(), smile(K, T).ravel()
+
+
+@pytest.mark.parametrize("method", VolSurface.METHODS)
+def test_fit_recovers_the_quotes(quotes, method):
+    K, T, sigma = quotes
+    surface = VolSurface.from_quotes(S0, R, K, T, sigma, method)
+    np.testing.assert_array_equal(surface.expiries, EXPIRIES)
+    np.testing.assert_allclose(surface(K, T), sigma, atol=1e-10 if method == "spline" else 2e-3)
+
+
+def test_lookup_between_and_beyond_expiries(quotes):
+    surface = VolSurface.from_quotes(S0, R, *quotes, "spline")
+    # total variance is linear in T between two expiries, at a fixed forward moneyness
+    w = lambda T: surface(S0 * np.exp(R * T), T) ** 2 * T
+    assert w(.75) == pytest.approx(.5 * (w(.5) + w(1.)))
+    # and the volatility is flat beyond the first and last ones
+    forward = lambda T: surface(S0 * np.exp(R * T), T)
+    assert forward(.1) == pytest.approx(forward(.25))
+    assert forward(5.) == pytest.approx(forward(2.))
+    assert surface(np.full((3, 4), S0), .5).shape == (3, 4)
+
+
+def test_set_slice_refits_that_slice_only(quotes):
+    K, T, sigma = quotes
+    surface = VolSurface.from_quotes(S0, R, K, T, sigma, "spline")
+    before = surface(K, T)
+    bumped = T == 1.
+    surface.set_slice(1., K[bumped], sigma[bumped] + .01)
+    after = surface(K, T)
+    np.testing.assert_allclose(after[bumped], sigma[bumped] + .01, atol=1e-10)
+    np.testing.assert_array_equal(after[~bumped], before[~bumped])
+    surface.remove_slice(1.)
+    np.testing.assert_array_equal(surface.expiries, [.25, .5, 2.])
+
+
+def test_from_prices(quotes):
+    K, T, sigma = quotes
+    price = BSM.compute_bsm_batch(S0, K, R, T, sigma, K >= S0)
+    surface = VolSurface.from_prices(S0, R, K, T, price, K >= S0, "spline")
+    np.testing.assert_allclose(surface(K, T), sigma, atol=1e-6)
+
+
+def test_empty_surface():
+    with pytest.raises(ValueError):
+        VolSurface(S0, R)(S0, 1.)
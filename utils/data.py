@@ -1,15 +1,128 @@
-import pickle
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from BSM import BSM
+from utils.metrics import instrument
 
 
 class DataManager:
 
-    @staticmethod
-    def dump_data(obj):
-        with open("data.pickle", "wb") as f:
-            pickle.dump(obj, f)
+    def __init__(self, namespace: str, max_size: int = 1024, ttl: float = 3600.,
+                 backend_path: str | None = os.environ.get("OPTION_PRICER_STORE")):
+        """
+        Session-keyed store of BSM model parameters, held in a bounded in-memory LRU with TTL eviction.
+        Only the compact parameter tuple (spot, strike, maturity, risk-free rate, volatility) is stored, the model is
+        rebuilt on load. An optional SQLite file backend replaces the in-memory store to share models between the
+        workers of a deployment.
+        Args:
+            namespace (str): Name of the page owning the models, so that pages do not overwrite each other.
+            max_size (int): Maximum number of sessions kept in memory.
+            ttl (float): Time (in seconds) after which an unused session expires.
+            backend_path (str | None): Path of the SQLite backend file, in-memory only if None
+                (defaults to the OPTION_PRICER_STORE environment variable).
+        """
+        self.namespace = namespace
+        self.max_size = max_size
+        self.ttl = ttl
+        self.backend_path = backend_path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cache: OrderedDict[str, tuple[float, tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+        if backend_path is not None:
+            with self._connect() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS models "
+                             "(namespace TEXT, session_id TEXT, params TEXT, updated REAL, "
+                             "PRIMARY KEY (namespace, session_id))")
 
-    @staticmethod
-    def load_data():
-        with open("data.pickle", 'rb') as f:
-            data = pickle.load(f)
-        return data
+    @instrument("data.dump_data")
+    def dump_data(self, session_id: str, model: BSM) -> None:
+        """
+        Store the parameters of a model for a session.
+        """
+        params = (model.spot, model.strike, model.maturity, model.risk_free, model.volatility)
+        if self.backend_path is not None:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?)",
+                             (self.namespace, session_id, json.dumps(params), time.time()))
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._cache[session_id] = (now, params)
+            self._cache.move_to_end(session_id)
+            self._evict(now)
+
+    @instrument("data.load_data")
+    def load_data(self, session_id: str) -> BSM | None:
+        """
+        Rebuild the model stored for a session, or return None if the session is unknown or expired.
+        """
+        if self.backend_path is not None:
+            # the backend is the source of truth, since other workers may have updated the session
+            params = self._load_backend(session_id)
+        else:
+            now = time.monotonic()
+            with self._lock:
+                self._evict(now)
+                entry = self._cache.get(session_id)
+                params = None if entry is None else entry[1]
+                if params is not None:
+                    self._cache[session_id] = (now, params)
+                    self._cache.move_to_end(session_id)
+        with self._lock:
+            if params is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        bsm = BSM()
+        bsm.initialize_bsm(*params)
+        return bsm
+
+    def stats(self) -> dict[str, int]:
+        """
+        Hit/miss counters and current size of the in-memory store (always empty with a backend).
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._cache)}
+
+    @contextmanager
+    def _connect(self):
+        """
+        Transaction on the SQLite backend. The connection is closed on exit, since using it as a context manager
+        only commits or rolls back.
+        """
+        conn = sqlite3.connect(self.backend_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load_backend(self, session_id: str) -> tuple | None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM models WHERE updated < ?", (now - self.ttl,))
+            row = conn.execute("SELECT params FROM models WHERE namespace = ? AND session_id = ?",
+                               (self.namespace, session_id)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE models SET updated = ? WHERE namespace = ? AND session_id = ?",
+                             (now, self.namespace, session_id))
+        return None if row is None else tuple(json.loads(row[0]))
+
+    def _evict(self, now: float) -> None:
+        """
+        Drop expired sessions from the least recently used end, then trim the store to its maximum size.
+        Must be called with the lock held.
+        """
+        while self._cache:
+            session_id, (last_used, _) = next(iter(self._cache.items()))
+            if now - last_used <= self.ttl and len(self._cache) <= self.max_size:
+                break
+            del self._cache[session_id]
+            self.evictions += 1
@@ -0,0 +1,174 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from BSM import BSM
+
+# mantissas of the lattice steps heat map axes are snapped to, at every power of ten
+NICE_STEPS = (1., 1.2, 1.5, 2., 2.5, 3., 4., 5., 6., 8., 10.)
+
+
+def snap_axis(lo: float, hi: float, n: int) -> np.ndarray:
+    """
+    Axis of n increasing points running exactly from lo to hi, whose n - 2 inner points are snapped to a lattice:
+    they are consecutive multiples of the largest nice step (see NICE_STEPS) not above the smallest one covering
+    (hi - lo) / (n - 1) that fits n - 2 multiples strictly inside (lo, hi), centred in the range. Only the two end
+    points follow the sliders exactly: dragging one end keeps the step, and therefore the inner points, unchanged
+    until the width crosses the next nice step, and shifting the range reuses the inner points of the overlap,
+    which is what lets PriceGridCache hit while sliders move.
+    Args:
+        lo (float): Lower end of the range.
+        hi (float): Upper end of the range.
+        n (int): Number of points.
+    Returns:
+        np.ndarray: The n axis values, from lo to hi.
+    """
+    if n < 2 or not hi > lo:
+        return np.full(max(n, 1), float(lo))
+    spacing = (hi - lo) / (n - 1)
+    scale = 10. ** np.floor(np.log10(spacing))
+    # the tolerance keeps exact nice spacings (e.g. 1.0) from being bumped to the next step by rounding
+    steps = sorted({m * s for m in NICE_STEPS for s in (scale / 10, scale)
+                    if m * s <= scale * next(m for m in NICE_STEPS if m * scale >= spacing * (1 - 1e-9))}, reverse=True)
+    for step in steps:
+        # lattice indices strictly inside (lo, hi), the end points being added as they are
+        first = np.floor(lo / step + 1e-9) + 1
+        last = np.ceil(hi / step - 1e-9) - 1
+        if last - first + 1 >= n - 2:
+            break
+    first += (last - first + 1 - (n - 2)) // 2
+    # rounded well below the step, so that lattice points print as such (e.g. 100.8, not 100.80000000000001)
+    inner = np.round((first + np.arange(n - 2)) * step, 6 - int(np.floor(np.log10(step))))
+    return np.concatenate(([lo], inner, [hi])).astype(float)
+
+
+def check_range(axis: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    """
+    Check that an axis spans exactly the requested range, so that a heat map never shows more or less than the
+    sliders ask for.
+    Raises:
+        ValueError: If the first or last value of the axis is not lo or hi, or the axis is not increasing.
+    """
+    if axis.size > 1 and (axis[0] != lo or axis[-1] != hi or np.any(np.diff(axis) <= 0)):
+        raise ValueError(f"Axis [{axis[0]}, {axis[-1]}] of {axis.size} points does not span [{lo}, {hi}]")
+    return axis
+
+
+class _Surface:
+    """
+    Call/put prices computed so far for one (K, r, T) and pair of axis steps, over the union of every spot and
+    volatility axis requested.
+    """
+
+    def __init__(self):
+        self.spots: dict[float, int] = {}
+        self.sigmas: dict[float, int] = {}
+        self.call = np.empty((0, 0))
+        self.put = np.empty((0, 0))
+        self.known = np.empty((0, 0), dtype=bool)
+
+    @property
+    def nbytes(self) -> int:
+        return self.call.nbytes + self.put.nbytes + self.known.nbytes
+
+    @staticmethod
+    def _index(axis: dict[float, int], values: np.ndarray) -> np.ndarray:
+        """
+        Positions of the values on an axis, appending the ones not seen yet.
+        """
+        return np.array([axis.setdefault(v, len(axis)) for v in values.tolist()], dtype=int)
+
+    def lookup(self, spots: np.ndarray, sigmas: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        cols = self._index(self.spots, spots)
+        rows = self._index(self.sigmas, sigmas)
+        shape = (len(self.sigmas), len(self.spots))
+        if shape != self.known.shape:
+            # grow the surface, keeping the cells computed so far in place
+            call, put = np.full(shape, np.nan), np.full(shape, np.nan)
+            known = np.zeros(shape, dtype=bool)
+            n_rows, n_cols = self.known.shape
+            call[:n_rows, :n_cols], put[:n_rows, :n_cols], known[:n_rows, :n_cols] = self.call, self.put, self.known
+            self.call, self.put, self.known = call, put, known
+        return rows, cols
+
+
+class PriceGridCache:
+
+    def __init__(self, max_bytes: int = 64 * 2 ** 20, decimals: int = 10):
+        """
+        Memoized spot-volatility price grids, keyed on (K, r, T) and the steps of both axes. Cells already computed
+        for an overlapping grid are reused, so shifting a range only prices the new rows and columns. Axes built with
+        snap_axis share their points across nearby ranges; each step gets its own surface, which therefore stays a
+        dense block instead of a sparse union of unrelated axes.
+        Args:
+            max_bytes (int): Memory budget of the cached surfaces, the least recently used ones are evicted first.
+            decimals (int): Number of decimals axis values are rounded to before matching cached cells.
+        """
+        self.max_bytes = max_bytes
+        self.decimals = decimals
+        self.computed_cells = 0
+        self.reused_cells = 0
+        self._surfaces: OrderedDict[tuple[float, ...], _Surface] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, spots: np.ndarray, sigmas: np.ndarray, K: float, r: float, T: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the call and put price grids, rows following the volatility axis and columns the spot axis.
+        Args:
+            spots (np.ndarray): Spot axis of the grid (in $).
+            sigmas (np.ndarray): Volatility axis of the grid.
+            K (float): Strike price (in $).
+            r (float): Annualized risk-free interest rate.
+            T (float): Time to option expiration (in years).
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Tuple containing:
+                - Call option price grid (np.ndarray)
+                - Put option price grid (np.ndarray)
+        """
+        spots = np.round(np.asarray(spots, dtype=float), self.decimals)
+        sigmas = np.round(np.asarray(sigmas, dtype=float), self.decimals)
+        # the inner spacing of snap_axis axes, whose end points follow the requested range
+        spot_step = float(np.median(np.diff(spots))) if spots.size > 1 else 0.
+        sigma_step = float(np.median(np.diff(sigmas))) if sigmas.size > 1 else 0.
+        key = (float(K), float(r), float(T), round(spot_step, self.decimals), round(sigma_step, self.decimals))
+        with self._lock:
+            surface = self._surfaces.pop(key, None) or _Surface()
+            rows, cols = surface.lookup(spots, sigmas)
+            grid = np.ix_(rows, cols)
+            missing_rows, missing_cols = np.nonzero(~surface.known[grid])
+            if missing_rows.size:
+                call, put = BSM.compute_call_put_batch(spots[missing_cols], K, r, T, sigmas[missing_rows])
+                cells = rows[missing_rows], cols[missing_cols]
+                surface.call[cells], surface.put[cells] = call, put
+                surface.known[cells] = True
+            self.computed_cells += missing_rows.size
+            self.reused_cells += rows.size * cols.size - missing_rows.size
+            call_map, put_map = surface.call[grid], surface.put[grid]
+
+            if surface.nbytes > self.max_bytes:
+                # the union of axes outgrew the budget, restart the surface from the current grid only
+                surface = _Surface()
+                surface.lookup(spots, sigmas)
+                surface.call[...], surface.put[...], surface.known[...] = call_map, put_map, True
+            self._surfaces[key] = surface
+            self._evict()
+        return call_map, put_map
+
+    def stats(self) -> dict[str, int]:
+        """
+        Computed/reused cell counters, hit ratio (share of reused cells) and current size of the cache.
+        """
+        with self._lock:
+            total = self.computed_cells + self.reused_cells
+            return {"computed_cells": self.computed_cells, "reused_cells": self.reused_cells,
+                    "hit_ratio": self.reused_cells / total if total else 0.,
+                    "surfaces": len(self._surfaces), "bytes": sum(s.nbytes for s in self._surfaces.values())}
+
+    def _evict(self) -> None:
+        """
+        Drop the least recently used surfaces until the cache fits its memory budget, keeping the most recent one.
+        Must be called with the lock held.
+        """
+        total = sum(s.nbytes for s in self._surfaces.values())
+        while total > self.max_bytes and len(self._surfaces) > 1:
+            _, surface = self._surfaces.popitem(last=False)
+            total -= surface.nbytes
@@ -0,0 +1,150 @@
+import json
+import time
+import uuid
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable
+
+
+class _Job:
+
+    def __init__(self, key: str, futures: list[Future], combine: Callable[[list], Any], cancel_event: Any = None):
+        self.key = key
+        self.futures = futures
+        self.combine = combine
+        self.cancel_event = cancel_event
+        self.created = time.monotonic()
+        self.cancelled = False
+
+    @property
+    def finished(self) -> bool:
+        return self.cancelled or all(f.done() for f in self.futures)
+
+
+class JobManager:
+
+    def __init__(self, max_workers: int | None = None, ttl: float = 600.):
+        """
+        Background job manager running chunked jobs on a local process pool, so that long computations never block
+        the web workers. A job is a list of independent chunk tasks whose results are combined in the parent
+        process, which gives progress (finished chunks) and partial results (combination of the finished chunks)
+        while the job runs. Cancelling drops the chunks not started yet, and signals the running chunks of
+        cancellable jobs to stop early. Submitting a job identical to one still in flight returns the existing job
+        instead of starting a new one.
+
+        Jobs, their results and the process pool live in the memory of the web process that submitted them, so the
+        app must be served by a single web worker process (threads are fine): behind several worker processes, a
+        status request routed to another worker than the submitting one reports the job as "unknown".
+        Args:
+            max_workers (int | None): Number of worker processes, os.process_cpu_count() if None.
+            ttl (float): Time (in seconds) after which a finished job is forgotten.
+        """
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self._executor: ProcessPoolExecutor | None = None
+        # server process of the cancellation events shared with the workers, started by the first cancellable job
+        self._manager: multiprocessing.managers.SyncManager | None = None
+        self._jobs: dict[str, _Job] = {}
+        self._in_flight: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def job_key(name: str, params: dict) -> str:
+        """
+        Hash of a job name and its parameters, identical requests getting the same key.
+        """
+        payload = json.dumps([name, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def submit(self, name: str, params: dict, tasks: list[tuple[Callable, tuple]],
+               combine: Callable[[list], Any], cancellable: bool = False) -> str:
+        """
+        Submit a chunked job, or join the identical job already in flight.
+        Args:
+            name (str): Job type, part of the deduplication key.
+            params (dict): Parameters identifying the job, part of the deduplication key.
+            tasks (list[tuple[Callable, tuple]]): Picklable (function, args) chunk tasks run in the worker processes.
+            combine (Callable[[list], Any]): Function combining the results of the finished chunks, in chunk order.
+            cancellable (bool): Whether the chunk functions take a cancel_event keyword argument, an event shared
+                with the workers that is set when the job is cancelled and that they should poll as they run.
+        Returns:
+            str: Id of the job.
+        """
+        key = self.job_key(name, params)
+        with self._lock:
+            self._evict()
+            job_id = self._in_flight.get(key)
+            if job_id is not None and not self._jobs[job_id].finished:
+                return job_id
+            if self._executor is None:
+                # created on first use, so that importing the pages does not start worker processes
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            cancel_event = None
+            kwargs = {}
+            if cancellable:
+                if self._manager is None:
+                    self._manager = multiprocessing.Manager()
+                cancel_event = kwargs["cancel_event"] = self._manager.Event()
+            futures = [self._executor.submit(fn, *args, **kwargs) for fn, args in tasks]
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = _Job(key, futures, combine, cancel_event)
+            self._in_flight[key] = job_id
+        return job_id
+
+    def status(self, job_id: str) -> dict[str, Any]:
+        """
+        Progress and current result of a job.
+        Returns:
+            dict[str, Any]: "status" ("running", "done", "cancelled", "failed" or "unknown"), "progress" in [0, 1],
+                "result" combining the chunks finished so far (None before the first one), and "error" if failed.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return {"status": "unknown", "progress": 0., "result": None}
+
+        done = [f for f in job.futures if f.done() and not f.cancelled()]
+        errors = [f.exception() for f in done if f.exception() is not None]
+        if errors:
+            return {"status": "failed", "progress": len(done) / len(job.futures), "result": None,
+                    "error": f"{type(errors[0]).__name__}: {errors[0]}"}
+        results = [f.result() for f in done]
+        if job.cancelled:
+            status = "cancelled"
+        elif len(done) == len(job.futures):
+            status = "done"
+        else:
+            status = "running"
+        return {"status": status, "progress": len(done) / len(job.futures),
+                "result": job.combine(results) if results else None}
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel the chunks of a job that have not started yet, and signal the running chunks of a cancellable job to
+        stop, their partial results being kept. Running chunks of other jobs are left to finish.
+        Returns:
+            bool: True if the job was still running.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            for future in job.futures:
+                future.cancel()
+            if job.cancel_event is not None:
+                job.cancel_event.set()
+            job.cancelled = True
+            return True
+
+    def _evict(self) -> None:
+        """
+        Forget the finished jobs older than the time to live. Must be called with the lock held.
+        """
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.created > self.ttl:
+                del self._jobs[job_id]
+                if self._in_flight.get(job.key) == job_id:
+                    del self._in_flight[job.key]
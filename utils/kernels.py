@@ -0,0 +1,122 @@
+import os
+import math
+import logging
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+logger = logging.getLogger("Kernels")
+
+BACKENDS = ("auto", "numba", "numpy")
+# same order as BSM.GREEKS, which is the row order of the kernel output
+OUTPUTS = ("price", "delta", "gamma", "theta", "vega", "rho")
+
+
+def set_backend(name: str) -> None:
+    """
+    Select the backend of the BSM kernels, "numba" and "numpy" forcing one of them for benchmarking, and "auto"
+    using Numba whenever it is installed.
+    Args:
+        name (str): Backend name, one of "auto", "numba" or "numpy".
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name}, expected one of {BACKENDS}")
+    if name == "numba" and not HAS_NUMBA:
+        raise ImportError("The numba backend requires numba to be installed")
+    _backend = name
+
+
+def active_backend() -> str:
+    return "numba" if HAS_NUMBA and _backend != "numpy" else "numpy"
+
+
+_backend = os.environ.get("OPTION_PRICER_BACKEND", "auto")
+if _backend not in BACKENDS or (_backend == "numba" and not HAS_NUMBA):
+    logger.warning(f"Backend {_backend} unavailable, falling back to auto")
+    _backend = "auto"
+
+
+if HAS_NUMBA:
+    SQRT_2 = math.sqrt(2.)
+    SQRT_2PI = math.sqrt(2. * math.pi)
+
+    # cache=True stores the compiled machine code next to this module (or under NUMBA_CACHE_DIR), so only the
+    # first run after an install or an edit pays the compilation
+    @njit(parallel=True, cache=True)
+    def _greeks_kernel(s0, K, r, T, sigma, w, rows, out):
+        # rows[k] is the output row of OUTPUTS[k], or -1 when it is not requested
+        need_pdf = rows[2] >= 0 or rows[3] >= 0 or rows[4] >= 0
+        for i in prange(s0.size):
+            sqrt_t = math.sqrt(T[i])
+            sigma_sqrt_t = sigma[i] * sqrt_t
+            d1 = (math.log(s0[i] / K[i]) + (r[i] + .5 * sigma[i] ** 2) * T[i]) / sigma_sqrt_t
+            d2 = d1 - sigma_sqrt_t
+            pdf_d1 = math.exp(-.5 * d1 * d1) / SQRT_2PI if need_pdf else 0.
+            cdf_d1 = .5 * math.erfc(-w[i] * d1 / SQRT_2)
+            discounted_cdf_d2 = K[i] * math.exp(-r[i] * T[i]) * .5 * math.erfc(-w[i] * d2 / SQRT_2)
+            if rows[0] >= 0:
+                out[rows[0], i] = w[i] * (s0[i] * cdf_d1 - discounted_cdf_d2)
+            if rows[1] >= 0:
+                out[rows[1], i] = w[i] * cdf_d1
+            if rows[2] >= 0:
+                out[rows[2], i] = pdf_d1 / (s0[i] * sigma_sqrt_t)
+            if rows[3] >= 0:
+                out[rows[3], i] = -(s0[i] * pdf_d1 * sigma[i]) / (2 * sqrt_t) - w[i] * r[i] * discounted_cdf_d2
+            if rows[4] >= 0:
+                out[rows[4], i] = s0[i] * sqrt_t * pdf_d1
+            if rows[5] >= 0:
+                out[rows[5], i] = w[i] * T[i] * discounted_cdf_d2
+
+    @njit(parallel=True, cache=True)
+    def _gbm_kernel(s0, drift, sigma, sqrt_dt, normals, out):
+        n_paths, n_points = normals.shape
+        for p in prange(n_paths):
+            brownian = 0.
+            for j in range(n_points):
+                brownian += normals[p, j] * sqrt_dt[j]
+                out[p, j] = s0 * math.exp(drift[j] + sigma * brownian)
+
+
+def greeks_batch(s0: np.ndarray, K: np.ndarray, r: np.ndarray, T: np.ndarray, sigma: np.ndarray,
+                 is_call: np.ndarray, greeks: tuple[str, ...] = OUTPUTS) -> dict[str, np.ndarray]:
+    """
+    Compiled counterpart of BSM.compute_greeks_batch, one fused loop over already broadcast contracts computing
+    the requested outputs only, without temporaries.
+    """
+    greeks = tuple(dict.fromkeys(greeks))
+    shape = s0.shape
+    args = [np.ascontiguousarray(x, dtype=float).ravel() for x in (s0, K, r, T, sigma)]
+    w = np.where(np.ravel(is_call), 1., -1.)
+    rows = np.array([greeks.index(name) if name in greeks else -1 for name in OUTPUTS], dtype=np.int64)
+    out = np.empty((len(greeks), w.size))
+    _greeks_kernel(*args, w, rows, out)
+    return {name: out[row].reshape(shape) for row, name in enumerate(greeks)}
+
+
+def gbm_paths(s0: float, r: float, sigma: float, period: np.ndarray, normals: np.ndarray,
+              out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Compiled counterpart of the GBM path construction of BSM.simulate_spot_price and MonteCarlo.generate_paths,
+    accumulating the Brownian motion and exponentiating in a single pass over each path. Any memory layout is
+    accepted, e.g. the transposed view of time-major draws.
+    Args:
+        s0 (float): Initial spot price (in $).
+        r (float): Annualized risk-free interest rate.
+        sigma (float): Volatility of the underlying asset.
+        period (np.ndarray): Times of the n + 1 path points (in years).
+        normals (np.ndarray): (n_paths, n + 1) standard normal draws, the first column being ignored.
+        out (np.ndarray | None): Output buffer of the shape of normals, which may be normals itself.
+    Returns:
+        np.ndarray: An (n_paths, n + 1) matrix of simulated spot prices.
+    """
+    sqrt_dt = np.sqrt(np.concatenate(([0.], np.diff(period))))
+    drift = (r - .5 * sigma ** 2) * period
+    if out is None:
+        out = np.empty_like(normals)
+    _gbm_kernel(float(s0), drift, float(sigma), sqrt_dt, normals, out)
+    return out
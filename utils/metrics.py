@@ -0,0 +1,267 @@
+import os
+import sys
+import time
+import atexit
+import pstats
+import weakref
+import cProfile
+import functools
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable
+
+# instrumentation is decided once, at import: when disabled, decorated functions are returned untouched
+ENABLED = os.environ.get("OPTION_PRICER_METRICS", "0").lower() in ("1", "true", "yes")
+PROFILE_PATH = os.environ.get("OPTION_PRICER_PROFILE")
+
+N_BUCKETS = 64
+
+
+class _Shard:
+    """
+    Metrics recorded by one thread. Each thread only ever writes to its own shard, so recording takes no lock;
+    readers merge the shards of every thread.
+    """
+
+    def __init__(self):
+        # name -> [count, total latency (ns), max latency (ns), total size, latency buckets, size buckets]
+        self.metrics: dict[str, list] = {}
+
+
+class _Owner:
+    """
+    Marker held in the thread-local storage of the thread owning a shard, released when that thread finishes.
+    """
+
+
+_local = threading.local()
+_shards: list[_Shard] = []
+# metrics of the threads that have finished, so that _shards only holds the shards of live threads
+_retired = _Shard()
+_retire_lock = threading.Lock()
+
+
+def _merge(total: list | None, entry: list) -> list:
+    if total is None:
+        return [entry[0], entry[1], entry[2], entry[3], list(entry[4]), list(entry[5])]
+    total[0] += entry[0]
+    total[1] += entry[1]
+    total[2] = max(total[2], entry[2])
+    total[3] += entry[3]
+    total[4] = [a + b for a, b in zip(total[4], entry[4])]
+    total[5] = [a + b for a, b in zip(total[5], entry[5])]
+    return total
+
+
+def _retire(shard: _Shard) -> None:
+    """
+    Fold the shard of a finished thread into the retired metrics. Runs while the thread is torn down, so it must
+    not touch the threading module state of that thread.
+    """
+    with _retire_lock:
+        for name, entry in list(shard.metrics.items()):
+            _retired.metrics[name] = _merge(_retired.metrics.get(name), entry)
+        _shards.remove(shard)
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        # list.append is atomic, so registering a new thread's shard needs no lock either
+        _shards.append(shard)
+        # the owner marker dies with the thread-local storage of this thread, retiring its shard
+        owner = _local.owner = _Owner()
+        weakref.finalize(owner, _retire, shard)
+    return shard
+
+
+def record(name: str, latency_ns: int, size: int = 0) -> None:
+    """
+    Record one call of an instrumented path. Histograms use power-of-two buckets, indexed by the bit length of the
+    latency in nanoseconds and of the batch size.
+    Args:
+        name (str): Metric name.
+        latency_ns (int): Latency of the call (in nanoseconds).
+        size (int): Batch size of the call, e.g. the number of contracts priced, 0 if not applicable.
+    """
+    metrics = _shard().metrics
+    entry = metrics.get(name)
+    if entry is None:
+        entry = metrics[name] = [0, 0, 0, 0, [0] * N_BUCKETS, [0] * N_BUCKETS]
+    entry[0] += 1
+    entry[1] += latency_ns
+    if latency_ns > entry[2]:
+        entry[2] = latency_ns
+    entry[3] += size
+    entry[4][min(latency_ns.bit_length(), N_BUCKETS - 1)] += 1
+    entry[5][min(size.bit_length(), N_BUCKETS - 1)] += 1
+
+
+def instrument(name: str, size: Callable[[Any], int] | None = None) -> Callable:
+    """
+    Decorator recording call count, latency and batch size of a function under a metric name. A no-op returning the
+    function itself when metrics are disabled.
+    Args:
+        name (str): Metric name.
+        size (Callable[[Any], int] | None): Function of the result giving the batch size of the call.
+    """
+    def decorator(func: Callable) -> Callable:
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            result = func(*args, **kwargs)
+            record(name, time.perf_counter_ns() - start, 0 if size is None or result is None else int(size(result)))
+            return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def _timed(name: str, size: int):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter_ns() - start, size)
+
+
+_NULL_CONTEXT = nullcontext()
+
+
+def timer(name: str, size: int = 0):
+    """
+    Context manager recording the block it wraps under a metric name, a shared null context when disabled.
+    """
+    return _timed(name, size) if ENABLED else _NULL_CONTEXT
+
+
+def _quantile(buckets: list[int], count: int, q: float) -> float:
+    """
+    Upper bound of the power-of-two bucket holding the q-quantile.
+    """
+    rank, seen = q * count, 0
+    for i, n in enumerate(buckets):
+        seen += n
+        if seen >= rank:
+            return float(2 ** i)
+    return float(2 ** (len(buckets) - 1))
+
+
+def snapshot() -> dict[str, dict[str, float | int]]:
+    """
+    Merge the shards of every thread into per-metric summaries.
+    Returns:
+        dict[str, dict[str, float | int]]: For each metric, "count", "total_s", "mean_ms", "p50_ms", "p99_ms",
+            "max_ms" (quantiles being bucket upper bounds) and "mean_size".
+    """
+    merged: dict[str, list] = {}
+    # a shard is either live or retired, never both, while the lock is held
+    with _retire_lock:
+        for shard in [_retired, *_shards]:
+            for name, entry in list(shard.metrics.items()):
+                merged[name] = _merge(merged.get(name), entry)
+
+    return {
+        name: {
+            "count": count,
+            "total_s": latency / 1e9,
+            "mean_ms": latency / count / 1e6,
+            "p50_ms": _quantile(latency_buckets, count, .5) / 1e6,
+            "p99_ms": _quantile(latency_buckets, count, .99) / 1e6,
+            "max_ms": max_latency / 1e6,
+            "mean_size": size / count,
+        }
+        for name, (count, latency, max_latency, size, latency_buckets, _) in sorted(merged.items())
+    }
+
+
+def to_prometheus() -> str:
+    """
+    Render the metrics in the Prometheus text exposition format.
+    """
+    lines = [f"# metrics {'enabled' if ENABLED else 'disabled, set OPTION_PRICER_METRICS=1'}"]
+    for name, summary in snapshot().items():
+        for field, value in summary.items():
+            lines.append(f'option_pricer_{field}{{path="{name}"}} {value:.9g}')
+    return "\n".join(lines) + "\n"
+
+
+# up to 3.11 cProfile only sees the thread enabling it, and work in other threads needs a profiler of its own; since
+# 3.12 it runs on sys.monitoring, a single profiler sees every thread and enabling a second one raises ValueError
+PER_THREAD_PROFILERS = sys.version_info < (3, 12)
+
+_profile_lock = threading.Lock()
+_profile_stats: pstats.Stats | None = None
+_profiler_thread: int | None = None
+
+
+def _collect(profiler: cProfile.Profile) -> None:
+    global _profile_stats
+    with _profile_lock:
+        if _profile_stats is None:
+            _profile_stats = pstats.Stats(profiler)
+        else:
+            _profile_stats.add(profiler)
+
+
+@contextmanager
+def _profiled():
+    # cProfile only sees the thread that enables it, so each unit of work gets its own profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _collect(profiler)
+
+
+def profiled():
+    """
+    Context manager profiling the block it wraps, e.g. one request handled by a worker thread, into the session of
+    start_profiler. A shared null context when profiling is off, in the thread already profiled by start_profiler, or
+    on Python 3.12+ where the profiler of start_profiler already sees every thread.
+    """
+    if not PER_THREAD_PROFILERS or _profiler_thread is None or _profiler_thread == threading.get_ident():
+        return _NULL_CONTEXT
+    return _profiled()
+
+
+def start_profiler() -> cProfile.Profile | None:
+    """
+    Start a cProfile session when OPTION_PRICER_PROFILE is set, the stats being written to that path at exit
+    (readable with pstats or snakeviz). Up to Python 3.11 cProfile only profiles the calling thread: work running in
+    other threads must be wrapped in profiled() to be merged into the session.
+    """
+    global _profiler_thread
+    if not PROFILE_PATH:
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    _profiler_thread = threading.get_ident()
+
+    def dump():
+        profiler.disable()
+        _collect(profiler)
+        _profile_stats.dump_stats(PROFILE_PATH)
+    atexit.register(dump)
+    return profiler
+
+
+def profile_wsgi(wsgi_app: Callable) -> Callable:
+    """
+    Wrap a WSGI application so that each request is profiled by profiled(), whatever thread serves it. The
+    application itself is returned when profiling is off, or on Python 3.12+ where start_profiler sees every thread.
+    """
+    if not PROFILE_PATH or not PER_THREAD_PROFILERS:
+        return wsgi_app
+
+    @functools.wraps(wsgi_app)
+    def wrapper(environ, start_response):
+        with profiled():
+            return wsgi_app(environ, start_response)
+    return wrapper
@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from typing import Iterator
+from monte_carlo import MonteCarlo
+from delta_hedging import DeltaHedging
+
+HEADER = "header.json"
+# memory budget of one simulated chunk, which bounds the number of paths simulated at once
+CHUNK_BYTES = 64 * 2 ** 20
+
+
+def chunk_paths(row_bytes: int, chunk_bytes: int = CHUNK_BYTES) -> int:
+    """
+    Number of paths per chunk so that a chunk of paths of row_bytes bytes each fits in chunk_bytes.
+    """
+    return max(1, chunk_bytes // max(1, row_bytes))
+
+
+def gbm_path_chunks(engine: MonteCarlo, n_paths: int, n_steps: int, T: float, seed: np.random.SeedSequence,
+                    chunk_bytes: int = CHUNK_BYTES) -> Iterator[np.ndarray]:
+    """
+    GBM spot paths of a MonteCarlo engine as stored by PathStore.simulate_paths, one independent stream spawned from
+    seed per chunk of at most chunk_bytes of paths, so that the same seed gives the same paths stored or not.
+    """
+    chunk_size = chunk_paths((n_steps + 1) * engine.dtype.itemsize, chunk_bytes)
+    n_chunks = -(-n_paths // chunk_size)
+    for i, stream in enumerate(seed.spawn(n_chunks)):
+        chunk_engine = MonteCarlo(engine.spot, engine.risk_free, engine.volatility, engine.dtype, stream)
+        yield chunk_engine.generate_paths(min(chunk_size, n_paths - i * chunk_size), n_steps, T)
+
+
+class PathDataset:
+
+    def __init__(self, path: str):
+        """
+        Read-only view of a stored simulation. Fields are memory-mapped, so slicing a block of paths only reads
+        that block from disk and never copies the rest of the dataset into memory.
+        Args:
+            path (str): Directory of the dataset.
+        """
+        self.path = path
+        with open(os.path.join(path, HEADER)) as f:
+            self.header = json.load(f)
+        self._arrays: dict[str, np.memmap] = {}
+
+    @property
+    def fields(self) -> list[str]:
+        return list(self.header["fields"])
+
+    @property
+    def n_paths(self) -> int:
+        return self.header["n_paths"]
+
+    def __getitem__(self, field: str) -> np.memmap:
+        """
+        Memory-mapped (n_paths, ...) array of a field, one path per row.
+        """
+        if field not in self._arrays:
+            self._arrays[field] = np.load(os.path.join(self.path, self.header["fields"][field]["file"]),
+                                          mmap_mode="r")
+        return self._arrays[field]
+
+    def iter_chunks(self, field: str, chunk_size: int = 100_000) -> Iterator[np.memmap]:
+        """
+        Stream over a field by blocks of paths, each block being a zero-copy view of the mapped file.
+        """
+        array = self[field]
+        for start in range(0, array.shape[0], chunk_size):
+            yield array[start:start + chunk_size]
+
+
+class PathStore:
+
+    def __init__(self, root: str | None = os.environ.get("OPTION_PRICER_PATH_STORE"), max_bytes: int = 10 * 2 ** 30,
+                 max_age: float = 7 * 24 * 3600.):
+        """
+        On-disk store of simulated paths. Each dataset is a directory holding one .npy file per field, written
+        chunk by chunk through memory maps so that simulations larger than memory can be stored, and a JSON header
+        recording the simulation parameters and the root seed from which every chunk stream was spawned. Datasets
+        are keyed by a hash of parameters and seed, so an identical simulation is reused instead of recomputed.
+        Args:
+            root (str | None): Storage directory (defaults to the OPTION_PRICER_PATH_STORE environment variable, or
+                a directory under the system temporary directory).
+            max_bytes (int): Storage budget, the least recently used datasets being evicted beyond it.
+            max_age (float): Time (in seconds) after which an unused dataset is evicted.
+        """
+        self.root = root or os.path.join(tempfile.gettempdir(), "option_pricer_paths")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def dataset_id(kind: str, params: dict, seed: int) -> str:
+        payload = json.dumps([kind, params, seed], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def open(self, dataset_id: str) -> PathDataset | None:
+        """
+        Open a complete dataset, marking it as recently used, or return None if it does not exist.
+        """
+        path = os.path.join(self.root, dataset_id)
+        header = os.path.join(path, HEADER)
+        if not os.path.exists(header):
+            return None
+        dataset = PathDataset(path)
+        if not dataset.header.get("complete"):
+            return None
+        # the header modification time is the last access time used by the eviction policy
+        os.utime(header)
+        return dataset
+
+    def datasets(self) -> list[dict]:
+        """
+        Headers of the stored datasets, with their "id" and size on disk ("bytes").
+        """
+        headers = []
+        for dataset_id in os.listdir(self.root):
+            path = os.path.join(self.root, dataset_id)
+            if dataset_id.startswith("."):
+                # private directory of a write in progress
+                continue
+            try:
+                with open(os.path.join(path, HEADER)) as f:
+                    header = json.load(f)
+            except (OSError, ValueError):
+                continue
+            headers.append({"id": dataset_id, "bytes": self._size(path), **header})
+        return headers
+
+    def delete(self, dataset_id: str) -> None:
+        shutil.rmtree(os.path.join(self.root, dataset_id), ignore_errors=True)
+
+    def write(self, kind: str, params: dict, seed: int, n_paths: int, chunks: Iterator[dict[str, np.ndarray]],
+              dtype: type = np.float64) -> str:
+        """
+        Write a chunked simulation, chunks being dicts of (m, ...) arrays for m consecutive paths. The dataset is
+        only published under its id once every chunk has been flushed, so interrupted writes are never read.
+        Args:
+            kind (str): Simulation type, e.g. "paths" or "hedging".
+            params (dict): Simulation parameters, stored in the header.
+            seed (int): Root seed (SeedSequence entropy) of the simulation.
+            n_paths (int): Total number of paths.
+            chunks (Iterator[dict[str, np.ndarray]]): Simulation output, chunk by chunk.
+            dtype (type): Storage dtype of the fields.
+        Returns:
+            str: Id of the dataset.
+        """
+        dataset_id = self.dataset_id(kind, {**params, "n_paths": n_paths, "dtype": np.dtype(dtype).name}, seed)
+        if self.open(dataset_id) is not None:
+            return dataset_id
+        # written in a private directory then renamed, so that concurrent writers of the same dataset never touch
+        # each other's files and readers only ever see complete datasets
+        path = tempfile.mkdtemp(prefix=f".{dataset_id}.", dir=self.root)
+        header = {"kind": kind, "params": params, "seed": seed, "n_paths": n_paths, "dtype": np.dtype(dtype).name,
+                  "created": time.time(), "complete": False, "fields": {}}
+        self._write_header(path, header)
+
+        arrays: dict[str, np.memmap] = {}
+        start = 0
+        for chunk in chunks:
+            m = next(iter(chunk.values())).shape[0]
+            for field, values in chunk.items():
+                if field not in arrays:
+                    file = f"{len(arrays)}.npy"
+                    arrays[field] = np.lib.format.open_memmap(os.path.join(path, file), mode="w+", dtype=dtype,
+                                                              shape=(n_paths, *values.shape[1:]))
+                    header["fields"][field] = {"file": file, "shape": [n_paths, *values.shape[1:]]}
+                arrays[field][start:start + m] = values
+            start += m
+        for array in arrays.values():
+            array.flush()
+        del arrays
+
+        header["complete"] = True
+        self._write_header(path, header)
+        self._publish(path, dataset_id)
+        self.evict(keep=dataset_id)
+        return dataset_id
+
+    def _publish(self, path: str, dataset_id: str) -> None:
+        """
+        Move a written dataset to its final directory, dropping it if another writer has published it first.
+        """
+        target = os.path.join(self.root, dataset_id)
+        try:
+            os.replace(path, target)
+        except OSError:
+            # the target exists: either a concurrent writer won the race, or a leftover of an older layout
+            if self.open(dataset_id) is None:
+                shutil.rmtree(target, ignore_errors=True)
+                os.replace(path, target)
+            else:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def simulate_paths(self, engine: MonteCarlo, n_paths: int, n_steps: int, T: float, seed: int | None = None,
+                       chunk_bytes: int = CHUNK_BYTES, dtype: type = np.float64) -> str:
+        """
+        Simulate and store GBM spot paths of a MonteCarlo engine, one independent stream per chunk of at most
+        chunk_bytes of paths.
+        """
+        seed_sequence = np.random.SeedSequence(seed)
+        params = {"spot": engine.spot, "risk_free_rate": engine.risk_free, "volatility": engine.volatility,
+                  "n_steps": n_steps, "T": T}
+        chunks = ({"paths": paths} for paths in gbm_path_chunks(engine, n_paths, n_steps, T, seed_sequence, chunk_bytes))
+        return self.write("paths", params, seed_sequence.entropy, n_paths, chunks, dtype)
+
+    def simulate_hedging(self, hedging: DeltaHedging, n_paths: int, n_steps: int, dt: float, seed: int | None = None,
+                         chunk_bytes: int = CHUNK_BYTES, dtype: type = np.float64) -> str:
+        """
+        Run and store a delta-hedging simulation (spot paths, deltas, trades, costs, cash and P&L), one independent
+        stream per chunk of at most chunk_bytes of simulation data.
+        """
+        seed_sequence = np.random.SeedSequence(seed)
+        params = {**vars(hedging), "n_steps": n_steps, "dt": dt}
+        # the five (n_steps+1) fields of each path, and as many temporaries in DeltaHedging.simulate
+        chunk_size = chunk_paths(10 * (n_steps + 1) * 8, chunk_bytes)
+        n_chunks = -(-n_paths // chunk_size)
+
+        def chunks():
+            for i, stream in enumerate(seed_sequence.spawn(n_chunks)):
+                yield hedging.simulate(min(chunk_size, n_paths - i * chunk_size), n_steps, dt, stream)
+        return self.write("hedging", params, seed_sequence.entropy, n_paths, chunks(), dtype)
+
+    def evict(self, keep: str | None = None) -> list[str]:
+        """
+        Delete incomplete datasets left by interrupted writes, datasets unused for longer than max_age, then the
+        least recently used ones until the store fits its budget.
+        Args:
+            keep (str | None): Dataset never evicted, e.g. the one just written.
+        Returns:
+            list[str]: Ids of the deleted datasets.
+        """
+        now = time.time()
+        evicted = []
+        candidates = []
+        for dataset_id in os.listdir(self.root):
+            path = os.path.join(self.root, dataset_id)
+            header = os.path.join(path, HEADER)
+            if dataset_id == keep or not os.path.isdir(path):
+                continue
+            try:
+                last_used = os.path.getmtime(header)
+                with open(header) as f:
+                    complete = json.load(f).get("complete", False)
+            except (OSError, ValueError):
+                last_used, complete = 0., False
+            # incomplete datasets get an hour of grace, since they may still be being written
+            if (not complete and now - last_used > 3600) or now - last_used > self.max_age:
+                self.delete(dataset_id)
+                evicted.append(dataset_id)
+            elif complete:
+                candidates.append((last_used, dataset_id, self._size(path)))
+
+        total = sum(size for _, _, size in candidates)
+        if keep is not None:
+            total += self._size(os.path.join(self.root, keep))
+        for _, dataset_id, size in sorted(candidates):
+            if total <= self.max_bytes:
+                break
+            self.delete(dataset_id)
+            evicted.append(dataset_id)
+            total -= size
+        return evicted
+
+    @staticmethod
+    def _size(path: str) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+    @staticmethod
+    def _write_header(path: str, header: dict) -> None:
+        # written to a temporary file then renamed, so that readers never see a partial header
+        tmp = os.path.join(path, HEADER + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp, os.path.join(path, HEADER))
+
+
+def hedge_stored_paths(hedging: DeltaHedging, root: str | None, seed: int, n_paths: int, n_steps: int, dt: float,
+                       **kwargs) -> dict[str, np.ndarray]:
+    """
+    Chunk task of a background hedging job replaying stored spot paths. The GBM paths of the chunk are read from
+    the store under root, being simulated and stored first if missing, so that hedging runs on the same market
+    parameters and seed (e.g. with another strike, option type or transaction cost) reuse them. The paths only
+    depend on the seed: without a root, or once evicted, the same paths are simulated in memory.
+    Args:
+        hedging (DeltaHedging): Hedging strategy, whose spot, rate and volatility drive the paths.
+        root (str | None): Storage directory of the PathStore, None for one-off seeds whose paths are never reused.
+        seed (int): Root seed of the paths.
+        n_paths (int): Number of paths of the chunk.
+        n_steps (int): Number of rebalancing steps.
+        dt (float): Time between two rebalancing steps (in years).
+        **kwargs: Further arguments of DeltaHedging.simulate_chunk, e.g. cancel_event.
+    Returns:
+        dict[str, np.ndarray]: Output of DeltaHedging.simulate_chunk.
+    """
+    n_steps, dt = hedging.rebalancing_grid(n_steps, dt)
+    engine = MonteCarlo(hedging.spot, hedging.risk_free, hedging.volatility)
+    dataset = None
+    if root is not None:
+        store = PathStore(root)
+        dataset = store.open(store.simulate_paths(engine, n_paths, n_steps, n_steps * dt, seed))
+    if dataset is not None:
+        paths = dataset["paths"]
+    else:
+        # a dataset evicted by another process in between is simulated again, from the same streams
+        paths = np.concatenate(list(gbm_path_chunks(engine, n_paths, n_steps, n_steps * dt,
+                                                    np.random.SeedSequence(seed))))
+    return hedging.simulate_chunk(n_paths, n_steps, dt, paths=paths, **kwargs)
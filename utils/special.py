@@ -0,0 +1,40 @@
+import math
+import numpy as np
+from scipy.special import ndtr
+
+_SQRT_2 = math.sqrt(2.)
+_SQRT_2PI = math.sqrt(2 * math.pi)
+
+
+def norm_cdf(x: float | np.ndarray, out: np.ndarray | None = None) -> float | np.ndarray:
+    """
+    Standard normal cumulative distribution function, without the argument checking and distribution machinery of
+    scipy.stats.norm. Python scalars take a math.erfc fast path.
+    Args:
+        x (float | np.ndarray): Point(s) at which to evaluate the function.
+        out (np.ndarray | None): Preallocated output buffer, of the broadcast shape of x.
+    Returns:
+        float | np.ndarray: N(x).
+    """
+    if out is None and isinstance(x, (float, int)):
+        return .5 * math.erfc(-x / _SQRT_2)
+    return ndtr(x, out=out)
+
+
+def norm_pdf(x: float | np.ndarray, out: np.ndarray | None = None) -> float | np.ndarray:
+    """
+    Standard normal probability density function, without the argument checking and distribution machinery of
+    scipy.stats.norm. Python scalars take a math.exp fast path.
+    Args:
+        x (float | np.ndarray): Point(s) at which to evaluate the function.
+        out (np.ndarray | None): Preallocated output buffer, of the broadcast shape of x.
+    Returns:
+        float | np.ndarray: phi(x).
+    """
+    if out is None and isinstance(x, (float, int)):
+        return math.exp(-x * x / 2.) / _SQRT_2PI
+    out = np.square(np.asarray(x, dtype=float), out=out)
+    out *= -.5
+    np.exp(out, out=out)
+    out /= _SQRT_2PI
+    return out
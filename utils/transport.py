@@ -0,0 +1,68 @@
+import numpy as np
+
+# figures above this number of points per trace are decimated before being sent to the browser
+MAX_POINTS = 2_000
+# heat maps above this number of cells are sent without per-cell text labels
+MAX_TEXT_CELLS = 400
+
+
+def typed_array(x: np.ndarray | list, dtype: type = np.float32) -> np.ndarray:
+    """
+    Contiguous NumPy array for a figure trace. Plotly serializes NumPy arrays as base64-encoded typed arrays
+    ({"dtype": "f4", "bdata": ...}) instead of JSON number lists, and float32 halves the payload of float64 at a
+    precision well beyond what a chart displays.
+    Args:
+        x (np.ndarray | list): Values of the trace.
+        dtype (type): Transport dtype, np.float64 where full precision has to be kept.
+    Returns:
+        np.ndarray: Array of the transport dtype.
+    """
+    return np.ascontiguousarray(x, dtype=dtype)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int = MAX_POINTS) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling of a line: the first and last points are kept, and in each of the
+    n_out - 2 buckets in between, the point forming the largest triangle with the point kept in the previous bucket
+    and the average of the next bucket. Peaks and troughs survive, unlike with plain striding.
+    Args:
+        x (np.ndarray): Increasing x values.
+        y (np.ndarray): y values.
+        n_out (int): Number of points to keep.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The kept x and y values.
+    """
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # bucket averages are computed once, the loop only runs over buckets
+    averages_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    averages_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    averages_x, averages_y = np.append(averages_x[1:], x[-1]), np.append(averages_y[1:], y[-1])
+
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - averages_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (averages_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return x[kept], y[kept]
+
+
+def page_records(columns: dict[str, np.ndarray], start: int, end: int, decimals: int = 4) -> list[dict]:
+    """
+    Rows [start, end) of a columnar table as AG Grid records, only the requested page being converted.
+    Args:
+        columns (dict[str, np.ndarray]): Column arrays of equal length.
+        start (int): First row of the page.
+        end (int): Row after the last row of the page.
+        decimals (int): Number of decimals the float values are rounded to.
+    Returns:
+        list[dict]: One record per row of the page.
+    """
+    names = list(columns)
+    values = [np.round(columns[name][start:end], decimals).tolist() for name in names]
+    return [dict(zip(names, row)) for row in zip(*values)]
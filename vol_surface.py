@@ -0,0 +1,189 @@
+import numpy as np
+from scipy.interpolate import CubicSpline
+from scipy.optimize import least_squares
+from implied_vol import ImpliedVolSolver
+
+
+class VolSurface:
+
+    METHODS = ("svi", "spline")
+
+    def __init__(self, spot: float, r: float, method: str = "svi"):
+        """
+        Implied volatility surface sigma(K, T) built from per-expiry quote slices. Each slice is fitted once in
+        total variance w(k) = sigma^2 * T against log-forward-moneyness k = log(K / F), either with a raw SVI
+        parameterization or a natural cubic spline, and the fitted slices are packed into stacked coefficient
+        arrays so that a lookup over any array of contracts is a handful of vectorized operations. Between expiries
+        total variance is interpolated linearly in T, and volatility is held flat outside the quoted expiries.
+        Changing the quotes of one expiry only refits that slice.
+        Args:
+            spot (float): Spot price the forwards are computed from (in $).
+            r (float): Annualized risk-free interest rate.
+            method (str): Slice parameterization, "svi" or "spline".
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method {method}, expected one of {self.METHODS}")
+        self.spot = spot
+        self.r = r
+        self.method = method
+        self._slices: dict[float, tuple[np.ndarray, np.ndarray]] = {}
+        self._packed = None
+
+    @classmethod
+    def from_quotes(cls, spot: float, r: float, K: np.ndarray, T: np.ndarray, sigma: np.ndarray,
+                    method: str = "svi") -> "VolSurface":
+        """
+        Build a surface from implied volatility quotes, one slice per distinct maturity.
+        Args:
+            spot (float): Spot price (in $).
+            r (float): Annualized risk-free interest rate.
+            K (np.ndarray): Quoted strikes (in $).
+            T (np.ndarray): Quoted maturities (in years).
+            sigma (np.ndarray): Quoted implied volatilities.
+            method (str): Slice parameterization, "svi" or "spline".
+        Returns:
+            VolSurface: Fitted surface.
+        """
+        surface = cls(spot, r, method)
+        K, T, sigma = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (K, T, sigma)))
+        expiries, slice_idx = np.unique(T, return_inverse=True)
+        for i, expiry in enumerate(expiries):
+            mask = slice_idx == i
+            surface._fit_slice(expiry, K[mask], sigma[mask])
+        surface._pack()
+        return surface
+
+    @classmethod
+    def from_prices(cls, spot: float, r: float, K: np.ndarray, T: np.ndarray, price: np.ndarray,
+                    is_call: bool | np.ndarray = True, method: str = "svi",
+                    solver: ImpliedVolSolver | None = None) -> "VolSurface":
+        """
+        Build a surface from option price quotes, implied volatilities being solved for the whole set at once.
+        Quotes the solver fails on are left out of the fit.
+        """
+        K, T, price, is_call = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (K, T, price)),
+                                                   np.asarray(is_call, dtype=bool))
+        sigma, _, failed = (solver or ImpliedVolSolver()).solve(price, spot, K, r, T, is_call)
+        return cls.from_quotes(spot, r, K[~failed], T[~failed], sigma[~failed], method)
+
+    @property
+    def expiries(self) -> np.ndarray:
+        return np.array(sorted(self._slices))
+
+    def set_slice(self, T: float, K: np.ndarray, sigma: np.ndarray) -> None:
+        """
+        Replace the quotes of one expiry (adding it if new), refitting that slice only.
+        Args:
+            T (float): Maturity of the slice (in years).
+            K (np.ndarray): Quoted strikes (in $).
+            sigma (np.ndarray): Quoted implied volatilities.
+        """
+        self._fit_slice(float(T), *np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(sigma, dtype=float)))
+        self._pack()
+
+    def remove_slice(self, T: float) -> None:
+        del self._slices[float(T)]
+        self._pack()
+
+    def _fit_slice(self, T: float, K: np.ndarray, sigma: np.ndarray) -> None:
+        """
+        Fit the total variance of one expiry, storing (knots, coefficients) for SVI as ([], a, b, rho, m, s)
+        and for splines as the knots and the (4, n_knots - 1) polynomial coefficients.
+        """
+        order = np.argsort(K)
+        k = np.log(K[order] / self.spot) - self.r * T
+        w = sigma[order] ** 2 * T
+        if self.method == "svi":
+            self._slices[T] = (np.empty(0), self._fit_svi(k, w))
+        else:
+            k, unique = np.unique(k, return_index=True)
+            if k.size < 2:
+                raise ValueError(f"Spline slices need at least 2 distinct strikes, got {k.size} for T={T}")
+            spline = CubicSpline(k, w[unique], bc_type="natural")
+            self._slices[T] = (spline.x, spline.c)
+
+    @staticmethod
+    def _svi(params: np.ndarray, k: np.ndarray) -> np.ndarray:
+        """
+        Raw SVI total variance w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + s^2)), params along the first axis.
+        """
+        a, b, rho, m, s = params
+        return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + s ** 2))
+
+    @staticmethod
+    def _fit_svi(k: np.ndarray, w: np.ndarray) -> np.ndarray:
+        if k.size < 5:
+            raise ValueError(f"SVI slices need at least 5 quotes, got {k.size}")
+        x0 = np.array([w.min(), .1, 0., k[np.argmin(w)], .1])
+        lower = [-np.inf, 0., -.999, 2 * k.min() - k.max(), 1e-4]
+        upper = [np.inf, np.inf, .999, 2 * k.max() - k.min(), 10.]
+        fit = least_squares(lambda p: VolSurface._svi(p, k) - w, x0, bounds=(lower, upper))
+        return fit.x
+
+    def _pack(self) -> None:
+        """
+        Stack the fitted slices into flat arrays indexed by slice. Spline knots of slice i are shifted by i * offset
+        so that a single searchsorted over the concatenated knots locates every point in its own slice.
+        """
+        expiries = self.expiries
+        if expiries.size == 0:
+            self._packed = None
+            return
+        slices = [self._slices[T] for T in expiries]
+        packed = {"expiries": expiries}
+        if self.method == "svi":
+            packed["params"] = np.column_stack([c for _, c in slices])
+        else:
+            offset = 2 * max(np.abs(x).max() for x, _ in slices) + 1
+            sizes = np.array([x.size for x, _ in slices])
+            packed["offset"] = offset
+            packed["start"] = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+            packed["size"] = sizes
+            packed["knots"] = np.concatenate([x + i * offset for i, (x, _) in enumerate(slices)])
+            packed["lo"] = np.array([x[0] for x, _ in slices])
+            packed["hi"] = np.array([x[-1] for x, _ in slices])
+            # one padding interval between slices keeps interval indices aligned with the knot indices
+            packed["coefficients"] = np.concatenate([np.pad(c, ((0, 0), (0, 1))) for _, c in slices], axis=1)
+        self._packed = packed
+
+    def _total_variance(self, slice_idx: np.ndarray, k: np.ndarray) -> np.ndarray:
+        """
+        Total variance of the given slices at log-moneyness k, flat outside the quoted strikes of spline slices.
+        """
+        p = self._packed
+        if self.method == "svi":
+            return self._svi(p["params"][:, slice_idx], k)
+        k = np.clip(k, p["lo"][slice_idx], p["hi"][slice_idx])
+        shifted = k + slice_idx * p["offset"]
+        interval = np.searchsorted(p["knots"], shifted, side="right") - 1
+        interval = np.clip(interval, p["start"][slice_idx], p["start"][slice_idx] + p["size"][slice_idx] - 2)
+        dx = shifted - p["knots"][interval]
+        c = p["coefficients"][:, interval]
+        return ((c[0] * dx + c[1]) * dx + c[2]) * dx + c[3]
+
+    def __call__(self, K: float | np.ndarray, T: float | np.ndarray) -> np.ndarray:
+        """
+        Vectorized lookup of the implied volatility of every (K, T) pair.
+        Args:
+            K (float | np.ndarray): Strike price(s) (in $).
+            T (float | np.ndarray): Time(s) to option expiration (in years).
+        Returns:
+            np.ndarray: Implied volatilities, broadcast over K and T.
+        """
+        if self._packed is None:
+            raise ValueError("Empty volatility surface, no slice has been fitted")
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        expiries = self._packed["expiries"]
+        k = np.log(K / self.spot) - self.r * T
+
+        upper = np.searchsorted(expiries, T)
+        hi = np.minimum(upper, expiries.size - 1)
+        lo = np.maximum(upper - 1, 0)
+        w_lo = self._total_variance(lo, k)
+        w_hi = self._total_variance(hi, k)
+        t_lo, t_hi = expiries[lo], expiries[hi]
+        # linear in T between expiries, constant volatility (total variance proportional to T) beyond them
+        between = hi != lo
+        weight = np.where(between, (T - t_lo) / np.where(between, t_hi - t_lo, 1.), 0.)
+        w = np.where(between, w_lo + weight * (w_hi - w_lo), w_lo * T / t_lo)
+        return np.sqrt(np.maximum(w, 0.) / T)